@@ -7,12 +7,81 @@
 
 import os
 import csv
-from typing import List, Dict, Optional
+from collections import Counter, namedtuple
+from datetime import date
+from itertools import islice
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
 from logger import get_logger
-from config import CSV_COLUMNS, DEFAULT_DB_PATH
+from config import CSV_COLUMNS, DEFAULT_DB_PATH, APPEND_BACKUP_INTERVAL, CSV_JOURNAL_ENABLED, BACKUP_ON_SAVE
+from catalog_cache import get_catalog_cache, potpis_fajla, potpis_kataloga
+from catalog_index import CatalogIndex, RangeIndex, SortedIndex, split_values
+from ranked_index import RankedIndex
+from search_session import SearchSession
+from query_engine import (QueryEngine, Page, Predicate, KeyPath, FacetPath, TextPath, RangePath,
+                          STATUS_FIELD, DOSTUPNA, POZAJMLJENA)
+from trigram_index import TrigramIndex
+from csv_storage import procitaj_zaglavlje, dodaj_red, ucitaj_meta, sacuvaj_meta, atomicni_upis
+from csv_journal import get_journal
+from id_allocator import IdAllocator
+from loan_ledger import Loan, LoanLedger, borrower_key, get_loan_ledger
+from csv_index import get_csv_index
+from snapshot import sacuvaj_snimak, ucitaj_snimak
+from statistika import izracunaj_statistiku
+from analytics import KOLONE_ANALITIKE, analitika_iz_kolona
+from stats_cache import get_stats_cache
 
 logger = get_logger(__name__)
 
+def status_reda(red: Dict[str, str]) -> str:
+    """Враћа статус позајмице реда (DOSTUPNA или POZAJMLJENA)."""
+    if red.get("Позајмљена", "") == "Да" and red.get("Враћена", "") != "Да":
+        return POZAJMLJENA
+    return DOSTUPNA
+
+# Колоне са инверзним индексом; писци и издавачи могу бити раздвојени са ;
+KOLONE_FASETA = {
+    'Писац': lambda red: split_values(red.get('Писац')),
+    'Жанр': lambda red: [red.get('Жанр')],
+    'Издавач': lambda red: split_values(red.get('Издавачи')) + split_values(red.get('Издавач')),
+    'Серијал': lambda red: [red.get('Серијал')],
+    'Колекција': lambda red: [red.get('Колекција')],
+    'Повез': lambda red: [red.get('Повез')],
+    STATUS_FIELD: lambda red: [status_reda(red)],
+}
+
+# Колоне по којима pretraga тражи подниске преко индекса триграма
+KOLONE_PRETRAGE = ("Наслов", "Писац", "Година издавања", "Жанр", "Серијал", "Издавач", "Напомена")
+
+# Тежине колона KOLONE_PRETRAGE при рангираној претрази (остале имају тежину 1)
+TEZINE_RANGIRANJA = {"Наслов": 3.0, "Писац": 2.0, "Серијал": 1.5, "Напомена": 0.5}
+
+# Колоне по којима upit може да поставља услове; статус позајмице је изведен из реда
+KOLONE_UPITA = {kolona: (lambda red, k=kolona: red.get(k)) for kolona in CSV_COLUMNS + ["Издавачи"]}
+KOLONE_UPITA[STATUS_FIELD] = status_reda
+
+# Колоне по којима се странице резултата могу сортирати: да ли је вредност број
+KOLONE_SORTIRANJA = {"Редни број": True, "Наслов": False, "Писац": False, "Година издавања": True}
+
+# Подразумевана величина странице
+VELICINA_STRANICE = 100
+
+# Од овог броја књига статистике неучитаног каталога се броје над колонама снимка
+PRAG_ANALITIKE = 10000
+
+# Индекси једног каталога и упити над њима
+IndeksiKataloga = namedtuple("IndeksiKataloga", "potpis fasete trigrami godine redosledi upiti po_rednom_broju")
+
+# Инверзни индекс једног каталога; гради се и сам, јер регистрима при покретању требају само фасете
+FaseteKataloga = namedtuple("FaseteKataloga", "potpis fasete po_rednom_broju")
+
+# Индекси по путањи каталога
+_INDEKSI: Dict[str, IndeksiKataloga] = {}
+_FASETE: Dict[str, FaseteKataloga] = {}
+
+# Рангирани индекс (BM25F) једног каталога; гради се тек при првој рангираној претрази
+RangKataloga = namedtuple("RangKataloga", "potpis rang po_rednom_broju")
+_RANGOVI: Dict[str, RangKataloga] = {}
+
 # Иницијализација глобалних променљивих
 zanr: List[str] = []
 izdavac: List[str] = []
@@ -20,11 +89,98 @@ povez: List[str] = []
 pisci: List[str] = []
 
 def ucitaj_podatke(putanja_do_csv: str = DEFAULT_DB_PATH) -> List[Dict[str, str]]:
-    """Učitava podatke iz CSV fajla sa poboljšanim rukovanjem greškama."""
+    """Učitava podatke iz CSV fajla, uz keširanje dok se fajl ne promeni."""
+    return get_catalog_cache().ucitaj(putanja_do_csv, _parsiraj_csv)
+
+def statistika_kesa() -> Dict[str, int]:
+    """Враћа бројаче погодака и промашаја кеша каталога."""
+    return get_catalog_cache().statistika()
+
+def statistika_kataloga(putanja_do_csv: str = DEFAULT_DB_PATH) -> Dict[str, object]:
+    """
+    Враћа статистике каталога (statistika.izracunaj_statistiku).
+
+    Резултат се памти док се каталог не промени, па поновно отварање
+    статистике не чита CSV. Враћени речник се не сме мењати.
+    """
+    return get_stats_cache().agregati(putanja_do_csv, _izracunaj_statistiku_kataloga)
+
+def _izracunaj_statistiku_kataloga(putanja_do_csv: str) -> Dict[str, object]:
+    """
+    Рачуна статистике каталога на најјефтинији расположив начин.
+
+    Учитани каталог се пролази једном (izracunaj_statistiku). Велики
+    неучитан каталог са важећим снимком и празним журналом броји се над
+    колонама снимка (analytics), без прављења и кеширања редова.
+    """
+    if not get_catalog_cache().sadrzi(putanja_do_csv) and not os.path.exists(get_journal(putanja_do_csv).path):
+        snimak = ucitaj_snimak(putanja_do_csv)
+        if snimak is not None and snimak.broj_redova >= PRAG_ANALITIKE:
+            # Чист Python: бројање над колонама је ту брже од изградње NumPy низова
+            kolone = {kolona: snimak.kolona(kolona) for kolona in KOLONE_ANALITIKE}
+            kolone = {kolona: vrednosti for kolona, vrednosti in kolone.items() if vrednosti is not None}
+            return analitika_iz_kolona(kolone, podeli_pisce, koristi_numpy=False).statistika()
+    return izracunaj_statistiku(ucitaj_podatke(putanja_do_csv), podeli_pisce)
+
+def iter_podataka(putanja_do_csv: str = DEFAULT_DB_PATH,
+                  filtar: Optional[Callable[[Dict[str, str]], bool]] = None) -> Iterator[Dict[str, str]]:
+    """
+    Враћа редове каталога један по један, опционо само оне које пропушта `filtar`.
+
+    Ако је каталог већ у кешу, редови се узимају из кеша. У супротном се
+    CSV чита ред по ред, па позивалац може да ради са првим редовима пре
+    него што је фајл прочитан до краја (нпр. тражење прве књиге са насловом).
+    """
+    redovi = get_catalog_cache().pogledaj(putanja_do_csv)
+    if redovi is None:
+        snimak = ucitaj_snimak(putanja_do_csv)
+        osnovni = snimak.redovi if snimak is not None else _iter_osnovni_csv(putanja_do_csv)
+        redovi = get_journal(putanja_do_csv).iter_replay(osnovni)
+    try:
+        for red in redovi:
+            if filtar is None or filtar(red):
+                yield red
+    except _GreskaCitanja:
+        # Greška je već zabeležena; tok se prekida posle poslednjeg ispravnog reda
+        return
+
+def _parsiraj_csv(putanja_do_csv: str) -> List[Dict[str, str]]:
+    """Parsira CSV fajl i primenjuje zapise iz žurnala izmena."""
+    return get_journal(putanja_do_csv).replay(_parsiraj_osnovni_csv(putanja_do_csv))
+
+class _GreskaCitanja(Exception):
+    """Čitanje CSV fajla je prekinuto greškom koja je već zabeležena."""
+
+def _parsiraj_osnovni_csv(putanja_do_csv: str) -> List[Dict[str, str]]:
+    """
+    Parsira CSV fajl sa poboljšanim rukovanjem greškama.
+
+    Ako postoji važeći binarni snimak kataloga, redovi se čitaju iz njega.
+    Posle parsiranja CSV-a snimak se pravi ponovo za sledeće pokretanje.
+    """
+    snimak = ucitaj_snimak(putanja_do_csv)
+    if snimak is not None:
+        logger.info(f"Učitano {len(snimak.redovi)} zapisa iz snimka kataloga {putanja_do_csv}")
+        return snimak.redovi
+
+    potpis = potpis_fajla(putanja_do_csv)
+    try:
+        data = list(_iter_osnovni_csv(putanja_do_csv))
+    except _GreskaCitanja:
+        return []
+    if data:
+        logger.info(f"Uspešno učitano {len(data)} zapisa iz {putanja_do_csv}")
+        if potpis_fajla(putanja_do_csv) == potpis:
+            sacuvaj_snimak(putanja_do_csv, list(data[0]), data, potpis)
+    return data
+
+def _iter_osnovni_csv(putanja_do_csv: str) -> Iterator[Dict[str, str]]:
+    """Čita redove CSV fajla jedan po jedan, preskačući neispravne redove."""
     if not os.path.exists(putanja_do_csv):
         logger.error(f"Fajl nije pronađen: {putanja_do_csv}")
-        return []
-        
+        return
+
+    procitano = 0
     try:
         with open(putanja_do_csv, 'r', encoding='utf-8') as csvfile:
             # Prvo pročitaj zaglavlje da proverimo kolone
@@ -34,50 +190,46 @@ def ucitaj_podatke(putanja_do_csv: str = DEFAULT_DB_PATH) -> List[Dict[str, str]
             # Proveri da li je fajl prazan
             if not first_line:
                 logger.error(f"CSV fajl je prazan: {putanja_do_csv}")
-                return []
+                return
                 
             reader = csv.DictReader(csvfile)
             
             # Proveri da li postoje sva zaglavlja
             if not reader.fieldnames:
                 logger.error(f"CSV fajl nema zaglavlja: {putanja_do_csv}")
-                return []
+                return
                 
             # Proveri da li postoje sve obavezne kolone
             missing_columns = [col for col in CSV_COLUMNS if col not in reader.fieldnames]
             if missing_columns:
                 logger.error(f"Nedostaju obavezne kolone u CSV fajlu: {putanja_do_csv}")
                 logger.error(f"Nedostajuće kolone: {', '.join(missing_columns)}")
-                return []
+                return
                 
             # Učitaj podatke i proveri validnost
-            data = []
             for i, row in enumerate(reader, start=2):  # Start=2 jer je prva linija zaglavlje
                 # Proveri da li red ima sve potrebne kolone
                 if all(col in row for col in CSV_COLUMNS):
-                    data.append(row)
+                    procitano += 1
+                    yield row
                 else:
                     logger.warning(f"Red {i} nema sve potrebne kolone i biće preskočen")
             
-            logger.info(f"Uspešno učitano {len(data)} zapisa iz {putanja_do_csv}")
-            return data
-            
     except UnicodeDecodeError:
         logger.error(f"Problem sa kodiranjem fajla. Pokušaj sa drugim encoding-om: {putanja_do_csv}")
-        # Pokušaj sa drugim encoding-om
+        # Pokušaj sa drugim encoding-om; već vraćeni redovi se preskaču
         try:
             with open(putanja_do_csv, 'r', encoding='cp1252') as csvfile:
-                reader = csv.DictReader(csvfile)
-                return list(reader)
+                yield from islice(csv.DictReader(csvfile), procitano, None)
         except Exception:
             logger.exception(f"Nije moguće pročitati fajl ni sa alternativnim encoding-om")
-            return []
+            raise _GreskaCitanja()
     except csv.Error as e:
         logger.error(f"CSV greška: {e}")
-        return []
+        raise _GreskaCitanja()
     except Exception as e:
         logger.exception(f"Neočekivana greška pri čitanju fajla: {e}")
-        return []
+        raise _GreskaCitanja()
 
 def dobavi_sve_pisce(podaci: List[Dict[str, str]]) -> List[str]:
     """Извлачи све писце из базе података и враћа их као регистар."""
@@ -102,42 +254,187 @@ def podeli_pisce(pisci_text: str) -> List[str]:
         return []
     return [p.strip() for p in pisci_text.split(';') if p.strip()]
 
-def inicijalizuj_podatke(putanja_do_csv: Optional[str] = None) -> Dict[str, List[str]]:
-    """Иницијализује глобалне променљиве на основу података из CSV фајла."""
-    global zanr, izdavac, povez, pisci
+def _kljucevi_kataloga(podaci: List[Dict[str, str]]) -> Tuple[Iterable[Hashable], bool]:
+    """Враћа кључеве књига у индексима и да ли су то редни бројеви."""
+    kljucevi = [red.get("Редни број", "") for red in podaci]
+    if len(set(kljucevi)) == len(kljucevi):
+        return kljucevi, True
+    # Дупликати редних бројева - књиге се препознају по позицији
+    return range(len(podaci)), False
 
-    # Подразумевана путања до CSV фајла
-    putanja_do_csv = putanja_do_csv or DEFAULT_DB_PATH
+def _fasete_kataloga(putanja_do_csv: str, podaci: Optional[List[Dict[str, str]]] = None) -> FaseteKataloga:
+    """
+    Враћа инверзни индекс каталога по колонама из KOLONE_FASETA.
+
+    Гради се без триграма и осталих индекса из _indeksi, који га деле.
+    `podaci` су већ учитани редови каталога, ако их позивалац има.
+    """
+    kljuc = os.path.abspath(putanja_do_csv)
+    potpis = potpis_kataloga(putanja_do_csv)
+    unos = _FASETE.get(kljuc)
+    if unos is not None and potpis is not None and unos.potpis == potpis:
+        return unos
+
+    if podaci is None:
+        podaci = ucitaj_podatke(putanja_do_csv)
+    kljucevi, po_rednom_broju = _kljucevi_kataloga(podaci)
+    fasete = CatalogIndex(KOLONE_FASETA)
+    fasete.build(zip(kljucevi, podaci))
+    unos = FaseteKataloga(potpis, fasete, po_rednom_broju)
+    if potpis is not None:
+        _FASETE[kljuc] = unos
+    return unos
+
+def _indeksi(putanja_do_csv: str) -> IndeksiKataloga:
+    """
+    Враћа индексе каталога: фасете по KOLONE_FASETA, триграме по KOLONE_PRETRAGE,
+    године издавања и QueryEngine над њима.
+
+    Индекси се граде када се каталог промени мимо ових функција, а измене
+    кроз њих (журнал, дописивање или преписивање каталога) их ажурирају у
+    месту (види _azuriraj_indekse).
+    """
+    kljuc = os.path.abspath(putanja_do_csv)
+    potpis = potpis_kataloga(putanja_do_csv)
+    unos = _INDEKSI.get(kljuc)
+    if unos is not None and potpis is not None and unos.potpis == potpis:
+        return unos
 
     podaci = ucitaj_podatke(putanja_do_csv)
+    kljucevi, po_rednom_broju = _kljucevi_kataloga(podaci)
+    fasete = _fasete_kataloga(putanja_do_csv, podaci).fasete
+    trigrami = TrigramIndex({kolona: (lambda red, k=kolona: red.get(k)) for kolona in KOLONE_PRETRAGE})
+    trigrami.build(zip(kljucevi, podaci))
+    godine = RangeIndex(lambda red: red.get("Година издавања"))
+    godine.build(zip(kljucevi, podaci))
+    redosledi = {}
+    for kolona, brojevna in KOLONE_SORTIRANJA.items():
+        redosledi[kolona] = SortedIndex(lambda red, k=kolona: red.get(k), brojevna)
+        redosledi[kolona].build(zip(kljucevi, podaci))
 
-    # Помоћна функција за издвајање јединствених вредности из колоне
-    def izdvoji_jedinstvene_vrednosti(kolona: str) -> List[str]:
-        return sorted({row.get(kolona, "").strip() for row in podaci if row.get(kolona, "").strip()})
+    putevi = [FacetPath(fasete), TextPath(trigrami), RangePath("Година издавања", godine)]
+    if po_rednom_broju:
+        putevi.append(KeyPath("Редни број", lambda broj: [str(broj)] if str(broj) in fasete else []))
+    upiti = QueryEngine(KOLONE_UPITA, trigrami, putevi, multi_valued=KOLONE_FASETA, sorts=redosledi)
+    unos = IndeksiKataloga(potpis, fasete, trigrami, godine, redosledi, upiti, po_rednom_broju)
+    if potpis is not None:
+        _INDEKSI[kljuc] = unos
+    return unos
 
-    zanr = izdvoji_jedinstvene_vrednosti("Жанр")
-    povez = izdvoji_jedinstvene_vrednosti("Повез")
+def _rang_kataloga(putanja_do_csv: str) -> RangKataloga:
+    """
+    Враћа рангирани индекс каталога (BM25F) по колонама из KOLONE_PRETRAGE.
 
-    # Обрада издавача
-    izdavac_set = set()
-    for row in podaci:
-        for kolona in ["Издавачи", "Издавач"]:
-            if row.get(kolona, "").strip():
-                izdavac_set.update(map(str.strip, row[kolona].split(";")))
-    izdavac = sorted(izdavac_set)
+    Изградња је скупа, па се не гради уз остале индексе, већ тек када
+    затреба pretraga_po_relevantnosti, и чува се по потпису каталога.
+    """
+    kljuc = os.path.abspath(putanja_do_csv)
+    potpis = potpis_kataloga(putanja_do_csv)
+    unos = _RANGOVI.get(kljuc)
+    if unos is not None and potpis is not None and unos.potpis == potpis:
+        return unos
 
-    # Креирање регистра писаца
-    pisci = dobavi_sve_pisce(podaci)
+    podaci = ucitaj_podatke(putanja_do_csv)
+    kljucevi, po_rednom_broju = _kljucevi_kataloga(podaci)
+    rang = RankedIndex({kolona: (lambda red, k=kolona: red.get(k)) for kolona in KOLONE_PRETRAGE},
+                       TEZINE_RANGIRANJA)
+    rang.build(zip(kljucevi, podaci))
+    unos = RangKataloga(potpis, rang, po_rednom_broju)
+    if potpis is not None:
+        _RANGOVI[kljuc] = unos
+    return unos
+
+def _fasete(putanja_do_csv: str) -> CatalogIndex:
+    """Враћа инверзни индекс каталога по колонама из KOLONE_FASETA."""
+    return _fasete_kataloga(putanja_do_csv).fasete
+
+def _azuriraj_indekse(putanja_do_csv: str, stari_potpis: Optional[tuple],
+                      izmenjeni: List[Dict[str, str]] = (), obrisani: List[str] = (),
+                      preimenovani: Optional[Dict[str, str]] = None) -> None:
+    """
+    Примењује измењене и обрисане редове на индексе ако су одговарали каталогу пре измене.
+
+    Индекси затим важе за нови потпис каталога. `preimenovani` пресликава
+    нови редни број измењене књиге у стари; књига задржава место у редоследу.
+    """
+    preimenovani = preimenovani or {}
+    kljuc = os.path.abspath(putanja_do_csv)
+    potpis = potpis_kataloga(putanja_do_csv)
+    # Фасете из _FASETE су део и уноса у _INDEKSI, па се сваки индекс ажурира једном
+    azurirani = set()
+    for kes, delovi in ((_FASETE, lambda u: [u.fasete]),
+                        (_INDEKSI, lambda u: [u.fasete, u.trigrami, u.godine, *u.redosledi.values()]),
+                        (_RANGOVI, lambda u: [u.rang])):
+        unos = kes.pop(kljuc, None)
+        if unos is None or potpis is None or unos.potpis != stari_potpis or not unos.po_rednom_broju:
+            continue
+        for indeks in delovi(unos):
+            if id(indeks) in azurirani:
+                continue
+            azurirani.add(id(indeks))
+            for red in izmenjeni:
+                novi = red.get("Редни број", "")
+                indeks.replace(preimenovani.get(novi, novi), novi, dict(red))
+            for redni_broj in obrisani:
+                indeks.remove(redni_broj)
+        kes[kljuc] = unos._replace(potpis=potpis)
+
+def broj_knjiga(putanja_do_csv: str) -> int:
+    """Враћа број књига у каталогу из индекса, без копирања редова."""
+    return len(_fasete(putanja_do_csv))
+
+def vrednosti_kolone(putanja_do_csv: str, kolona: str) -> List[str]:
+    """Враћа сортиране различите вредности колоне из KOLONE_FASETA."""
+    return _fasete(putanja_do_csv).values(kolona)
+
+def broj_po_vrednosti(putanja_do_csv: str, kolona: str) -> Dict[str, int]:
+    """Враћа број књига за сваку вредност колоне из KOLONE_FASETA."""
+    return _fasete(putanja_do_csv).counts(kolona)
+
+def pretraga_po_fasetama(putanja_do_csv: str, kriterijumi: Dict[str, str]) -> List[Dict[str, str]]:
+    """
+    Враћа књиге које тачно имају задате вредности колона (без обзира на велика слова).
+
+    За писце и издаваче довољно је поклапање са једним од наведених.
+    """
+    return [dict(red) for red in _fasete(putanja_do_csv).find(kriterijumi)]
+
+def pretraga_po_piscu(putanja_do_csv: str, pisac: str) -> List[Dict[str, str]]:
+    """Враћа све књиге датог писца."""
+    return pretraga_po_fasetama(putanja_do_csv, {"Писац": pisac})
+
+def inicijalizuj_podatke(putanja_do_csv: Optional[str] = None) -> Dict[str, List[str]]:
+    """Иницијализује глобалне променљиве на основу података из CSV фајла."""
+    global zanr, izdavac, povez, pisci
+
+    # Подразумевана путања до CSV фајла
+    putanja_do_csv = putanja_do_csv or DEFAULT_DB_PATH
+
+    # Јединствене вредности се читају из инверзног индекса; триграми и остали
+    # индекси за претрагу се не граде при покретању
+    indeks = _fasete(putanja_do_csv)
+    zanr = indeks.values("Жанр")
+    povez = indeks.values("Повез")
+    izdavac = indeks.values("Издавач")
+    pisci = indeks.values("Писац")
 
     return {'zanr': zanr, 'izdavac': izdavac, 'povez': povez, 'pisci': pisci}
 
-def sacuvaj_podatke(putanja_do_csv: str, podaci: List[Dict[str, str]]) -> bool:
-    """Сачувава податке у CSV фајл. Пре сваког чувања прави резервну копију (backup)."""
+def sacuvaj_podatke(putanja_do_csv: str, podaci: List[Dict[str, str]],
+                    napravi_rezervnu_kopiju: Optional[bool] = None) -> bool:
+    """
+    Сачувава податке у CSV фајл.
+
+    Фајл се замењује атомски, па прекид при чувању не може оставити окрњен
+    каталог. Резервна копија се прави само ако је тражена, односно ако је
+    укључено BACKUP_ON_SAVE.
+    """
+    if napravi_rezervnu_kopiju is None:
+        napravi_rezervnu_kopiju = BACKUP_ON_SAVE
     try:
-        # --- Резервна копија пре сваке измене ---
-        from backup_utils import napravi_backup
-        napravi_backup(putanja_do_csv)
-        # --- Крај backup блока ---
+        if napravi_rezervnu_kopiju:
+            from backup_utils import napravi_backup
+            napravi_backup(putanja_do_csv)
         
         # Пре чувања, проверавамо податке за компатибилност
         for knjiga in podaci:
@@ -146,7 +443,7 @@ def sacuvaj_podatke(putanja_do_csv: str, podaci: List[Dict[str, str]]) -> bool:
                 knjiga["Издавач"] = knjiga["Издавачи"]
                 del knjiga["Издавачи"]
         
-        with open(putanja_do_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        with atomicni_upis(putanja_do_csv) as csvfile:
             # Правимо листу поља за CSV
             fieldnames = ['Редни број']
             # Додајемо само поља која постоје у подацима
@@ -158,25 +455,239 @@ def sacuvaj_podatke(putanja_do_csv: str, podaci: List[Dict[str, str]]) -> bool:
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             writer.writeheader()
             writer.writerows(podaci)
+
+        # Цео каталог је сада у CSV фајлу, па журнал више није потребан
+        get_journal(putanja_do_csv).clear()
+
+        # Кеш пунимо управо сачуваним редовима да следеће читање не би парсирало фајл
+        _osvezi_kes(putanja_do_csv, podaci, fieldnames)
         return True
     except Exception as e:
         logger.exception(f"Greška pri pisanju u fajl: {e}")
         return False
 
+def _osvezi_kes(putanja_do_csv: str, podaci: List[Dict[str, str]], fieldnames: List[str]) -> None:
+    """Уписује сачуване редове у кеш у облику у ком би их вратило парсирање."""
+    kes = get_catalog_cache()
+    if any(col not in fieldnames for col in CSV_COLUMNS):
+        # Парсирање би овакав фајл одбацило, па га препуштамо њему
+        kes.ponisti(putanja_do_csv)
+        return
+    redovi = [_red_kataloga(knjiga, fieldnames) for knjiga in podaci]
+    kes.postavi(putanja_do_csv, redovi)
+    # Снимак за брзо покретање се везује за управо сачуван CSV фајл
+    sacuvaj_snimak(putanja_do_csv, fieldnames, redovi, potpis_fajla(putanja_do_csv))
+
+def _red_kataloga(knjiga: Dict[str, object], kolone: Iterable[str]) -> Dict[str, str]:
+    """Враћа ред књиге у облику у ком га враћа учитавање каталога (текст, '' уместо None)."""
+    return {kolona: '' if knjiga.get(kolona) is None else str(knjiga.get(kolona)) for kolona in kolone}
+
+def _alokator_iz_podataka(podaci: List[Dict[str, str]]) -> IdAllocator:
+    """Прави алокатор редних бројева од постојећих књига, прескачући неисправне бројеве."""
+    brojevi = []
+    for knjiga in podaci:
+        try:
+            brojevi.append(int(knjiga.get("Редни број", "") or 0))
+        except ValueError:
+            continue
+    return IdAllocator.from_ids(brojevi)
+
+def _meta_kataloga(putanja_do_csv: str, podaci: Optional[List[Dict[str, str]]] = None) -> Dict[str, object]:
+    """
+    Враћа важећи .meta каталога, или га прави од књига ако је застарео.
+
+    Нови .meta задржава следећи редни број из застарелог, па се бројеви
+    обрисаних књига не додељују поново ни када се .meta прави изнова.
+    """
+    meta = ucitaj_meta(putanja_do_csv)
+    if meta is not None:
+        return meta
+    meta = _alokator_iz_podataka(podaci if podaci is not None else ucitaj_podatke(putanja_do_csv)).to_dict()
+    stari = ucitaj_meta(putanja_do_csv, samo_vazeci=False) or {}
+    try:
+        sledeci = int(stari.get('sledeci_redni_broj', 0))
+    except (TypeError, ValueError):
+        sledeci = 0
+    if sledeci > meta['sledeci_redni_broj']:
+        # Бројеви између највеће постојеће и раније додељене књиге су празнина
+        meta['praznine'].append([meta['sledeci_redni_broj'], sledeci])
+        meta['sledeci_redni_broj'] = sledeci
+    meta['dodavanja_od_backupa'] = 0
+    return meta
+
+def _azuriraj_posle_prepisivanja(putanja_do_csv: str, stari_potpis: Optional[tuple], zaglavlje: Optional[List[str]],
+                                 izmenjeni: List[Dict[str, str]] = (), obrisani: List[str] = (),
+                                 preimenovani: Optional[Dict[str, str]] = None) -> None:
+    """
+    Примењује измене на индексе после преписивања каталога (sacuvaj_podatke).
+
+    Индекси се ажурирају у месту само када је кеш попуњен сачуваним редовима
+    и заглавље је исто као пре чувања (`zaglavlje`); иначе се граде поново
+    при следећем коришћењу.
+    """
+    kolone = procitaj_zaglavlje(putanja_do_csv)
+    if kolone is None or kolone != zaglavlje or not get_catalog_cache().sadrzi(putanja_do_csv):
+        return
+    _azuriraj_indekse(putanja_do_csv, stari_potpis, [_red_kataloga(red, kolone) for red in izmenjeni],
+                      obrisani, preimenovani)
+
+def sazmi_zurnal(putanja_do_csv: str) -> bool:
+    """Сажима журнал измена назад у CSV фајл (потпуно преписивање уз резервну копију)."""
+    stari_potpis = potpis_kataloga(putanja_do_csv)
+    zaglavlje = procitaj_zaglavlje(putanja_do_csv)
+    if not sacuvaj_podatke(putanja_do_csv, ucitaj_podatke(putanja_do_csv), napravi_rezervnu_kopiju=True):
+        return False
+    # Садржај каталога се не мења, па индексима треба само нови потпис
+    _azuriraj_posle_prepisivanja(putanja_do_csv, stari_potpis, zaglavlje)
+    return True
+
+def _sacuvaj_izmene(putanja_do_csv: str, podaci: List[Dict[str, str]],
+                    izmenjeni: List[Dict[str, str]] = (), obrisani: List[str] = (),
+                    preimenovani: Optional[Dict[str, str]] = None) -> bool:
+    """
+    Чува измене каталога.
+
+    У режиму журнала (CSV_JOURNAL_ENABLED) свака измена се бележи као мали
+    запис у журналу, а журнал се сажима у CSV када пређе праг. Иначе, или када
+    редни бројеви измењених књига нису јединствени, преписује се цео фајл.
+    `preimenovani` пресликава нови редни број измењене књиге у стари; журнал
+    би такву књигу дописао на крај и задржао ред са старим бројем, па се и
+    тада преписује цео фајл. Индекси каталога се у оба случаја ажурирају у
+    месту, осим када редни бројеви измењених књига нису јединствени.
+    """
+    # Ред у журналу и кешу мора бити исти као после поновног учитавања
+    for red in izmenjeni:
+        red.update(_red_kataloga(red, red))
+    pogodjeni = [red.get("Редни број", "") for red in izmenjeni] + list(obrisani)
+    broj_kljuceva = Counter(knjiga.get("Редни број", "") for knjiga in podaci)
+    broj_kljuceva.update(obrisani)
+    # Индекси и журнал препознају књиге по редном броју
+    jedinstveni = all(kljuc and broj_kljuceva[kljuc] == 1 for kljuc in pogodjeni)
+    stari_potpis = potpis_kataloga(putanja_do_csv)
+
+    if not CSV_JOURNAL_ENABLED or not os.path.exists(putanja_do_csv) or preimenovani or not jedinstveni:
+        zaglavlje = procitaj_zaglavlje(putanja_do_csv)
+        if not sacuvaj_podatke(putanja_do_csv, podaci):
+            return False
+        if jedinstveni:
+            _azuriraj_posle_prepisivanja(putanja_do_csv, stari_potpis, zaglavlje, izmenjeni, obrisani, preimenovani)
+        return True
+
+    zurnal = get_journal(putanja_do_csv)
+    try:
+        for red in izmenjeni:
+            zurnal.append_upsert(red)
+        for kljuc in obrisani:
+            zurnal.append_delete(kljuc)
+    except OSError as e:
+        logger.exception(f"Greška pri upisu u žurnal: {e}")
+        return False
+
+    get_catalog_cache().postavi(putanja_do_csv, podaci)
+    _azuriraj_indekse(putanja_do_csv, stari_potpis, izmenjeni, obrisani)
+    if zurnal.needs_compaction():
+        return sazmi_zurnal(putanja_do_csv)
+    return True
+
 def dodaj_knjigu(putanja_do_csv: str, nova_knjiga: Dict[str, str]) -> bool:
-    """Додаје нову књигу у библиотеку."""
-    podaci = ucitaj_podatke(putanja_do_csv)
-    nova_knjiga["Редни број"] = str(len(podaci) + 1)
-    podaci.append(nova_knjiga)
-    return sacuvaj_podatke(putanja_do_csv, podaci)
+    """
+    Додаје нову књигу у библиотеку.
+
+    Када заглавље фајла одговара CSV_COLUMNS, књига се само дописује на крај
+    фајла (или у журнал, у режиму журнала), а следећи редни број се чува у
+    пратећем .meta фајлу. Резервна копија се тада прави на сваких
+    APPEND_BACKUP_INTERVAL дописаних књига. У осталим случајевима (фајл не
+    постоји, заглавље се разликује, непознате колоне) цео фајл се преписује
+    преко sacuvaj_podatke.
+    """
+    if "Издавачи" in nova_knjiga:
+        nova_knjiga["Издавач"] = nova_knjiga.pop("Издавачи")
+
+    zaglavlje = procitaj_zaglavlje(putanja_do_csv)
+    u_zurnal = CSV_JOURNAL_ENABLED and zaglavlje is not None
+    if not u_zurnal and (zaglavlje != CSV_COLUMNS or any(kljuc not in zaglavlje for kljuc in nova_knjiga)):
+        # Структурна промена - преписујемо цео фајл
+        podaci = ucitaj_podatke(putanja_do_csv)
+        meta = _meta_kataloga(putanja_do_csv, podaci)
+        alokator = IdAllocator.from_dict(meta)
+        nova_knjiga["Редни број"] = str(alokator.allocate(fill_gaps=False))
+        podaci.append(nova_knjiga)
+        stari_potpis = potpis_kataloga(putanja_do_csv)
+        if not sacuvaj_podatke(putanja_do_csv, podaci):
+            return False
+        if all(knjiga.get("Редни број") != nova_knjiga["Редни број"] for knjiga in podaci[:-1]):
+            _azuriraj_posle_prepisivanja(putanja_do_csv, stari_potpis, zaglavlje, [nova_knjiga])
+        meta.update(alokator.to_dict())
+        sacuvaj_meta(putanja_do_csv, meta)
+        return True
+
+    try:
+        # .meta који не постоји или је застарео рачунамо из (кешираних) података
+        meta = _meta_kataloga(putanja_do_csv)
+        alokator = IdAllocator.from_dict(meta)
+
+        # У режиму журнала резервну копију прави сажимање журнала
+        if not u_zurnal and meta['dodavanja_od_backupa'] >= APPEND_BACKUP_INTERVAL:
+            from backup_utils import napravi_backup
+            napravi_backup(putanja_do_csv)
+            meta['dodavanja_od_backupa'] = 0
+
+        # Стари ток не поново користи бројеве обрисаних књига, па се празнине прескачу
+        nova_knjiga["Редни број"] = str(alokator.allocate(fill_gaps=False))
+        kolone = zaglavlje + [kljuc for kljuc in nova_knjiga if kljuc not in zaglavlje]
+        red = {kolona: '' if nova_knjiga.get(kolona) is None else str(nova_knjiga.get(kolona))
+               for kolona in kolone}
+
+        stari_potpis = potpis_kataloga(putanja_do_csv)
+        if u_zurnal:
+            get_journal(putanja_do_csv).append_upsert(red)
+        else:
+            dodaj_red(putanja_do_csv, CSV_COLUMNS, red)
+        get_catalog_cache().dopisi_red(putanja_do_csv, stari_potpis, red)
+        _azuriraj_indekse(putanja_do_csv, stari_potpis, [red])
+
+        meta.update(alokator.to_dict())
+        meta['dodavanja_od_backupa'] += 1
+        sacuvaj_meta(putanja_do_csv, meta)
+
+        if u_zurnal and get_journal(putanja_do_csv).needs_compaction():
+            return sazmi_zurnal(putanja_do_csv)
+        return True
+    except Exception as e:
+        logger.exception(f"Greška pri dodavanju knjige: {e}")
+        return False
 
 def obrisi_knjigu(putanja_do_csv: str, naslov: str) -> bool:
-    """Уклања књигу из библиотеке по наслову."""
+    """
+    Уклања књигу из библиотеке по наслову.
+
+    Ослобођени редни бројеви се бележе као празнине у .meta фајлу, а
+    dodaj_knjigu их не додељује поново. Брисање се бележи и у књизи
+    позајмица, па ни књига са истим бројем (нпр. унета ручно) не наслеђује
+    позајмицу ни историју обрисане.
+    """
     podaci = ucitaj_podatke(putanja_do_csv)
     nova_lista = [k for k in podaci if k.get("Наслов", "").lower() != naslov.lower()]
     if len(nova_lista) == len(podaci):
         return False
-    return sacuvaj_podatke(putanja_do_csv, nova_lista)
+    obrisani = [k.get("Редни број", "") for k in podaci if k.get("Наслов", "").lower() == naslov.lower()]
+    # .meta се узима пре брисања, док обухвата и бројеве обрисаних књига
+    meta = _meta_kataloga(putanja_do_csv, podaci)
+    if not _sacuvaj_izmene(putanja_do_csv, nova_lista, obrisani=obrisani):
+        return False
+    # Бројеви који и даље припадају другој књизи (дупликати) нису ослобођени
+    preostali = {k.get("Редни број", "") for k in nova_lista}
+    alokator = IdAllocator.from_dict(meta)
+    for kljuc in obrisani:
+        if kljuc.isdigit() and kljuc not in preostali:
+            alokator.release(int(kljuc))
+    meta.update(alokator.to_dict())
+    sacuvaj_meta(putanja_do_csv, meta)
+    dnevnik = get_loan_ledger(putanja_do_csv)
+    if dnevnik.exists():
+        _zabelezi_u_dnevnik(lambda: dnevnik.remove_books(
+            kljuc for kljuc in obrisani if kljuc and kljuc not in preostali))
+    return True
 
 def izmeni_knjigu(putanja_do_csv: str, naslov: str, nova_knjiga: Dict[str, str]) -> bool:
     """Измењује податке о књизи по наслову."""
@@ -192,16 +703,31 @@ def izmeni_knjigu(putanja_do_csv: str, naslov: str, nova_knjiga: Dict[str, str])
     
     for i, knjiga in enumerate(podaci):
         if knjiga.get("Наслов", "").lower() == naslov.lower():
+            stara = dict(knjiga)
             for kljuc, vrednost in nova_knjiga.items():
                 knjiga[kljuc] = vrednost
+            # Редни број се пореди као текст, као после учитавања
+            knjiga.update(_red_kataloga(knjiga, knjiga))
             izmenjeno = True
             break
     
     if izmenjeno:
-        uspeh = sacuvaj_podatke(putanja_do_csv, podaci)
+        stari_broj = stara.get("Редни број", "")
+        novi_broj = knjiga.get("Редни број", "")
+        preimenovani = {novi_broj: stari_broj} if novi_broj != stari_broj else None
+        uspeh = _sacuvaj_izmene(putanja_do_csv, podaci, izmenjeni=[knjiga], preimenovani=preimenovani)
         if uspeh:
             # Ажурирамо регистар писаца након измене књиге
             azuriraj_registar_pisaca(podaci)
+            # Колоне позајмице се могу мењати и у формулару за измену
+            dnevnik = get_loan_ledger(putanja_do_csv)
+            if dnevnik.exists():
+                if preimenovani:
+                    # Историја старог броја не прелази на књигу која га касније добије
+                    if all(k.get("Редни број") != stari_broj for k in podaci):
+                        _zabelezi_u_dnevnik(lambda: dnevnik.remove_books([stari_broj]))
+                    stara = {}
+                _uskladi_dnevnik(dnevnik, stara, knjiga)
         return uspeh
     return False
 
@@ -212,83 +738,277 @@ def azuriraj_registar_pisaca(podaci: List[Dict[str, str]]) -> List[str]:
     return pisci
 
 def pretraga(putanja_do_csv: str, kriterijumi: Dict[str, str]) -> List[Dict[str, str]]:
-    """Претражује податке на основу критеријума."""
-    podaci = ucitaj_podatke(putanja_do_csv)
-    rezultat = []
-    for knjiga in podaci:
-        odgovara = True
-        for kljuc, vrednost in kriterijumi.items():
-            if vrednost and vrednost.lower() not in knjiga.get(kljuc, "").lower():
-                odgovara = False
-                break
-        if odgovara:
-            rezultat.append(knjiga)
-    return rezultat
+    """
+    Претражује податке на основу критеријума (подниска по колони).
+
+    Поређење не зависи од писма ни дијакритика. Критеријуми се извршавају
+    као упит (види upit): кандидати долазе из најселективнијег индекса.
+    """
+    return upit(putanja_do_csv, kriterijumi)
+
+def upit(putanja_do_csv: str, upit_: Union[Predicate, Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Враћа књиге које задовољавају упит, у редоследу каталога.
+
+    Упит је предикат из query_engine (Contains, Equals, Between, available,
+    комбиновани са &, |, ~) над колонама из KOLONE_UPITA, или речник
+    колона → подниска. За непознате колоне подиже ValueError.
+    """
+    return [dict(red) for red in _indeksi(putanja_do_csv).upiti.execute(upit_)]
+
+def upit_stranica(putanja_do_csv: str, upit_: Union[Predicate, Dict[str, str]],
+                  sortiranje: str = "Редни број", limit: int = VELICINA_STRANICE,
+                  kursor: Optional[str] = None) -> Page:
+    """
+    Враћа једну страницу резултата упита и курсор за следећу (None на крају).
+
+    `sortiranje` је колона из KOLONE_SORTIRANJA, са '-' испред за опадајући
+    редослед. Страница се налази преко сортираног индекса, па страница N
+    не захтева рачунање претходних.
+    """
+    stranica = _indeksi(putanja_do_csv).upiti.page(upit_, sortiranje, limit, kursor)
+    return Page([dict(red) for red in stranica.items], stranica.next_cursor)
+
+def pretraga_stranica(putanja_do_csv: str, kriterijumi: Dict[str, str], sortiranje: str = "Редни број",
+                      limit: int = VELICINA_STRANICE, kursor: Optional[str] = None) -> Page:
+    """Страничи резултате pretraga (подниска по колони)."""
+    return upit_stranica(putanja_do_csv, kriterijumi, sortiranje, limit, kursor)
+
+def pretraga_po_relevantnosti(putanja_do_csv: str, upit_: str, limit: int = 20) -> List[Dict[str, str]]:
+    """
+    Враћа до `limit` књига најрелевантнијих за упит (BM25), од најбоље.
+
+    Речи се пореде по основи (књига/књиге/књигу), а погодак у наслову
+    вреди више од поготка у писцу, серијалу или напомени.
+    """
+    return [dict(red) for red in _rang_kataloga(putanja_do_csv).rang.search(upit_, limit)]
+
+def sesija_pretrage(putanja_do_csv: str, kolone=("Наслов", "Писац")) -> SearchSession:
+    """
+    Враћа сесију за претрагу док се куца по колонама из KOLONE_PRETRAGE.
+
+    Сесија увек ради над тренутним индексом каталога; проширен упит
+    филтрира претходни резултат уместо претраге целог каталога.
+    """
+    return SearchSession(lambda: _indeksi(putanja_do_csv).trigrami, tuple(kolone))
+
+def objasni_upit(putanja_do_csv: str, upit_: Union[Predicate, Dict[str, str]]) -> str:
+    """Враћа план којим би upit био извршен (изабрани индекс и преостали услови)."""
+    return _indeksi(putanja_do_csv).upiti.explain(upit_)
+
+def _indeks_spreman(putanja_do_csv: str):
+    """Враћа индекс CSV фајла ако је важећи и фајл има све обавезне колоне."""
+    indeks = get_csv_index(putanja_do_csv)
+    if not indeks.spreman():
+        return None
+    zaglavlje = indeks.zaglavlje
+    if zaglavlje is None or any(col not in zaglavlje for col in CSV_COLUMNS):
+        return None
+    return indeks
+
+def pronadji_knjigu(putanja_do_csv: str, redni_broj) -> Optional[Dict[str, str]]:
+    """
+    Враћа књигу са датим редним бројем без учитавања целог каталога.
+
+    Ред се чита преко индекса бајт-позиција; док се индекс гради у позадини,
+    каталог се чита ред по ред до пронађене књиге.
+    """
+    indeks = _indeks_spreman(putanja_do_csv)
+    if indeks is not None:
+        return indeks.procitaj_red(redni_broj)
+    return next(iter_podataka(putanja_do_csv, lambda k: k.get("Редни број") == str(redni_broj)), None)
+
+def pronadji_po_naslovu(putanja_do_csv: str, naslov: str) -> Optional[Dict[str, str]]:
+    """Враћа прву књигу са датим насловом (без обзира на велика и мала слова)."""
+    def poklapa(knjiga):
+        return (knjiga.get("Наслов") or "").lower() == naslov.lower()
+
+    indeks = _indeks_spreman(putanja_do_csv)
+    if indeks is not None:
+        return next(filter(poklapa, indeks.pronadji_po_naslovu(naslov)), None)
+    return next(iter_podataka(putanja_do_csv, poklapa), None)
 
 def pretraga_pozajmica(putanja_do_csv: str, naslov: str) -> Optional[Dict[str, str]]:
     """Претражује књиге по наслову да би нашао податке о позајмици."""
-    podaci = ucitaj_podatke(putanja_do_csv)
-    for knjiga in podaci:
-        if knjiga.get("Наслов", "").lower() == naslov.lower():
-            return {k: knjiga.get(k, "Не постоји податак") for k in ["Позајмљена", "Враћена", "Ко је позајмио", "Датум позајмице", "Датум враћања", "Напомена о позајмици"]}
+    knjiga = pronadji_po_naslovu(putanja_do_csv, naslov)
+    if knjiga is not None:
+        return {k: knjiga.get(k, "Не постоји податак") for k in ["Позајмљена", "Враћена", "Ко је позајмио", "Датум позајмице", "Датум враћања", "Напомена о позајмици"]}
     return None
 
-def pozajmi_knjigu(putanja_do_csv: str, naslov: str, ko_pozajmljuje: str, datum_pozajmice=None, datum_vracanja=None, napomena=None) -> bool:
-    """Позајмљује књигу по наслову."""
+def _datum(tekst: Optional[str]) -> Optional[date]:
+    """Датум из колоне каталога (ГГГГ-ММ-ДД), или None ако није исправан."""
+    try:
+        return date.fromisoformat((tekst or "").strip())
+    except ValueError:
+        return None
+
+def dnevnik_pozajmica(putanja_do_csv: str) -> LoanLedger:
+    """
+    Враћа књигу позајмица каталога (loan_ledger.LoanLedger).
+
+    При првом коришћењу, док фајл књиге позајмица не постоји, у њу се
+    преносе позајмице које су отворене према колонама каталога.
+    """
+    dnevnik = get_loan_ledger(putanja_do_csv)
+    if not dnevnik.exists():
+        otvorene = iter_podataka(putanja_do_csv, lambda red: status_reda(red) == POZAJMLJENA and red.get("Редни број"))
+        dnevnik.import_open_loans((red["Редни број"], red.get("Ко је позајмио", ""), _datum(red.get("Датум позајмице")))
+                                  for red in otvorene)
+    return dnevnik
+
+def _uskladi_red(dnevnik: LoanLedger, red: Dict[str, str]) -> None:
+    """Усклађује отворену позајмицу књиге у књизи позајмица са колонама реда."""
+    redni_broj = red.get("Редни број", "")
+    if not redni_broj:
+        return
+    if status_reda(red) == POZAJMLJENA:
+        # Док је књига напољу, у колони "Датум враћања" је рок
+        dnevnik.sync(redni_broj, red.get("Ко је позајмио", ""), _datum(red.get("Датум позајмице")),
+                     _datum(red.get("Датум враћања")), red.get("Напомена о позајмици") or None)
+    else:
+        dnevnik.sync(redni_broj, None,
+                     returned=_datum(red.get("Датум враћања")) if red.get("Враћена") == "Да" else None)
+
+def _zabelezi_u_dnevnik(upis: Callable[[], object]) -> None:
+    """Уписује у књигу позајмица; грешку само бележи, јер је исправља следеће усклађивање."""
+    try:
+        upis()
+    except (OSError, ValueError) as e:
+        logger.exception(f"Greška pri upisu u knjigu pozajmica: {e}")
+
+def _uskladi_dnevnik(dnevnik: LoanLedger, stari: Dict[str, str], novi: Dict[str, str]) -> None:
+    """
+    Преноси промену колона позајмице једне књиге у књигу позајмица.
+
+    Да ли је књига позајмљена увек се чита из каталога, а књига позајмица
+    је историја тог стања. Зато се прво усклађује са претходним стањем реда
+    (које је могло бити промењено преко BookService или ручно у CSV-у), па
+    тек онда бележи нова промена.
+    """
+    def upis():
+        if stari:
+            _uskladi_red(dnevnik, stari)
+        _uskladi_red(dnevnik, novi)
+    _zabelezi_u_dnevnik(upis)
+
+def _upisi_red(putanja_do_csv: str, red: Dict[str, str]) -> bool:
+    """
+    Бележи измену једне књиге као запис у журналу, без преписивања каталога.
+
+    Користи се само у режиму журнала (CSV_JOURNAL_ENABLED); журнал се
+    сажима у CSV када пређе праг.
+    """
+    zurnal = get_journal(putanja_do_csv)
+    stari_potpis = potpis_kataloga(putanja_do_csv)
+    try:
+        zurnal.append_upsert(red)
+    except OSError as e:
+        logger.exception(f"Greška pri upisu u žurnal: {e}")
+        return False
+
+    get_catalog_cache().zameni_red(putanja_do_csv, stari_potpis, red)
+    _azuriraj_indekse(putanja_do_csv, stari_potpis, [red])
+    if zurnal.needs_compaction():
+        return sazmi_zurnal(putanja_do_csv)
+    return True
+
+def _sacuvaj_pozajmicu(putanja_do_csv: str, knjiga: Dict[str, str], izmene: Dict[str, str]) -> bool:
+    """
+    Уписује колоне позајмице у ред књиге нађене по наслову.
+
+    У режиму журнала измена је један запис у журналу; иначе се, као у
+    _sacuvaj_izmene, цео каталог атомски преписује.
+    """
+    redni_broj = knjiga.get("Редни број", "")
+    # Журнал мења први ред са тим редним бројем; ако то није ова књига (дупликати), преписује се каталог
+    if (CSV_JOURNAL_ENABLED and redni_broj and os.path.exists(putanja_do_csv)
+            and pronadji_knjigu(putanja_do_csv, redni_broj) == knjiga):
+        return _upisi_red(putanja_do_csv, {**knjiga, **izmene})
+
     podaci = ucitaj_podatke(putanja_do_csv)
-    for i, knjiga in enumerate(podaci):
-        if knjiga.get("Наслов", "").lower() == naslov.lower():
-            # Провери да ли је књига већ позајмљена
-            if knjiga.get("Позајмљена", "") == "Да" and knjiga.get("Враћена", "") != "Да":
-                logger.error(f"Knjiga '{naslov}' je već pozajmljena.")
+    for red in podaci:
+        if red == knjiga:
+            red.update(izmene)
+            stari_potpis = potpis_kataloga(putanja_do_csv)
+            zaglavlje = procitaj_zaglavlje(putanja_do_csv)
+            if not sacuvaj_podatke(putanja_do_csv, podaci):
                 return False
-                
-            # Постави податке о позајмици
-            podaci[i]["Позајмљена"] = "Да"
-            podaci[i]["Враћена"] = ""
-            podaci[i]["Ко је позајмио"] = ko_pozajmljuje
-            
-            # Додатни подаци
-            if datum_pozajmice:
-                podaci[i]["Датум позајмице"] = datum_pozajmice.strftime("%Y-%m-%d")
-            else:
-                from datetime import date
-                podaci[i]["Датум позајмице"] = date.today().strftime("%Y-%m-%d")
-                
-            if datum_vracanja:
-                podaci[i]["Датум враћања"] = datum_vracanja.strftime("%Y-%m-%d")
-            else:
-                podaci[i]["Датум враћања"] = ""
-                
-            if napomena:
-                podaci[i]["Напомена о позајмици"] = napomena
-            
-            return sacuvaj_podatke(putanja_do_csv, podaci)
-    
-    logger.error(f"Knjiga '{naslov}' nije pronađena.")
+            _azuriraj_posle_prepisivanja(putanja_do_csv, stari_potpis, zaglavlje, [red])
+            return True
     return False
 
+def pozajmi_knjigu(putanja_do_csv: str, naslov: str, ko_pozajmljuje: str, datum_pozajmice=None, datum_vracanja=None, napomena=None) -> bool:
+    """
+    Позајмљује књигу по наслову.
+
+    Да ли је књига позајмљена одлучују колоне каталога, које се ажурирају
+    преко _sacuvaj_pozajmicu; затим се позајмица дописује у књигу позајмица
+    (dnevnik_pozajmica).
+    """
+    knjiga = pronadji_po_naslovu(putanja_do_csv, naslov)
+    if knjiga is None:
+        logger.error(f"Knjiga '{naslov}' nije pronađena.")
+        return False
+
+    if status_reda(knjiga) == POZAJMLJENA:
+        logger.error(f"Knjiga '{naslov}' je već pozajmljena.")
+        return False
+
+    datum_pozajmice = datum_pozajmice or date.today()
+    izmene = {
+        "Позајмљена": "Да",
+        "Враћена": "",
+        "Ко је позајмио": ko_pozajmljuje,
+        "Датум позајмице": datum_pozajmice.strftime("%Y-%m-%d"),
+        "Датум враћања": datum_vracanja.strftime("%Y-%m-%d") if datum_vracanja else "",
+    }
+    if napomena:
+        izmene["Напомена о позајмици"] = napomena
+
+    # Прави се пре измене каталога, да пренос отворених позајмица види претходно стање
+    dnevnik = dnevnik_pozajmica(putanja_do_csv)
+    if not _sacuvaj_pozajmicu(putanja_do_csv, knjiga, izmene):
+        return False
+    _uskladi_dnevnik(dnevnik, knjiga, {**knjiga, **izmene})
+    return True
+
 def vrati_knjigu(putanja_do_csv: str, naslov: str) -> bool:
-    """Враћа позајмљену књигу по наслову."""
-    podaci = ucitaj_podatke(putanja_do_csv)
-    for i, knjiga in enumerate(podaci):
-        if knjiga.get("Наслов", "").lower() == naslov.lower():
-            # Провери да ли је књига позајмљена
-            if knjiga.get("Позајмљена", "") != "Да" or knjiga.get("Враћена", "") == "Да":
-                logger.error(f"Knjiga '{naslov}' nije pozajmljena.")
-                return False
-                
-            # Постави податке о враћању
-            podaci[i]["Враћена"] = "Да"
-            
-            # Додај датум враћања
-            from datetime import date
-            podaci[i]["Датум враћања"] = date.today().strftime("%Y-%m-%d")
-            
-            return sacuvaj_podatke(putanja_do_csv, podaci)
-    
-    logger.error(f"Knjiga '{naslov}' nije pronađena.")
-    return False
+    """Враћа позајмљену књигу по наслову; враћање се дописује у књигу позајмица."""
+    knjiga = pronadji_po_naslovu(putanja_do_csv, naslov)
+    if knjiga is None:
+        logger.error(f"Knjiga '{naslov}' nije pronađena.")
+        return False
+
+    if status_reda(knjiga) != POZAJMLJENA:
+        logger.error(f"Knjiga '{naslov}' nije pozajmljena.")
+        return False
+
+    izmene = {"Враћена": "Да", "Датум враћања": date.today().strftime("%Y-%m-%d")}
+    dnevnik = dnevnik_pozajmica(putanja_do_csv)
+    if not _sacuvaj_pozajmicu(putanja_do_csv, knjiga, izmene):
+        return False
+    _uskladi_dnevnik(dnevnik, knjiga, {**knjiga, **izmene})
+    return True
+
+def pozajmice_citaoca(putanja_do_csv: str, ko: str) -> List[Dict[str, str]]:
+    """
+    Враћа књиге које читалац тренутно држи (без обзира на писмо и велика слова).
+
+    Књиге се налазе преко књиге позајмица, а задржавају се само оне које су
+    и према каталогу позајмљене том читаоцу.
+    """
+    kljuc = borrower_key(ko)
+    knjige = (pronadji_knjigu(putanja_do_csv, pozajmica.book) for pozajmica in dnevnik_pozajmica(putanja_do_csv).held_by(ko))
+    return [knjiga for knjiga in knjige
+            if knjiga is not None and status_reda(knjiga) == POZAJMLJENA
+            and borrower_key(knjiga.get("Ко је позајмио", "")) == kljuc]
+
+def istorija_pozajmica(putanja_do_csv: str, naslov: str) -> List[Loan]:
+    """Враћа све позајмице књиге са датим насловом, од најстарије."""
+    knjiga = pronadji_po_naslovu(putanja_do_csv, naslov)
+    if knjiga is None or not knjiga.get("Редни број"):
+        return []
+    return dnevnik_pozajmica(putanja_do_csv).history(knjiga["Редни број"])
 
 # Иницијализуј глобалне променљиве модула одмах
 inicijalizuj_podatke()
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : analytics.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Аналитика великих каталога над колонама: NumPy када је доступан, иначе чист Python
+
+"""
+Каталог се једном претвара у колоне (кодови категорија, године, заставице
+позајмице), па се груписања, хистограми и топ листе рачунају над њима.
+Оба мотора враћају исте резултате као функције из statistika.py: речници
+категорија су у редоследу првог појављивања, а једнаки бројеви у топ
+листама задржавају тај редослед.
+"""
+
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from catalog_index import to_number
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Колоне које се чувају као кодови категорија
+KATEGORIJSKE_KOLONE = ("Жанр", "Издавач", "Повез", "Серијал")
+
+# Све колоне каталога које аналитика чита
+KOLONE_ANALITIKE = KATEGORIJSKE_KOLONE + ("Писац", "Година издавања", "Позајмљена", "Враћена")
+
+# Највећа година која стаје у int16
+MAX_GODINA = 32767
+
+Kolone = Dict[str, Sequence[Optional[str]]]
+
+
+def _godina(vrednost) -> int:
+    """Година издавања као број, или 0 ако је нема или није исправна."""
+    godina = to_number(vrednost)
+    return godina if godina is not None and 0 < godina <= MAX_GODINA else 0
+
+
+def kolone_iz_redova(redovi: Iterable[Dict[str, str]]) -> Dict[str, List[str]]:
+    """Издваја из редова каталога колоне које аналитика чита (празна вредност уместо None)."""
+    redovi = redovi if isinstance(redovi, list) else list(redovi)
+    return {kolona: [row.get(kolona) or "" for row in redovi] for kolona in KOLONE_ANALITIKE}
+
+
+def _kolona(kolone: Kolone, ime: str, broj: int) -> Sequence[str]:
+    vrednosti = kolone.get(ime)
+    if vrednosti is None:
+        return [""] * broj
+    return [v or "" for v in vrednosti] if None in vrednosti else vrednosti
+
+
+# Вредности колона се много понављају (жанрови, издавачи, писци, године), па
+# се свака различита вредност обрађује (strip, podeli_pisce, to_number) само
+# једном, а по редовима се само броји.
+
+def _prebroj(vrednosti: Sequence[str]) -> Dict[str, int]:
+    """Речник: непразна вредност без размака на крајевима → број, у редоследу првог појављивања."""
+    rez: Dict[str, int] = {}
+    for vrednost, broj in Counter(vrednosti).items():
+        kljuc = vrednost.strip()
+        if kljuc:
+            rez[kljuc] = rez.get(kljuc, 0) + broj
+    return rez
+
+
+def _prebroj_autore(pisci: Sequence[str], podeli_pisce: Callable[[str], List[str]]) -> Dict[str, int]:
+    """Речник: аутор → број књига, у редоследу првог појављивања."""
+    rez: Dict[str, int] = {}
+    for tekst, broj in Counter(pisci).items():
+        for autor in podeli_pisce(tekst):
+            rez[autor] = rez.get(autor, 0) + broj
+    return rez
+
+
+def _prebroj_pozajmice(pozajmljene: Sequence[str], vracene: Sequence[str]) -> int:
+    """Број књига које су позајмљене, а нису враћене."""
+    return sum(broj for (pozajmljena, vracena), broj in Counter(zip(pozajmljene, vracene)).items()
+               if pozajmljena.strip() and not vracena.strip())
+
+
+class _Analitika(ABC):
+    """Заједнички део оба мотора."""
+
+    @classmethod
+    def iz_kolona(cls, kolone: Kolone, podeli_pisce: Callable[[str], List[str]]):
+        """
+        Прави аналитику директно од колона (нпр. из снимка каталога).
+
+        Кључеви су имена колона из KOLONE_ANALITIKE; колона која недостаје
+        је празна, а None вредности су празан текст.
+        """
+        analitika = cls.__new__(cls)
+        broj = max((len(v) for v in kolone.values()), default=0)
+        analitika._postavi({ime: _kolona(kolone, ime, broj) for ime in KOLONE_ANALITIKE}, broj, podeli_pisce)
+        return analitika
+
+    def __init__(self, data: Iterable[Dict[str, str]], podeli_pisce: Callable[[str], List[str]]):
+        kolone = kolone_iz_redova(data)
+        self._postavi(kolone, len(kolone["Писац"]), podeli_pisce)
+
+    @abstractmethod
+    def _postavi(self, kolone: Kolone, broj: int, podeli_pisce: Callable[[str], List[str]]) -> None:
+        """Рачуна колоне мотора од `broj` редова датих по колонама."""
+
+    def statistika(self, top_n: int = 5) -> Dict[str, Any]:
+        """Статистике екрана статистике, исте као statistika.izracunaj_statistiku."""
+        zanrovi = self.grupisi("Жанр")
+        return {
+            "ukupno_knjiga": len(self),
+            "ukupno_autora": self.broj_autora(),
+            "broj_zanrova": len(zanrovi),
+            "broj_serijala": len(self.grupisi("Серијал")),
+            "broj_pozajmica": self.broj_pozajmica(),
+            "knjige_po_zanru": zanrovi,
+            "knjige_po_izdavacu": self.grupisi("Издавач"),
+            "top_autori": self.top_autori(top_n),
+        }
+
+
+class PythonAnalitika(_Analitika):
+    """Аналитика каталога у чистом Python-у: бројачи се рачунају при изградњи."""
+
+    def _postavi(self, kolone: Kolone, broj: int, podeli_pisce: Callable[[str], List[str]]) -> None:
+        self._broj = broj
+        self._grupe = {kolona: _prebroj(kolone[kolona]) for kolona in KATEGORIJSKE_KOLONE}
+        self._autori = _prebroj_autore(kolone["Писац"], podeli_pisce)
+        godine: Dict[int, int] = {}
+        for vrednost, koliko in Counter(kolone["Година издавања"]).items():
+            godina = _godina(vrednost)
+            if godina:
+                godine[godina] = godine.get(godina, 0) + koliko
+        self._godine = dict(sorted(godine.items()))
+        self._pozajmice = _prebroj_pozajmice(kolone["Позајмљена"], kolone["Враћена"])
+
+    def __len__(self) -> int:
+        return self._broj
+
+    def broj_pozajmica(self) -> int:
+        """Број тренутно позајмљених књига."""
+        return self._pozajmice
+
+    def broj_autora(self) -> int:
+        """Број различитих аутора."""
+        return len(self._autori)
+
+    def grupisi(self, kolona: str) -> Dict[str, int]:
+        """Речник: непразна вредност категоријске колоне → број књига."""
+        return dict(self._grupe[kolona])
+
+    def top(self, kolona: str, n: int = 5) -> List[Tuple[str, int]]:
+        """Топ n вредности колоне као (вредност, број књига)."""
+        return sorted(self._grupe[kolona].items(), key=lambda x: x[1], reverse=True)[:n]
+
+    def top_autori(self, n: int = 5) -> List[Tuple[str, int]]:
+        """Топ n аутора као (име, број књига)."""
+        return sorted(self._autori.items(), key=lambda x: x[1], reverse=True)[:n]
+
+    def histogram_godina(self) -> Dict[int, int]:
+        """Речник: година издавања → број књига, по годинама."""
+        return dict(self._godine)
+
+    def po_decenijama(self) -> Dict[int, int]:
+        """Речник: почетак деценије (нпр. 1960) → број књига, по деценијама."""
+        rez: Dict[int, int] = {}
+        for godina, broj in self._godine.items():
+            rez[godina // 10 * 10] = rez.get(godina // 10 * 10, 0) + broj
+        return rez
+
+
+def _kodiraj(vrednosti: Sequence[str], prevedi: Callable[[str], Any], dtype):
+    """
+    Низ кодова колоне: свака различита сирова вредност се преводи само једном.
+
+    Враћа (кодови, речник различитих сирових вредности → превод).
+    """
+    sirove = dict.fromkeys(vrednosti)
+    prevodi = [prevedi(v) for v in sirove]
+    for kod, vrednost in enumerate(sirove):
+        sirove[vrednost] = kod
+    kodovi = np.fromiter(map(sirove.__getitem__, vrednosti), dtype=np.int32, count=len(vrednosti))
+    return np.array(prevodi, dtype=dtype)[kodovi] if prevodi else np.zeros(0, dtype=dtype)
+
+
+class NumpyAnalitika(_Analitika):
+    """
+    Аналитика каталога над NumPy низовима.
+
+    Категорије су int32 кодови (-1 за празно) у редоследу првог појављивања,
+    а године int16 (0 за непознато). Груписања су bincount, а топ листе
+    argpartition уместо сортирања свих вредности.
+    """
+
+    def __init__(self, data: Iterable[Dict[str, str]], podeli_pisce: Callable[[str], List[str]]):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumpyAnalitika захтева NumPy")
+        super().__init__(data, podeli_pisce)
+
+    @classmethod
+    def iz_kolona(cls, kolone: Kolone, podeli_pisce: Callable[[str], List[str]]):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumpyAnalitika захтева NumPy")
+        return super().iz_kolona(kolone, podeli_pisce)
+
+    def _postavi(self, kolone: Kolone, broj: int, podeli_pisce: Callable[[str], List[str]]) -> None:
+        self._vrednosti: Dict[str, List[str]] = {}
+        self._kodovi = {}
+        for kolona in KATEGORIJSKE_KOLONE:
+            # dict чува редослед првог појављивања; празна вредност нема код
+            ociscene = dict.fromkeys(v.strip() for v in dict.fromkeys(kolone[kolona]))
+            ociscene.pop("", None)
+            recnik = {v: kod for kod, v in enumerate(ociscene)}
+            self._vrednosti[kolona] = list(recnik)
+            self._kodovi[kolona] = _kodiraj(kolone[kolona], lambda v: recnik.get(v.strip(), -1), np.int32)
+        autori = _prebroj_autore(kolone["Писац"], podeli_pisce)
+        self._autori = list(autori)
+        self._brojevi_autora = np.fromiter(autori.values(), dtype=np.int64, count=len(autori))
+        self._godine = _kodiraj(kolone["Година издавања"], _godina, np.int16)
+        self._pozajmice = _prebroj_pozajmice(kolone["Позајмљена"], kolone["Враћена"])
+
+    def __len__(self) -> int:
+        return len(self._godine)
+
+    def broj_pozajmica(self) -> int:
+        """Број тренутно позајмљених књига."""
+        return self._pozajmice
+
+    def broj_autora(self) -> int:
+        """Број различитих аутора."""
+        return len(self._autori)
+
+    def _brojevi(self, kolona: str):
+        kodovi = self._kodovi[kolona]
+        return np.bincount(kodovi[kodovi >= 0], minlength=len(self._vrednosti[kolona]))
+
+    def grupisi(self, kolona: str) -> Dict[str, int]:
+        """Речник: непразна вредност категоријске колоне → број књига."""
+        return dict(zip(self._vrednosti[kolona], self._brojevi(kolona).tolist()))
+
+    @staticmethod
+    def _top(vrednosti: List[str], brojevi, n: int) -> List[Tuple[str, int]]:
+        """Топ n по броју; једнаки бројеви по коду, тј. по првом појављивању."""
+        if n <= 0 or not len(brojevi):
+            return []
+        if n < len(brojevi):
+            prag = np.partition(brojevi, len(brojevi) - n)[len(brojevi) - n]
+            iznad = np.flatnonzero(brojevi > prag)
+            jednaki = np.flatnonzero(brojevi == prag)[:n - len(iznad)]
+            izabrani = np.concatenate([iznad, jednaki])
+        else:
+            izabrani = np.arange(len(brojevi))
+        izabrani = izabrani[np.argsort(-brojevi[izabrani], kind='stable')]
+        return [(vrednosti[i], int(brojevi[i])) for i in izabrani.tolist()]
+
+    def top(self, kolona: str, n: int = 5) -> List[Tuple[str, int]]:
+        """Топ n вредности колоне као (вредност, број књига)."""
+        return self._top(self._vrednosti[kolona], self._brojevi(kolona), n)
+
+    def top_autori(self, n: int = 5) -> List[Tuple[str, int]]:
+        """Топ n аутора као (име, број књига)."""
+        return self._top(self._autori, self._brojevi_autora, n)
+
+    def histogram_godina(self) -> Dict[int, int]:
+        """Речник: година издавања → број књига, по годинама."""
+        godine, brojevi = np.unique(self._godine[self._godine > 0], return_counts=True)
+        return dict(zip(godine.tolist(), brojevi.tolist()))
+
+    def po_decenijama(self) -> Dict[int, int]:
+        """Речник: почетак деценије (нпр. 1960) → број књига, по деценијама."""
+        godine = self._godine[self._godine > 0]
+        decenije, brojevi = np.unique(godine // 10 * 10, return_counts=True)
+        return dict(zip(decenije.tolist(), brojevi.tolist()))
+
+
+def napravi_analitiku(data: Iterable[Dict[str, str]], podeli_pisce: Callable[[str], List[str]],
+                      koristi_numpy: Optional[bool] = None):
+    """
+    Враћа NumpyAnalitika када је NumPy доступан, иначе PythonAnalitika.
+
+    Са koristi_numpy=False увек се користи чист Python; са True се подиже
+    ImportError ако NumPy није инсталиран.
+    """
+    if koristi_numpy is None:
+        koristi_numpy = NUMPY_AVAILABLE
+    return NumpyAnalitika(data, podeli_pisce) if koristi_numpy else PythonAnalitika(data, podeli_pisce)
+
+
+def analitika_iz_kolona(kolone: Kolone, podeli_pisce: Callable[[str], List[str]],
+                        koristi_numpy: Optional[bool] = None):
+    """Као napravi_analitiku, али од колона (види _Analitika.iz_kolona)."""
+    if koristi_numpy is None:
+        koristi_numpy = NUMPY_AVAILABLE
+    motor = NumpyAnalitika if koristi_numpy else PythonAnalitika
+    return motor.iz_kolona(kolone, podeli_pisce)
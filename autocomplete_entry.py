@@ -7,12 +7,22 @@
 
 import tkinter as tk
 
+from suggestion_index import MAX_PREDLOGA, SuggestionIndex
+
 class AutocompleteEntry(tk.Entry):
     """
     Класа за поље за унос текста са аутоматским допуњавањем.
+
+    Предлози долазе из SuggestionIndex-а, освежавају се тек када куцање
+    застане KASNJENJE_MS милисекунди, а иста листа се поново користи уместо
+    да се при сваком знаку уништава и прави нова.
     """
-    def __init__(self, lista_vrednosti, *args, **kwargs):
+    # Пауза у куцању после које се освежавају предлози (ms)
+    KASNJENJE_MS = 120
+
+    def __init__(self, lista_vrednosti, *args, max_predloga=MAX_PREDLOGA, **kwargs):
         tk.Entry.__init__(self, *args, **kwargs)
+        self.max_predloga = max_predloga
         self.lista_vrednosti = lista_vrednosti
         self.var = self["textvariable"] if "textvariable" in kwargs else tk.StringVar()
         self["textvariable"] = self.var
@@ -24,40 +34,64 @@ class AutocompleteEntry(tk.Entry):
         
         self.listbox_up = False
         self.listbox = None
+        self._odlozeno = None
+        self._prikazano = []
+
+    @property
+    def lista_vrednosti(self):
+        return self._lista_vrednosti
+
+    @lista_vrednosti.setter
+    def lista_vrednosti(self, vrednosti):
+        """Поставља вредности и гради индекс предлога (поновљене вредности се рангирају више)."""
+        self._lista_vrednosti = list(vrednosti)
+        self._indeks = SuggestionIndex(self._lista_vrednosti)
 
     def changed(self, name, index, mode):
-        """Позива се када се промени текст у пољу."""
-        if self.var.get() == '':
-            if self.listbox_up:
-                self.listbox.destroy()
-                self.listbox_up = False
-        else:
-            words = self.comparison()
-            if words:
-                if not self.listbox_up:
-                    self.listbox = tk.Listbox(width=self["width"], height=min(len(words), 7))
-                    x = self.winfo_rootx()
-                    y = self.winfo_rooty() + self.winfo_height()
-                    self.listbox.place(x=x, y=y)
-                    self.listbox_up = True
-                    self.listbox.bind("<Button-1>", self.selection)
-                    self.listbox.bind("<Return>", self.selection)
-                
-                self.listbox.delete(0, tk.END)
-                for w in words:
-                    self.listbox.insert(tk.END, w)
-            else:
-                if self.listbox_up:
-                    self.listbox.destroy()
-                    self.listbox_up = False
+        """Позива се када се промени текст у пољу; предлоге освежава тек кад куцање застане."""
+        if self._odlozeno is not None:
+            self.after_cancel(self._odlozeno)
+        self._odlozeno = self.after(self.KASNJENJE_MS, self.refresh)
+
+    def refresh(self):
+        """Освежава листу предлога за тренутни текст."""
+        self._odlozeno = None
+        words = self.comparison() if self.var.get() else []
+        if not words:
+            self.hide_listbox()
+            return
+        if self.listbox is None:
+            self.listbox = tk.Listbox(width=self["width"])
+            self.listbox.bind("<Button-1>", self.selection)
+            self.listbox.bind("<Return>", self.selection)
+        if words != self._prikazano:
+            self.listbox.delete(0, tk.END)
+            self.listbox.insert(tk.END, *words)
+            self.listbox.configure(height=min(len(words), 7))
+            self._prikazano = words
+        if not self.listbox_up:
+            x = self.winfo_rootx()
+            y = self.winfo_rooty() + self.winfo_height()
+            self.listbox.place(x=x, y=y)
+            self.listbox_up = True
+
+    def hide_listbox(self):
+        """Скрива листу предлога; листа се чува за следеће предлоге."""
+        if self.listbox_up:
+            self.listbox.place_forget()
+            self.listbox.selection_clear(0, tk.END)
+            self.listbox_up = False
 
     def selection(self, event=None):
         """Позива се када се изабере ставка из листе."""
         if self.listbox_up:
             if self.listbox.curselection():
                 self.var.set(self.listbox.get(self.listbox.curselection()))
-            self.listbox.destroy()
-            self.listbox_up = False
+                # Изабрана вредност не треба поново да отвори листу
+                if self._odlozeno is not None:
+                    self.after_cancel(self._odlozeno)
+                    self._odlozeno = None
+            self.hide_listbox()
             self.icursor(tk.END)
 
     def move_up(self, event=None):
@@ -91,18 +125,16 @@ class AutocompleteEntry(tk.Entry):
                 self.listbox.activate(index)
 
     def comparison(self):
-        """Пореди тренутни текст са листом вредности."""
-        pattern = self.var.get().lower()
-        return [w for w in self.lista_vrednosti if pattern in w.lower()]
+        """Враћа предлоге за тренутни текст, без обзира на писмо."""
+        return self._indeks.suggest(self.var.get(), self.max_predloga)
 
     def on_focus_out(self, event=None):
         """Позива се када поље изгуби фокус."""
         if self.listbox_up:
-            # Дајемо мало времена за клик на листу пре него што је уништимо
+            # Дајемо мало времена за клик на листу пре него што је сакријемо
             self.after(100, self.destroy_if_exists)
 
     def destroy_if_exists(self):
-        """Уништава листу ако још увек постоји."""
-        if self.listbox_up and not self.listbox.winfo_ismapped():
-            self.listbox.destroy()
-            self.listbox_up = False
+        """Скрива листу ако је још увек приказана, а фокус није на њој."""
+        if self.listbox_up and self.focus_get() is not self.listbox:
+            self.hide_listbox()
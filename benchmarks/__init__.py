@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : benchmarks/__init__.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Мерења перформанси за Кућну Библиотеку
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : benchmarks/bench_analytics.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Поређење аналитике каталога у чистом Python-у и над NumPy колонама
+
+"""
+Покретање:
+    python benchmarks/bench_analytics.py --knjige 300000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Biblioteka as bib  # noqa: E402
+from analytics import NUMPY_AVAILABLE, napravi_analitiku  # noqa: E402
+
+
+def napravi_redove(broj, seme=1):
+    """Прави синтетички каталог у облику редова CSV-а"""
+    rng = random.Random(seme)
+    return [
+        {
+            "Редни број": str(i),
+            "Наслов": f"Књига {i}",
+            "Писац": f"Аутор {rng.randint(1, 20000)}" + (f", Аутор {rng.randint(1, 20000)}" if i % 9 == 0 else ""),
+            "Година издавања": str(rng.randint(1900, 2024)) if i % 11 else "",
+            "Жанр": f"Жанр {rng.randint(1, 60)}",
+            "Издавач": f"Издавач {rng.randint(1, 800)}",
+            "Повез": rng.choice(["Тврди повез", "Меки повез", ""]),
+            "Серијал": f"Серијал {i % 3000}" if i % 4 == 0 else "",
+            "Позајмљена": "01.02.2024" if i % 13 == 0 else "",
+            "Враћена": "",
+        }
+        for i in range(1, broj + 1)
+    ]
+
+
+def najbolje_vreme(funkcija, ponavljanja):
+    """Најкраће време од неколико покретања, у милисекундама"""
+    vremena = []
+    for _ in range(ponavljanja):
+        pocetak = time.perf_counter()
+        funkcija()
+        vremena.append(time.perf_counter() - pocetak)
+    return min(vremena) * 1000
+
+
+def svi_upiti(analitika):
+    """Све што приказује екран статистике, плус године"""
+    for kolona in ("Жанр", "Издавач", "Повез", "Серијал"):
+        analitika.grupisi(kolona)
+        analitika.top(kolona, 10)
+    analitika.top_autori(10)
+    analitika.histogram_godina()
+    analitika.po_decenijama()
+    analitika.broj_pozajmica()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--knjige", type=int, default=300000)
+    parser.add_argument("--ponavljanja", type=int, default=3)
+    args = parser.parse_args()
+
+    redovi = napravi_redove(args.knjige)
+    motori = [("Python", False)] + ([("NumPy", True)] if NUMPY_AVAILABLE else [])
+
+    print(f"Каталог: {args.knjige} књига, најбоље од {args.ponavljanja} мерења")
+    print(f"{'Мотор':<10}{'колоне (ms)':>14}{'упити (ms)':>14}")
+    for naziv, koristi_numpy in motori:
+        analitika = napravi_analitiku(redovi, bib.podeli_pisce, koristi_numpy)
+        izgradnja = najbolje_vreme(lambda: napravi_analitiku(redovi, bib.podeli_pisce, koristi_numpy),
+                                   args.ponavljanja)
+        upiti = najbolje_vreme(lambda: svi_upiti(analitika), args.ponavljanja)
+        print(f"{naziv:<10}{izgradnja:>14.1f}{upiti:>14.1f}")
+    if not NUMPY_AVAILABLE:
+        print("NumPy није инсталиран; мерен је само чист Python")
+
+
+if __name__ == "__main__":
+    main()
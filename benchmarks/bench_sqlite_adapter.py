@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : benchmarks/bench_sqlite_adapter.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Поређење трајне SQLite конекције са отварањем нове конекције за сваки позив
+
+"""
+Покретање:
+    python benchmarks/bench_sqlite_adapter.py --knjige 5000 --izmene 200
+"""
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data_adapter import SQLiteDataAdapter  # noqa: E402
+from models import Knjiga  # noqa: E402
+
+
+class PerCallSQLiteAdapter(SQLiteDataAdapter):
+    """Ранији начин рада: нова конекција са подразумеваним подешавањима за сваки позив"""
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path))
+        self._register_functions(conn)
+        return conn
+
+    def close(self) -> None:
+        pass
+
+
+def napravi_knjige(broj):
+    """Прави синтетички каталог"""
+    return [
+        Knjiga(redni_broj=i, naslov=f"Књига {i}", pisac=f"Аутор {i % 500}",
+               godina_izdavanja=1950 + i % 70, zanr=f"Жанр {i % 20}")
+        for i in range(1, broj + 1)
+    ]
+
+
+def izmeri(adapter_cls, putanja, knjige, broj_izmena, broj_ucitavanja):
+    """Мери серију појединачних измена и пуних учитавања"""
+    with adapter_cls(str(putanja)) as adapter:
+        adapter.save_books(knjige)
+        ucitane = adapter.load_books()
+
+        pocetak = time.perf_counter()
+        for i in range(broj_izmena):
+            ucitane[i % len(ucitane)].napomena = f"Измена {i}"
+            adapter.save_books(ucitane)
+        vreme_izmena = time.perf_counter() - pocetak
+
+        pocetak = time.perf_counter()
+        for _ in range(broj_ucitavanja):
+            adapter.load_books()
+        vreme_ucitavanja = time.perf_counter() - pocetak
+
+    return vreme_izmena, vreme_ucitavanja
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--knjige', type=int, default=5000, help='Број књига у каталогу')
+    parser.add_argument('--izmene', type=int, default=200, help='Број појединачних измена')
+    parser.add_argument('--ucitavanja', type=int, default=10, help='Број пуних учитавања')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as direktorijum:
+        rezultati = {}
+        for naziv, adapter_cls in [('по позиву', PerCallSQLiteAdapter), ('трајна', SQLiteDataAdapter)]:
+            putanja = Path(direktorijum) / f"{adapter_cls.__name__}.db"
+            rezultati[naziv] = izmeri(adapter_cls, putanja, napravi_knjige(args.knjige),
+                                      args.izmene, args.ucitavanja)
+
+    print(f"Каталог: {args.knjige} књига, {args.izmene} измена, {args.ucitavanja} учитавања")
+    print(f"{'Конекција':<12}{'измена (ms)':>14}{'учитавање (ms)':>18}")
+    for naziv, (izmene, ucitavanja) in rezultati.items():
+        print(f"{naziv:<12}{izmene / args.izmene * 1000:>14.3f}{ucitavanja / args.ucitavanja * 1000:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : benchmarks/bench_startup.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Време учитавања каталога при покретању: CSV парсирање наспрам бинарног снимка
+
+"""
+Покретање:
+    python benchmarks/bench_startup.py --knjige 50000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Biblioteka as bib  # noqa: E402
+from catalog_cache import get_catalog_cache  # noqa: E402
+from data_adapter import CSVDataAdapter  # noqa: E402
+from models import Knjiga  # noqa: E402
+from snapshot import putanja_snimka  # noqa: E402
+
+
+def napravi_knjige(broj):
+    """Прави синтетички каталог"""
+    return [
+        Knjiga(redni_broj=i, naslov=f"Књига {i}", pisac=f"Аутор {i % 500}",
+               godina_izdavanja=1950 + i % 70, zanr=f"Жанр {i % 20}",
+               izdavaci=f"Издавач {i % 40}", napomena="Потписана" if i % 7 == 0 else None)
+        for i in range(1, broj + 1)
+    ]
+
+
+def najbolje_vreme(funkcija, ponavljanja):
+    """Најкраће време од неколико покретања, у милисекундама"""
+    vremena = []
+    for _ in range(ponavljanja):
+        pocetak = time.perf_counter()
+        funkcija()
+        vremena.append(time.perf_counter() - pocetak)
+    return min(vremena) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--knjige', type=int, default=50000, help='Број књига у каталогу')
+    parser.add_argument('--ponavljanja', type=int, default=3, help='Број мерења за сваки случај')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as direktorijum:
+        putanja = os.path.join(direktorijum, "Biblioteka.csv")
+        adapter = CSVDataAdapter(putanja)
+        adapter.save_books(napravi_knjige(args.knjige))
+        snimak = putanja_snimka(putanja)
+        with open(snimak, 'rb') as f:
+            sadrzaj_snimka = f.read()
+
+        def bez_snimka():
+            if os.path.exists(snimak):
+                os.remove(snimak)
+
+        def sa_snimkom():
+            with open(snimak, 'wb') as f:
+                f.write(sadrzaj_snimka)
+
+        def legacy():
+            get_catalog_cache().ponisti()
+            bib.ucitaj_podatke(putanja)
+
+        rezultati = []
+        for naziv, funkcija in [('Biblioteka.ucitaj_podatke', legacy),
+                                ('CSVDataAdapter.load_books', lambda: CSVDataAdapter(putanja).load_books())]:
+            vremena = []
+            for priprema in (bez_snimka, sa_snimkom):
+                def korak():
+                    priprema()
+                    funkcija()
+                vremena.append(najbolje_vreme(korak, args.ponavljanja))
+            rezultati.append((naziv, *vremena))
+
+    print(f"Каталог: {args.knjige} књига, најбоље од {args.ponavljanja} мерења")
+    print(f"{'Учитавање':<28}{'CSV (ms)':>12}{'снимак (ms)':>14}{'убрзање':>10}")
+    for naziv, csv_ms, snimak_ms in rezultati:
+        print(f"{naziv:<28}{csv_ms:>12.1f}{snimak_ms:>14.1f}{csv_ms / snimak_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,10 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import Biblioteka as bib
 from scrollable_frame import ScrollableFrame
+from itertools import chain, islice
+from query_engine import And, available
+import base64
+import io
 import os
 import json
 from translations import TRANSLATIONS, ICONS
@@ -35,7 +39,6 @@ except ImportError:
     
 try:
     from matplotlib.figure import Figure
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 except ImportError:
     Figure = None
 
@@ -61,10 +64,7 @@ except ImportError:
     pisci = []
 
 # Увоз статистике
-from statistika import (
-    ukupno_knjiga, ukupno_autora, broj_zanrova, broj_serijala, broj_pozajmica,
-    knjige_po_zanru, knjige_po_izdavacu, top_autori
-)
+from stats_cache import get_stats_cache
 
 # Ствара класу Библиотека
 class BibliotekaGUI:
@@ -429,8 +429,13 @@ class BibliotekaGUI:
             self.setup_main_window()
 
     # Додата помоћна функција за приказ у Разгранатом облику са клизачем
-    def create_treeview_with_scrollbar(self, frame, columns, column_widths, tag_config=True):
-        """Креира модеран табеларни приказ са клизачем и напредним стиловима"""
+    def create_treeview_with_scrollbar(self, frame, columns, column_widths, tag_config=True, on_scroll=None):
+        """
+        Креира модеран табеларни приказ са клизачем и напредним стиловима.
+
+        `on_scroll(first, last)` се позива при сваком померању табеле (нпр. за
+        учитавање следеће странице када се приближи крају).
+        """
         # Креирамо оквир за табелу
         table_frame = ttk.LabelFrame(frame, text=self._get_label('books_list'))
         table_frame.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
@@ -461,7 +466,11 @@ class BibliotekaGUI:
         # Додајемо клизаче
         scrollbar_y = ttk.Scrollbar(table_frame, orient="vertical", command=tree.yview)
         scrollbar_x = ttk.Scrollbar(table_frame, orient="horizontal", command=tree.xview)
-        tree.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
+        def yscroll(first, last):
+            scrollbar_y.set(first, last)
+            if on_scroll is not None:
+                on_scroll(float(first), float(last))
+        tree.configure(yscrollcommand=yscroll, xscrollcommand=scrollbar_x.set)
         
         # Постављамо компоненте
         tree.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
@@ -503,12 +512,13 @@ class BibliotekaGUI:
         self.progress_var.set(10)
         self.root.update_idletasks()
         
-        # Учитавамо податке
-        podaci = bib.ucitaj_podatke(self.putanja)
+        # Број књига долази из индекса каталога; табела се пуни страницама,
+        # а ред за детаље се чита по наслову тек када затреба
+        broj = bib.broj_knjiga(self.putanja)
         self.progress_var.set(50)
         self.root.update_idletasks()
         
-        if not podaci:
+        if not broj:
             self.show_progress(False)
             messagebox.showinfo(self._get_label('information'), self._get_label('no_books_found'))
             return
@@ -531,31 +541,60 @@ class BibliotekaGUI:
         title_label.grid(row=0, column=0, sticky="w")
         
         # Додајемо информацију о броју књига
-        count_label = tk.Label(header_frame, text=f"{len(podaci)} {self._get_label('books_found')}", 
+        count_label = tk.Label(header_frame, text=f"{broj} {self._get_label('books_found')}", 
                               font=("Helvetica", 10), 
                               fg="white", bg="#3a7ebf", 
                               padx=10, pady=5)
         count_label.grid(row=0, column=1, sticky="e")
         
+        def podaci_knjige(naslov):
+            knjiga = bib.pronadji_po_naslovu(self.putanja, naslov)
+            return [knjiga] if knjiga is not None else []
+        
         # Дефинишемо колоне и ширине
         columns = ("Наслов", "Писац", "Година издавања", "Доступност")
         column_widths = (250, 180, 120, 120)
         
+        # Табела се пуни страницу по страницу: следећа страница се учитава
+        # тек када се табела помери близу краја
+        # Резултати брзе претраге долазе из сесије претраге као низ који се
+        # такође убацује страницу по страницу
+        stranice = {'upit': And(), 'kursor': None, 'pogoci': None, 'ima_jos': False}
+        sesija = bib.sesija_pretrage(self.putanja, ("Наслов", "Писац"))
+        
+        def ucitaj_stranicu():
+            if stranice['pogoci'] is not None:
+                knjige = list(islice(stranice['pogoci'], bib.VELICINA_STRANICE + 1))
+                stranice['ima_jos'] = len(knjige) > bib.VELICINA_STRANICE
+                knjige = knjige[:bib.VELICINA_STRANICE]
+                if stranice['ima_jos']:
+                    stranice['pogoci'] = chain([knjige.pop()], stranice['pogoci'])
+            else:
+                stranica = bib.upit_stranica(self.putanja, stranice['upit'], kursor=stranice['kursor'])
+                stranice['kursor'] = stranica.next_cursor
+                stranice['ima_jos'] = stranica.next_cursor is not None
+                knjige = stranica.items
+            for knjiga in knjige:
+                dostup = self._compute_availability(knjiga)
+                tag = 'dostupna' if dostup == "Доступна" else 'pozajmljena'
+                tree.insert("", "end", values=(
+                    knjiga.get("Наслов",""), 
+                    knjiga.get("Писац",""), 
+                    knjiga.get("Година издавања",""), 
+                    dostup
+                ), tags=(tag,))
+        
+        def pri_pomeranju(first, last):
+            if last > 0.9 and stranice['ima_jos']:
+                ucitaj_stranicu()
+        
         # Креирамо табеларни приказ са модерним стиловима
-        tree = self.create_treeview_with_scrollbar(frame, columns, column_widths)
+        tree = self.create_treeview_with_scrollbar(frame, columns, column_widths, on_scroll=pri_pomeranju)
         # Постављамо табелу у ред 1, испод наслова
         tree.master.grid(row=1, column=0, sticky="nsew", padx=10, pady=5)
         
-        # Додајемо податке у табелу са одговарајућим таговима за боје
-        for knjiga in podaci:
-            dostup = self._compute_availability(knjiga)
-            tag = 'dostupna' if dostup == "Доступна" else 'pozajmljena'
-            tree.insert("", "end", values=(
-                knjiga.get("Наслов",""), 
-                knjiga.get("Писац",""), 
-                knjiga.get("Година издавања",""), 
-                dostup
-            ), tags=(tag,))
+        # Додајемо прву страницу у табелу
+        ucitaj_stranicu()
         
         # Додајемо панел са филтерима и дугмадима
         control_frame = ttk.LabelFrame(frame, text=self._get_label('options'))
@@ -573,31 +612,29 @@ class BibliotekaGUI:
         search_entry = tk.Entry(search_frame, textvariable=search_var, width=20)
         search_entry.pack(side=tk.LEFT, padx=5)
         
-        # Функција за филтрирање по претрази
-        def filter_by_search(*args):
-            search_text = search_var.get().lower()
-            for item in tree.get_children():
-                values = tree.item(item, 'values')
-                if search_text in values[0].lower() or search_text in values[1].lower():
-                    tree.item(item, tags=tree.item(item, 'tags'))
-                else:
-                    tree.detach(item)  # Сакриј ставку
+        # Приказује књиге које задовољавају текстуалну претрагу и филтер доступности.
+        # Текст се тражи кроз сесију претраге, па сваки нови знак филтрира
+        # претходни резултат; без текста се упит извршава преко индекса каталога
+        def prikazi_filtrirane(*args):
+            search_text = search_var.get().strip()
+            filter_value = filter_var.get()
+            if search_text:
+                pogoci = iter(sesija.search(search_text))
+                if filter_value in ("dostupna", "pozajmljena"):
+                    status = bib.DOSTUPNA if filter_value == "dostupna" else bib.POZAJMLJENA
+                    pogoci = (knjiga for knjiga in pogoci if bib.status_reda(knjiga) == status)
+                stranice['pogoci'] = pogoci
+            else:
+                stranice['pogoci'] = None
+                stranice['upit'] = And(available(filter_value == "dostupna")) \
+                    if filter_value in ("dostupna", "pozajmljena") else And()
             
-            # Ако је поље празно, прикажи све књиге
-            if not search_text:
-                tree.delete(*tree.get_children())
-                for knjiga in podaci:
-                    dostup = self._compute_availability(knjiga)
-                    tag = 'dostupna' if dostup == "Доступна" else 'pozajmljena'
-                    tree.insert("", "end", values=(
-                        knjiga.get("Наслов",""), 
-                        knjiga.get("Писац",""), 
-                        knjiga.get("Година издавања",""), 
-                        dostup
-                    ), tags=(tag,))
+            stranice['kursor'] = None
+            tree.delete(*tree.get_children())
+            ucitaj_stranicu()
         
         # Повезујемо функцију са променом текста у пољу за претрагу
-        search_var.trace("w", filter_by_search)
+        search_var.trace("w", prikazi_filtrirane)
         
         # Додајемо филтер за доступност
         filter_frame = tk.Frame(control_frame)
@@ -610,35 +647,8 @@ class BibliotekaGUI:
                                   width=15, state="readonly")
         filter_combo.pack(side=tk.LEFT, padx=5)
         
-        # Функција за филтрирање по доступности
-        def filter_by_availability(*args):
-            filter_value = filter_var.get()
-            if filter_value == "all":
-                filter_by_search()  # Примени само текстуалну претрагу
-                return
-                
-            # Примени филтер доступности
-            tree.delete(*tree.get_children())
-            for knjiga in podaci:
-                dostup = self._compute_availability(knjiga)
-                tag = 'dostupna' if dostup == "Доступна" else 'pozajmljena'
-                
-                # Провери да ли књига задовољава филтер
-                if (filter_value == "dostupna" and dostup == "Доступна") or \
-                   (filter_value == "pozajmljena" and dostup != "Доступна"):
-                    # Провери и текстуалну претрагу
-                    search_text = search_var.get().lower()
-                    if not search_text or search_text in knjiga.get("Наслов","").lower() or \
-                       search_text in knjiga.get("Писац","").lower():
-                        tree.insert("", "end", values=(
-                            knjiga.get("Наслов",""), 
-                            knjiga.get("Писац",""), 
-                            knjiga.get("Година издавања",""), 
-                            dostup
-                        ), tags=(tag,))
-        
         # Повезујемо функцију са променом вредности у комбо боксу
-        filter_var.trace("w", filter_by_availability)
+        filter_var.trace("w", prikazi_filtrirane)
         
         # Додајемо дугмад за акције
         button_frame = tk.Frame(control_frame)
@@ -655,7 +665,7 @@ class BibliotekaGUI:
             if dostup == "Није доступна":
                 self._show_loan_details(naslov)
             else:
-                self.prikazi_detalje_knjige(naslov, podaci, frame)
+                self.prikazi_detalje_knjige(naslov, podaci_knjige(naslov), frame)
         
         details_btn = ttk.Button(button_frame, text=self._get_label('details'), 
                                command=show_selected_details, style="Modern.TButton")
@@ -672,7 +682,7 @@ class BibliotekaGUI:
                 # Селектујемо ставку
                 tree.selection_set(item)
                 # Приказујемо контекстни мени
-                self._show_context_menu(event, tree, podaci)
+                self._show_context_menu(event, tree, podaci_knjige)
         
         # Повезујемо догађаје
         tree.bind("<Double-1>", on_double)
@@ -685,8 +695,8 @@ class BibliotekaGUI:
         self.show_frame(frame)
 
     # Приказује контекстни мени за књигу
-    def _show_context_menu(self, event, tree, podaci):
-        """Приказује контекстни мени на десни клик."""
+    def _show_context_menu(self, event, tree, podaci_knjige):
+        """Приказује контекстни мени на десни клик; podaci_knjige(naslov) враћа редове за детаље."""
         # Проверавамо да ли је изабрана књига
         sel = tree.selection()
         if not sel:
@@ -699,7 +709,7 @@ class BibliotekaGUI:
         # Креирамо контекстни мени
         context_menu = tk.Menu(self.root, tearoff=0)
         context_menu.add_command(label=self._get_label('edit_book'), command=lambda: self.otvori_izmenu(naslov))
-        context_menu.add_command(label=self._get_label('details'), command=lambda: self.prikazi_detalje_knjige(naslov, podaci, self.current_frame))
+        context_menu.add_command(label=self._get_label('details'), command=lambda: self.prikazi_detalje_knjige(naslov, podaci_knjige(naslov), self.current_frame))
         
         # Приказујемо мени на позицији миша
         try:
@@ -736,8 +746,9 @@ class BibliotekaGUI:
                 try:
                     # Ако је унет наслов, тражимо књигу
                     if naslov_entry.get():
-                        knjiga = next((k for k in bib.ucitaj_podatke(self.putanja)
-                                   if k.get("Наслов", "").lower() == naslov_entry.get().lower()), None)
+                        knjiga = next(bib.iter_podataka(
+                            self.putanja,
+                            lambda k: k.get("Наслов", "").lower() == naslov_entry.get().lower()), None)
                         if not knjiga:
                             print("[DEBUG] Књига није пронађена!")
                             messagebox.showerror(self._get_label('error'), self._get_label('book_not_found'))
@@ -988,7 +999,7 @@ class BibliotekaGUI:
         # Освежавамо листе писаца, жанрова и издавача
         global zanr, izdavac, pisci
         try:
-            podaci = bib.inicijalизуј_podatке(self.putanja)
+            podaci = bib.inicijalizuj_podatke(self.putanja)
             zanr = podaci['zanr']
             izdavac = podaci['izdavac']
             pisci = podaci['pisci']
@@ -1035,8 +1046,7 @@ class BibliotekaGUI:
     
     def pretrazi_po_piscu(self, pisac):
         """Претражује књиге одређеног писца."""
-        kriterijumi = {"Писац": pisac}
-        rezultati = bib.pretraga(self.putanja, kriterijumi)
+        rezultati = bib.pretraga_po_piscu(self.putanja, pisac)
         if rezultati:
             self.prikazi_rezultate(rezultati)
         else:
@@ -1676,28 +1686,16 @@ class BibliotekaGUI:
         
         def load_stats():
             try:
-                # Учитај податке
-                data = bib.ucitaj_podatke(self.putanja)
+                # Статистике из кеша, или учитавање и рачунање у једном пролазу ако се каталог променио
                 self.progress_var.set(30)
-                
-                # Израчунај основне статистике
-                total = ukupno_knjiga(data)
-                authors = ukupno_autora(data, bib.podeli_pisce)
-                genres = broj_zanrova(data)
-                series = broj_serijala(data)
-                loans = broj_pozajmica(data)
-                self.progress_var.set(50)
-                
-                # Израчунај детаљне статистике
-                knjige_zanr = knjige_po_zanru(data)
-                knjige_izdavac = knjige_po_izdavacu(data)
-                top5 = top_autori(data, bib.podeli_pisce)
+                st = bib.statistika_kataloga(self.putanja)
                 self.progress_var.set(70)
                 
                 # Ажурирај UI у главној нити
                 self.root.after(0, lambda: self._display_statistics(
-                    frame, total, authors, genres, series, loans,
-                    knjige_zanr, knjige_izdavac, top5
+                    frame, st["ukupno_knjiga"], st["ukupno_autora"], st["broj_zanrova"],
+                    st["broj_serijala"], st["broj_pozajmica"],
+                    st["knjige_po_zanru"], st["knjige_po_izdavacu"], st["top_autori"]
                 ))
             except Exception as e:
                 self.root.after(0, lambda: self.update_status(f"Грешка при учитавању статистике: {e}", error=True))
@@ -1768,24 +1766,25 @@ class BibliotekaGUI:
             sizes = [total-loans, loans]
             colors = ['#4CAF50', '#FFC107']  # Зелена и жута
             
-            fig = Figure(figsize=(4, 3), dpi=100)
-            ax = fig.add_subplot(111)
-            wedges, texts, autotexts = ax.pie(sizes, labels=None, autopct='%1.1f%%', 
-                                             startangle=90, colors=colors)
-            ax.axis('equal')  # Једнаке пропорције за кружни изглед
-            
-            # Додај легенду
-            ax.legend(wedges, labels_chart, title=self._get_label('status'),
-                     loc="center left", bbox_to_anchor=(0.9, 0, 0.5, 1))
-            
-            # Побољшај изглед текста процената
-            for autotext in autotexts:
-                autotext.set_color('white')
-                autotext.set_fontweight('bold')
+            def nacrtaj_dostupnost():
+                fig = Figure(figsize=(4, 3), dpi=100)
+                ax = fig.add_subplot(111)
+                wedges, texts, autotexts = ax.pie(sizes, labels=None, autopct='%1.1f%%', 
+                                                 startangle=90, colors=colors)
+                ax.axis('equal')  # Једнаке пропорције за кружни изглед
+                
+                # Додај легенду
+                ax.legend(wedges, labels_chart, title=self._get_label('status'),
+                         loc="center left", bbox_to_anchor=(0.9, 0, 0.5, 1))
+                
+                # Побољшај изглед текста процената
+                for autotext in autotexts:
+                    autotext.set_color('white')
+                    autotext.set_fontweight('bold')
+                return fig
             
-            canvas = FigureCanvasTkAgg(fig, master=chart_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+            self._prikazi_grafikon(chart_frame, ('dostupnost', tuple(labels_chart), self._get_label('status'),
+                                                 tuple(sizes)), nacrtaj_dostupnost)
         
         # --- По жанру са графиконом ---
         tab_zanr = ttk.Frame(tab_control)
@@ -1815,29 +1814,31 @@ class BibliotekaGUI:
             labels = [zanr for zanr, _ in top_zanrovi]
             values = [br for _, br in top_zanrovi]
             
-            fig = Figure(figsize=(5, 4), dpi=100)
-            ax = fig.add_subplot(111)
-            bars = ax.bar(labels, values, color='#2196F3')
-            
-            # Додај вредности изнад стубића
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                        f'{int(height)}', ha='center', va='bottom')
-            
-            ax.set_ylabel(self._get_label('book_count'))
-            ax.set_title(self._get_label('top_genres'))
-            fig.tight_layout()
-            
-            # Ротирај лабеле за боље уклапање
-            plt = ax.get_xticklabels()
-            for label in plt:
-                label.set_rotation(45)
-                label.set_ha('right')
+            def nacrtaj_zanrove():
+                fig = Figure(figsize=(5, 4), dpi=100)
+                ax = fig.add_subplot(111)
+                bars = ax.bar(labels, values, color='#2196F3')
+                
+                # Додај вредности изнад стубића
+                for bar in bars:
+                    height = bar.get_height()
+                    ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
+                            f'{int(height)}', ha='center', va='bottom')
+                
+                ax.set_ylabel(self._get_label('book_count'))
+                ax.set_title(self._get_label('top_genres'))
+                fig.tight_layout()
+                
+                # Ротирај лабеле за боље уклапање
+                plt = ax.get_xticklabels()
+                for label in plt:
+                    label.set_rotation(45)
+                    label.set_ha('right')
+                return fig
             
-            canvas = FigureCanvasTkAgg(fig, master=chart_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+            self._prikazi_grafikon(chart_frame, ('zanrovi', self._get_label('book_count'),
+                                                 self._get_label('top_genres'), tuple(top_zanrovi)),
+                                   nacrtaj_zanrove)
         
         # --- По издавачу ---
         tab_izdavac = ttk.Frame(tab_control)
@@ -1877,29 +1878,49 @@ class BibliotekaGUI:
             labels = [autor for autor, _ in top5]
             values = [br for _, br in top5]
             
-            fig = Figure(figsize=(5, 4), dpi=100)
-            ax = fig.add_subplot(111)
-            
-            # Хоризонтални бар график за боље приказивање дугих имена аутора
-            bars = ax.barh(labels, values, color='#9C27B0')  # Љубичаста боја
-            
-            # Додај вредности на крају сваког бара
-            for i, v in enumerate(values):
-                ax.text(v + 0.1, i, str(v), va='center')
-            
-            ax.set_xlabel(self._get_label('book_count'))
-            ax.set_title(self._get_label('top_authors'))
-            fig.tight_layout()
+            def nacrtaj_autore():
+                fig = Figure(figsize=(5, 4), dpi=100)
+                ax = fig.add_subplot(111)
+                
+                # Хоризонтални бар график за боље приказивање дугих имена аутора
+                bars = ax.barh(labels, values, color='#9C27B0')  # Љубичаста боја
+                
+                # Додај вредности на крају сваког бара
+                for i, v in enumerate(values):
+                    ax.text(v + 0.1, i, str(v), va='center')
+                
+                ax.set_xlabel(self._get_label('book_count'))
+                ax.set_title(self._get_label('top_authors'))
+                fig.tight_layout()
+                return fig
             
-            canvas = FigureCanvasTkAgg(fig, master=chart_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+            self._prikazi_grafikon(chart_frame, ('autori', self._get_label('book_count'),
+                                                 self._get_label('top_authors'), tuple(top5)),
+                                   nacrtaj_autore)
         
         # Сакриј прогрес бар и ажурирај статус
         self.progress_var.set(100)
         self.update_status(self._get_label('stats_loaded'))
         self.root.after(500, lambda: self.show_progress(False))
 
+    def _prikazi_grafikon(self, master, kljuc, nacrtaj):
+        """
+        Приказује графикон као слику у `master`.
+
+        PNG слика се узима из кеша статистика док се каталог не промени, па
+        се `nacrtaj` (враћа matplotlib Figure) позива само при првом приказу.
+        """
+        def u_png():
+            buf = io.BytesIO()
+            nacrtaj().savefig(buf, format='png')
+            return buf.getvalue()
+
+        png = get_stats_cache().grafikon(self.putanja, kljuc, u_png)
+        slika = tk.PhotoImage(data=base64.b64encode(png))
+        label = ttk.Label(master, image=slika)
+        label.image = slika  # Чува референцу да слика не нестане
+        label.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
     def _compute_availability(self, knjига):
         """Одређује статус доступности књиге."""
         pos = knjига.get("Позајмљена", "").strip()
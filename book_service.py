@@ -5,30 +5,188 @@
 # @Програм  : Windsurf
 # @Опис     : Модернизовани сервис за управљање књигама
 
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Union
 from datetime import date, datetime
 import re
 
 from models import Knjiga, Pisac, Izdavac, Statistika
-from data_adapter import DataAdapter, CSVDataAdapter, calculate_statistics
+from data_adapter import DataAdapter, CSVDataAdapter
+from catalog_index import CatalogIndex, RangeIndex, SortedIndex, split_values
+from id_allocator import IdAllocator
+from live_statistics import LiveStatistics
+from loan_ledger import LoanLedger, get_loan_ledger
+from ranked_index import RankedIndex
+from search_session import SearchSession
+from query_engine import (QueryEngine, Page, Predicate, And, Or, Contains, available,
+                          KeyPath, FacetPath, TextPath, RangePath, STATUS_FIELD, DOSTUPNA, POZAJMLJENA)
+from transliteration import fold_text
+from trigram_index import TrigramIndex
 from logger import get_logger, log_success, log_error, log_warning
 
 logger = get_logger(__name__)
 
+# Поља са инверзним индексом; издавачи могу бити раздвојени са ;
+BOOK_FACETS = {
+    'pisac': lambda book: [book.pisac],
+    'zanr': lambda book: [book.zanr],
+    'izdavaci': lambda book: split_values(book.izdavaci),
+    'serijal': lambda book: [book.serijal],
+    'kolekcija': lambda book: [book.kolekcija],
+    STATUS_FIELD: lambda book: [POZAJMLJENA if book.je_pozajmljena() else DOSTUPNA],
+}
+
+# Поља која претражује search_books без задатог поља, индексирана триграмима
+SEARCH_FIELDS = {
+    'naslov': lambda book: book.naslov,
+    'pisac': lambda book: book.pisac,
+    'zanr': lambda book: book.zanr,
+    'serijal': lambda book: book.serijal,
+    'izdavaci': lambda book: book.izdavaci,
+    'napomena': lambda book: book.napomena,
+}
+
+# Тежине поља SEARCH_FIELDS при рангираној претрази: погодак у наслову вреди највише
+RANK_BOOSTS = {
+    'naslov': 3.0,
+    'pisac': 2.0,
+    'serijal': 1.5,
+    'zanr': 1.0,
+    'izdavaci': 1.0,
+    'napomena': 0.5,
+}
+
+# Поља по којима query_books може да поставља услове
+QUERY_FIELDS = {
+    'redni_broj': lambda book: book.redni_broj,
+    'naslov': lambda book: book.naslov,
+    'pisac': lambda book: book.pisac,
+    'godina_izdavanja': lambda book: book.godina_izdavanja,
+    'zanr': lambda book: book.zanr,
+    'serijal': lambda book: book.serijal,
+    'kolekcija': lambda book: book.kolekcija,
+    'izdavaci': lambda book: book.izdavaci,
+    'isbn': lambda book: book.isbn,
+    'povez': lambda book: book.povez,
+    'napomena': lambda book: book.napomena,
+    'ko_je_pozajmio': lambda book: book.ko_je_pozajmio,
+    STATUS_FIELD: lambda book: POZAJMLJENA if book.je_pozajmljena() else DOSTUPNA,
+}
+
+# Поља по којима се странице резултата могу сортирати: (вредност, да ли је број)
+SORT_FIELDS = {
+    'redni_broj': (lambda book: book.redni_broj, True),
+    'naslov': (lambda book: book.naslov, False),
+    'pisac': (lambda book: book.pisac, False),
+    'godina_izdavanja': (lambda book: book.godina_izdavanja, True),
+}
+
+# Подразумевана величина странице
+PAGE_SIZE = 100
+
 
 class BookService:
     """Модернизовани сервис за управљање књигама"""
     
-    def __init__(self, data_adapter: Optional[DataAdapter] = None):
+    def __init__(self, data_adapter: Optional[DataAdapter] = None, loan_ledger: Optional[LoanLedger] = None):
         self.data_adapter = data_adapter or CSVDataAdapter()
-        self._books: List[Knjiga] = []
+        # Књига позајмица; за CSV каталог подразумевано она поред фајла
+        if loan_ledger is None and isinstance(self.data_adapter, CSVDataAdapter):
+            loan_ledger = get_loan_ledger(str(self.data_adapter.file_path))
+        self._loan_ledger = loan_ledger
+        # Обрисане књиге остају као None (tombstone) до сажимања листе,
+        # да брисање не помера остале књиге
+        self._books: List[Optional[Knjiga]] = []
+        # Индекс редни број → позиција прве такве књиге у листи
+        self._positions: Dict[int, int] = {}
+        self._tombstones = 0
+        # Да ли листа садржи више књига са истим редним бројем (нпр. из ручно мењаног CSV-а)
+        self._has_duplicates = False
+        # Слободни редни бројеви (празнине после брисања и следећи нови број)
+        self._ids = IdAllocator()
+        # Инверзни индекси по пољима из BOOK_FACETS; кључ је идентитет објекта књиге
+        self._facets = CatalogIndex(BOOK_FACETS)
+        self._text_index = TrigramIndex(SEARCH_FIELDS)
+        self._years = RangeIndex(lambda book: book.godina_izdavanja)
+        self._ranked = RankedIndex(SEARCH_FIELDS, RANK_BOOSTS)
+        # Сортирани индекси за странице резултата
+        self._sorted = {field: SortedIndex(extract, numeric) for field, (extract, numeric) in SORT_FIELDS.items()}
+        # Збирне статистике, ажуриране уз сваку измену
+        self._stats = LiveStatistics()
+        self._indexes = (self._facets, self._text_index, self._years, self._ranked, self._stats,
+                         *self._sorted.values())
+        # Индекси који зависе од стања позајмице
+        self._loan_indexes = (self._facets, self._stats)
+        self._query_engine = QueryEngine(
+            QUERY_FIELDS, self._text_index,
+            paths=[KeyPath('redni_broj', self._keys_for_id), FacetPath(self._facets),
+                   TextPath(self._text_index), RangePath('godina_izdavanja', self._years)],
+            multi_valued=BOOK_FACETS,
+            sorts=self._sorted,
+        )
         self._loaded = False
+        # Да ли у меморији постоје измене које још нису сачуване у извор података
+        self._dirty = False
+    
+    def _mark_changed(self) -> None:
+        """Бележи измену листе књига која још није сачувана"""
+        self._dirty = True
+    
+    def _ledger(self) -> Optional[LoanLedger]:
+        """
+        Враћа књигу позајмица ако се води за овај каталог.
+        
+        Фајл књиге позајмица прави Biblioteka.dnevnik_pozajmica уз пренос
+        отворених позајмица, па се у њу не уписује док не постоји.
+        """
+        ledger = self._loan_ledger
+        return ledger if ledger is not None and ledger.exists() else None
+    
+    def _record_loans(self, write) -> None:
+        """Уписује у књигу позајмица; грешка не поништава измену каталога"""
+        ledger = self._ledger()
+        if ledger is None:
+            return
+        try:
+            write(ledger)
+        except (OSError, ValueError) as e:
+            log_warning(f"Грешка при упису у књигу позајмица: {e}")
+    
+    @staticmethod
+    def _sync_loans(ledger: LoanLedger, *books: Knjiga) -> None:
+        """Усклађује отворене позајмице књига у књизи позајмица са пољима књига, редом"""
+        for book in books:
+            if book.je_pozajmljena():
+                ledger.sync(book.redni_broj, book.ko_je_pozajmio or '', book.datum_pozajmice)
+            else:
+                ledger.sync(book.redni_broj, None, returned=book.datum_vracanja)
+    
+    def _rebuild_index(self) -> None:
+        """Поново гради индекс позиција, уз сажимање обрисаних места"""
+        if self._tombstones:
+            self._books = [book for book in self._books if book is not None]
+            self._tombstones = 0
+        self._positions = {}
+        for i, book in enumerate(self._books):
+            self._positions.setdefault(book.redni_broj, i)
+        self._has_duplicates = len(self._positions) != len(self._books)
+    
+    def _live_books(self) -> List[Knjiga]:
+        """Враћа копију листе књига без обрисаних места"""
+        if not self._tombstones:
+            return self._books.copy()
+        return [book for book in self._books if book is not None]
     
     def load_books(self) -> bool:
         """Учитава књиге из извора података"""
         try:
             self._books = self.data_adapter.load_books()
+            self._tombstones = 0
+            self._rebuild_index()
+            self._ids = IdAllocator.from_ids(self._positions)
+            for index in self._indexes:
+                index.build((id(book), book) for book in self._books)
             self._loaded = True
+            self._dirty = False
             log_success(f"Учитано {len(self._books)} књига")
             return True
         except Exception as e:
@@ -38,8 +196,11 @@ class BookService:
     def save_books(self) -> bool:
         """Чува књиге у извор података"""
         try:
+            if self._tombstones:
+                self._rebuild_index()
             success = self.data_adapter.save_books(self._books)
             if success:
+                self._dirty = False
                 log_success(f"Сачувано {len(self._books)} књига")
             return success
         except Exception as e:
@@ -50,14 +211,12 @@ class BookService:
         """Враћа све књиге"""
         if not self._loaded:
             self.load_books()
-        return self._books.copy()
+        return self._live_books()
     
     def get_book_by_id(self, redni_broj: int) -> Optional[Knjiga]:
         """Враћа књигу по редном броју"""
-        for book in self._books:
-            if book.redni_broj == redni_broj:
-                return book
-        return None
+        position = self._positions.get(redni_broj)
+        return None if position is None else self._books[position]
     
     def add_book(self, book: Knjiga) -> bool:
         """Додаје нову књигу"""
@@ -67,7 +226,12 @@ class BookService:
                 log_error(f"Књига са редним бројем {book.redni_broj} већ постоји")
                 return False
             
+            self._ids.claim(book.redni_broj)
+            self._positions[book.redni_broj] = len(self._books)
             self._books.append(book)
+            for index in self._indexes:
+                index.add(id(book), book)
+            self._mark_changed()
             log_success(f"Додата књига: {book.naslov}")
             return True
         except Exception as e:
@@ -77,15 +241,31 @@ class BookService:
     def update_book(self, redni_broj: int, updated_book: Knjiga) -> bool:
         """Ажурира постојећу књигу"""
         try:
-            for i, book in enumerate(self._books):
-                if book.redni_broj == redni_broj:
-                    updated_book.poslednja_izmena = datetime.now()
-                    self._books[i] = updated_book
-                    log_success(f"Ажурирана књига: {updated_book.naslov}")
-                    return True
+            position = self._positions.get(redni_broj)
+            if position is None:
+                log_error(f"Књига са редним бројем {redni_broj} није пронађена")
+                return False
             
-            log_error(f"Књига са редним бројем {redni_broj} није пронађена")
-            return False
+            updated_book.poslednja_izmena = datetime.now()
+            old_book = self._books[position]
+            for index in self._indexes:
+                index.replace(id(old_book), id(updated_book), updated_book)
+            self._books[position] = updated_book
+            if updated_book.redni_broj != redni_broj:
+                # Промењен редни број мења и индекс; ретко, па се гради поново
+                if updated_book.redni_broj not in self._positions:
+                    self._ids.claim(updated_book.redni_broj)
+                self._rebuild_index()
+                if redni_broj not in self._positions:
+                    self._ids.release(redni_broj)
+                    self._record_loans(lambda ledger: ledger.remove_books([redni_broj]))
+                self._record_loans(lambda ledger: self._sync_loans(ledger, updated_book))
+            else:
+                # Измена може променити и поља позајмице
+                self._record_loans(lambda ledger: self._sync_loans(ledger, old_book, updated_book))
+            self._mark_changed()
+            log_success(f"Ажурирана књига: {updated_book.naslov}")
+            return True
         except Exception as e:
             log_error(f"Грешка при ажурирању књиге: {e}")
             return False
@@ -93,27 +273,55 @@ class BookService:
     def delete_book(self, redni_broj: int) -> bool:
         """Брише књигу"""
         try:
-            for i, book in enumerate(self._books):
-                if book.redni_broj == redni_broj:
-                    deleted_book = self._books.pop(i)
-                    log_success(f"Обрисана књига: {deleted_book.naslov}")
-                    return True
+            position = self._positions.pop(redni_broj, None)
+            if position is None:
+                log_error(f"Књига са редним бројем {redni_broj} није пронађена")
+                return False
             
-            log_error(f"Књига са редним бројем {redni_broj} није пронађена")
-            return False
+            deleted_book = self._books[position]
+            for index in self._indexes:
+                index.remove(id(deleted_book))
+            self._books[position] = None
+            self._tombstones += 1
+            if self._has_duplicates or self._tombstones > len(self._books) // 2:
+                # Следећа књига са истим редним бројем постаје видљива,
+                # а превише празних места се сажима
+                self._rebuild_index()
+            if redni_broj not in self._positions:
+                self._ids.release(redni_broj)
+                # Књига која добије ослобођени број почиње без позајмица
+                self._record_loans(lambda ledger: ledger.remove_books([redni_broj]))
+            self._mark_changed()
+            log_success(f"Обрисана књига: {deleted_book.naslov}")
+            return True
         except Exception as e:
             log_error(f"Грешка при брисању књиге: {e}")
             return False
     
     def search_books(self, query: str, field: Optional[str] = None) -> List[Knjiga]:
-        """Претражује књиге по различитим критеријумима"""
+        """
+        Претражује књиге по различитим критеријумима.
+        
+        Ако адаптер има full-text индекс (SQLite FTS5) и нема несачуваних
+        измена, претрага се извршава у бази: речи се траже као префикси, а
+        текст под наводницима као фраза. У супротном се подниска тражи преко
+        индекса триграма. Поређење не зависи од писма (ћирилица/латиница) ни од
+        дијакритика.
+        """
         if not query.strip():
-            return self._books.copy()
+            return self._live_books()
+        
+        results = self._search_indexed(query, field)
+        if results is None:
+            results = self._text_index.search(query, field)
+        if results is not None:
+            log_success(f"Пронађено {len(results)} књига за претрагу: '{query}'")
+            return results
         
-        query_lower = query.lower().strip()
+        query_lower = fold_text(query).strip()
         results = []
         
-        for book in self._books:
+        for book in self._live_books():
             match = False
             
             if field is None:
@@ -123,12 +331,12 @@ class BookService:
                     book.serijal or '', book.izdavaci or '', 
                     book.napomena or ''
                 ]
-                match = any(query_lower in field.lower() for field in searchable_fields)
+                match = any(query_lower in fold_text(field) for field in searchable_fields)
             else:
                 # Претрага по конкретном пољу
                 field_value = getattr(book, field, '')
                 if field_value:
-                    match = query_lower in str(field_value).lower()
+                    match = query_lower in fold_text(field_value)
             
             if match:
                 results.append(book)
@@ -136,13 +344,51 @@ class BookService:
         log_success(f"Пронађено {len(results)} књига за претрагу: '{query}'")
         return results
     
+    def search_books_ranked(self, query: str, limit: int = 20) -> List[Knjiga]:
+        """
+        Враћа до `limit` књига најрелевантнијих за упит, од најбоље.
+        
+        Речи упита се своде на основу (књига/књиге/књигу) и траже у индексу
+        речи; оцена је BM25 са тежинама поља из RANK_BOOSTS, па поготке у
+        наслову прате погоци у писцу, серијалу и на крају у напомени.
+        """
+        if not self._loaded:
+            self.load_books()
+        results = self._ranked.search(query, limit)
+        log_success(f"Пронађено {len(results)} књига за рангирану претрагу: '{query}'")
+        return results
+    
+    def search_session(self, field: Optional[str] = None) -> SearchSession:
+        """
+        Враћа сесију за претрагу док се куца (по пољу или по свим SEARCH_FIELDS).
+        
+        session.search(query) враћа исто што и search_books без FTS синтаксе,
+        али проширен упит филтрира претходни резултат, а претходни упити се
+        памте; сесија прати измене каталога.
+        """
+        if not self._loaded:
+            self.load_books()
+        return SearchSession(lambda: self._text_index, field)
+    
+    def _search_indexed(self, query: str, field: Optional[str]) -> Optional[List[Knjiga]]:
+        """Претражује преко индекса адаптера, или враћа None ако то није могуће"""
+        search_ids = getattr(self.data_adapter, 'search_ids', None)
+        if search_ids is None or self._dirty:
+            return None
+        
+        ids = search_ids(query, field)
+        if ids is None:
+            return None
+        
+        return [self._books[self._positions[i]] for i in ids if i in self._positions]
+    
     def get_available_books(self) -> List[Knjiga]:
         """Враћа доступне (непозајмљене) књиге"""
-        return [book for book in self._books if not book.je_pozajmljena()]
+        return [book for book in self._live_books() if not book.je_pozajmljena()]
     
     def get_loaned_books(self) -> List[Knjiga]:
         """Враћа позајмљене књиге"""
-        return [book for book in self._books if book.je_pozajmljena()]
+        return [book for book in self._live_books() if book.je_pozajmljena()]
     
     def loan_book(self, redni_broj: int, borrower: str, loan_date: Optional[date] = None) -> bool:
         """Позајмљује књигу"""
@@ -156,7 +402,13 @@ class BookService:
                 log_error(f"Књига '{book.naslov}' је већ позајмљена")
                 return False
             
+            # Књига позајмица се прво усклађује са стањем пре позајмице
+            self._record_loans(lambda ledger: self._sync_loans(ledger, book))
             book.pozajmi_knjigu(borrower, loan_date)
+            for index in self._loan_indexes:
+                index.add(id(book), book)
+            self._record_loans(lambda ledger: self._sync_loans(ledger, book))
+            self._mark_changed()
             log_success(f"Књига '{book.naslov}' позајмљена кориснику {borrower}")
             return True
         except Exception as e:
@@ -176,22 +428,44 @@ class BookService:
                 return False
             
             borrower = book.ko_je_pozajmio
+            self._record_loans(lambda ledger: self._sync_loans(ledger, book))
             book.vrati_knjigu(return_date)
+            for index in self._loan_indexes:
+                index.add(id(book), book)
+            self._record_loans(lambda ledger: self._sync_loans(ledger, book))
+            self._mark_changed()
             log_success(f"Књига '{book.naslov}' враћена од корисника {borrower}")
             return True
         except Exception as e:
             log_error(f"Грешка при враћању књиге: {e}")
             return False
     
-    def get_statistics(self) -> Statistika:
-        """Рачуна и враћа статистике библиотеке"""
-        return calculate_statistics(self._books)
+    def get_statistics(self, verify: bool = False) -> Statistika:
+        """
+        Враћа статистике библиотеке.
+        
+        Статистике се одржавају уз сваку измену, па позив не пролази кроз
+        каталог. Са verify=True се поново рачунају од нуле и пореде са
+        одржаваним (AssertionError ако се разликују), за тестове.
+        """
+        if verify:
+            return self._stats.verify(self._live_books())
+        return self._stats.snapshot()
     
     def get_unique_values(self, field: str) -> List[str]:
-        """Враћа јединствене вредности за дато поље"""
+        """
+        Враћа јединствене вредности за дато поље.
+        
+        Поља из BOOK_FACETS се читају из индекса, без скенирања књига;
+        вредности се враћају у облику из каталога, па различито писмо или
+        величина слова дају различите вредности.
+        """
+        if field in BOOK_FACETS:
+            return self._facets.values(field)
+        
         values = set()
         
-        for book in self._books:
+        for book in self._live_books():
             field_value = getattr(book, field, None)
             if field_value:
                 if field == 'izdavaci' and ';' in field_value:
@@ -202,6 +476,86 @@ class BookService:
         
         return sorted(list(values))
     
+    def get_value_counts(self, field: str) -> Dict[str, int]:
+        """Враћа број књига за сваку вредност поља из BOOK_FACETS"""
+        if field not in BOOK_FACETS:
+            raise ValueError(f"Поље '{field}' нема индекс")
+        return self._facets.counts(field)
+    
+    def find_books(self, **criteria: str) -> List[Knjiga]:
+        """
+        Враћа књиге које тачно имају задате вредности поља (нпр. pisac=..., zanr=...).
+        
+        Поређење не зависи од великих слова; за издаваче је довољно да се
+        вредност поклапа са једним од издавача књиге.
+        """
+        unknown = [field for field in criteria if field not in BOOK_FACETS]
+        if unknown:
+            raise ValueError(f"Поља без индекса: {', '.join(unknown)}")
+        return self._facets.find(criteria)
+    
+    def _keys_for_id(self, redni_broj: Any) -> List[int]:
+        """Кључеви индекса (идентитети објеката) књига са датим редним бројем"""
+        try:
+            redni_broj = int(redni_broj)
+        except (TypeError, ValueError):
+            return []
+        if self._has_duplicates:
+            return [id(book) for book in self._live_books() if book.redni_broj == redni_broj]
+        book = self.get_book_by_id(redni_broj)
+        return [id(book)] if book is not None else []
+    
+    def query_books(self, query: Union[Predicate, Dict[str, str]]) -> List[Knjiga]:
+        """
+        Враћа књиге које задовољавају упит, у редоследу каталога.
+        
+        Упит је предикат из query_engine (Contains, Equals, Between, available,
+        комбиновани са &, |, ~) или речник поље → подниска. Кандидати се
+        узимају из најселективнијег индекса, а остали услови се проверавају
+        само над њима. За поља ван QUERY_FIELDS подиже ValueError.
+        """
+        if not self._loaded:
+            self.load_books()
+        return self._query_engine.execute(query)
+    
+    def explain_query(self, query: Union[Predicate, Dict[str, str]]) -> str:
+        """Враћа план којим би query_books извршио упит"""
+        return self._query_engine.explain(query)
+    
+    def query_books_page(self, query: Union[Predicate, Dict[str, str]], sort: str = 'redni_broj',
+                         limit: int = PAGE_SIZE, cursor: Optional[str] = None) -> Page:
+        """
+        Враћа једну страницу резултата упита и курсор за следећу.
+        
+        `sort` је поље из SORT_FIELDS, са '-' испред за опадајући редослед.
+        Курсор је непрозиран текст из претходне странице; страница се налази
+        преко сортираног индекса, без рачунања претходних страница.
+        """
+        if not self._loaded:
+            self.load_books()
+        return self._query_engine.page(query, sort, limit, cursor)
+    
+    def get_books_page(self, sort: str = 'redni_broj', limit: int = PAGE_SIZE,
+                       cursor: Optional[str] = None) -> Page:
+        """Страничи све књиге (као get_all_books)"""
+        return self.query_books_page(And(), sort, limit, cursor)
+    
+    def get_available_books_page(self, sort: str = 'redni_broj', limit: int = PAGE_SIZE,
+                                 cursor: Optional[str] = None) -> Page:
+        """Страничи доступне књиге (као get_available_books)"""
+        return self.query_books_page(available(), sort, limit, cursor)
+    
+    def search_books_page(self, query: str, field: Optional[str] = None, sort: str = 'redni_broj',
+                          limit: int = PAGE_SIZE, cursor: Optional[str] = None) -> Page:
+        """Страничи резултате претраге подниске (као search_books, без FTS синтаксе)"""
+        if not query.strip():
+            condition = And()
+        elif field is None:
+            condition = Or(*(Contains(name, query) for name in SEARCH_FIELDS))
+        else:
+            condition = Contains(field, query)
+        return self.query_books_page(condition, sort, limit, cursor)
+    
     def get_authors(self) -> List[str]:
         """Враћа листу свих аутора"""
         return self.get_unique_values('pisac')
@@ -235,29 +589,28 @@ class BookService:
         return True
     
     def get_next_available_id(self) -> int:
-        """Враћа следећи доступни редни број"""
-        if not self._books:
-            return 1
-        
-        existing_ids = {book.redni_broj for book in self._books}
-        next_id = 1
-        
-        while next_id in existing_ids:
-            next_id += 1
-        
-        return next_id
+        """Враћа следећи доступни редни број (најмањи који није у употреби)"""
+        return self._ids.peek()
+    
+    def reserve_ids(self, count: int) -> range:
+        """Резервише узастопне редне бројеве за масовни увоз, једним позивом"""
+        return self._ids.allocate_range(count)
     
     def export_to_dict(self) -> List[Dict[str, Any]]:
         """Извози књиге у речник формат за JSON/Excel"""
-        return [book.dict() for book in self._books]
+        return [book.dict() for book in self._live_books()]
     
     def import_from_dict(self, books_data: List[Dict[str, Any]]) -> Tuple[int, int]:
         """Увози књиге из речник формата"""
         imported = 0
         errors = 0
+        # Књиге без редног броја добијају бројеве из једног резервисаног опсега
+        new_ids = iter(self.reserve_ids(sum(1 for book_data in books_data if not book_data.get('redni_broj'))))
         
         for book_data in books_data:
             try:
+                if not book_data.get('redni_broj'):
+                    book_data = {**book_data, 'redni_broj': next(new_ids)}
                 book = Knjiga(**book_data)
                 if self.add_book(book):
                     imported += 1
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : catalog_cache.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Кеш учитаног каталога у меморији, проверава се по mtime/величини/inode фајла
+
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Потпис фајла: (mtime у наносекундама, величина, inode)
+PotpisFajla = Tuple[int, int, int]
+
+# Пратећи фајлови чији садржај улази у учитани каталог (журнал измена)
+PRATECI_FAJLOVI = ('.journal',)
+
+
+def potpis_fajla(putanja: str) -> Optional[PotpisFajla]:
+    """Враћа потпис фајла или None ако фајл не постоји."""
+    try:
+        st = os.stat(putanja)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def potpis_kataloga(putanja: str) -> Optional[Tuple[Optional[PotpisFajla], ...]]:
+    """Враћа потпис CSV фајла заједно са потписима пратећих фајлова."""
+    potpis = potpis_fajla(putanja)
+    if potpis is None:
+        return None
+    return (potpis,) + tuple(potpis_fajla(putanja + ekstenzija) for ekstenzija in PRATECI_FAJLOVI)
+
+
+class CatalogCache:
+    """
+    Кеш парсираних редова каталога по путањи до фајла.
+
+    Редови се поново парсирају само када се промени mtime, величина или inode
+    фајла или неког од пратећих фајлова (журнал измена). Позиваоци увек
+    добијају копије редова, тако да измене у њима не кваре садржај кеша.
+    """
+
+    def __init__(self):
+        self._unosi: Dict[str, Tuple[tuple, List[Dict[str, str]]]] = {}
+        self._lock = threading.RLock()
+        self.pogoci = 0
+        self.promasaji = 0
+
+    @staticmethod
+    def _kljuc(putanja: str) -> str:
+        return os.path.abspath(putanja)
+
+    def ucitaj(self, putanja: str, parser: Callable[[str], List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        """Враћа редове из кеша или их парсира помоћу `parser` ако је фајл измењен."""
+        kljuc = self._kljuc(putanja)
+        potpis = potpis_kataloga(putanja)
+
+        with self._lock:
+            unos = self._unosi.get(kljuc)
+            if potpis is not None and unos is not None and unos[0] == potpis:
+                self.pogoci += 1
+                return [dict(red) for red in unos[1]]
+            self.promasaji += 1
+
+        redovi = parser(putanja)
+
+        with self._lock:
+            if potpis is None:
+                self._unosi.pop(kljuc, None)
+            else:
+                self._unosi[kljuc] = (potpis, [dict(red) for red in redovi])
+        return redovi
+
+    def pogledaj(self, putanja: str) -> Optional[List[Dict[str, str]]]:
+        """Враћа копије редова из кеша ако одговарају фајлу, без парсирања."""
+        potpis = potpis_kataloga(putanja)
+        with self._lock:
+            unos = self._unosi.get(self._kljuc(putanja))
+            if potpis is None or unos is None or unos[0] != potpis:
+                return None
+            self.pogoci += 1
+            return [dict(red) for red in unos[1]]
+
+    def sadrzi(self, putanja: str) -> bool:
+        """Да ли кеш има редове који одговарају фајлу (без копирања редова)."""
+        potpis = potpis_kataloga(putanja)
+        with self._lock:
+            unos = self._unosi.get(self._kljuc(putanja))
+            return potpis is not None and unos is not None and unos[0] == potpis
+
+    def postavi(self, putanja: str, redovi: List[Dict[str, str]]) -> None:
+        """Уписује већ познате редове у кеш (нпр. одмах након чувања фајла)."""
+        potpis = potpis_kataloga(putanja)
+        if potpis is None:
+            return
+        with self._lock:
+            self._unosi[self._kljuc(putanja)] = (potpis, [dict(red) for red in redovi])
+
+    def dopisi_red(self, putanja: str, stari_potpis: Optional[tuple], red: Dict[str, str]) -> None:
+        """
+        Дописује ред у кеш након дописивања на крај фајла.
+
+        Ако кеш није одговарао фајлу пре дописивања, унос се поништава.
+        """
+        kljuc = self._kljuc(putanja)
+        potpis = potpis_kataloga(putanja)
+        with self._lock:
+            unos = self._unosi.get(kljuc)
+            if unos is None or potpis is None or unos[0] != stari_potpis:
+                self._unosi.pop(kljuc, None)
+                return
+            unos[1].append(dict(red))
+            self._unosi[kljuc] = (potpis, unos[1])
+
+    def zameni_red(self, putanja: str, stari_potpis: Optional[tuple], red: Dict[str, str],
+                   kljuc: str = 'Редни број') -> None:
+        """
+        Замењује први ред са истим кључем након уписа измене у журнал.
+
+        Ако кеш није одговарао фајлу пре уписа или таквог реда нема, унос се поништава.
+        """
+        kljuc_kesa = self._kljuc(putanja)
+        potpis = potpis_kataloga(putanja)
+        with self._lock:
+            unos = self._unosi.pop(kljuc_kesa, None)
+            if unos is None or potpis is None or unos[0] != stari_potpis:
+                return
+            redovi = unos[1]
+            for i, postojeci in enumerate(redovi):
+                if postojeci.get(kljuc) == red.get(kljuc):
+                    redovi[i] = dict(red)
+                    self._unosi[kljuc_kesa] = (potpis, redovi)
+                    return
+
+    def ponisti(self, putanja: Optional[str] = None) -> None:
+        """Поништава кеш за дату путању, или цео кеш ако путања није задата."""
+        with self._lock:
+            if putanja is None:
+                self._unosi.clear()
+            else:
+                self._unosi.pop(self._kljuc(putanja), None)
+
+    def statistika(self) -> Dict[str, int]:
+        """Враћа бројаче погодака и промашаја кеша."""
+        with self._lock:
+            return {
+                'pogoci': self.pogoci,
+                'promasaji': self.promasaji,
+                'unosi': len(self._unosi),
+            }
+
+    def resetuj_brojace(self) -> None:
+        """Враћа бројаче погодака и промашаја на нулу."""
+        with self._lock:
+            self.pogoci = 0
+            self.promasaji = 0
+
+
+# Глобална инстанца кеша каталога
+CATALOG_CACHE = None
+
+def get_catalog_cache() -> CatalogCache:
+    """Враћа глобалну инстанцу кеша каталога"""
+    global CATALOG_CACHE
+    if CATALOG_CACHE is None:
+        CATALOG_CACHE = CatalogCache()
+    return CATALOG_CACHE
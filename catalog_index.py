@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : catalog_index.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Индекси каталога: инверзни (писац, жанр, ...), по опсегу и сортирани за страничење
+
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set
+
+from transliteration import fold_text
+
+# Функција која из ставке каталога враћа вредности једног поља
+Izdvajac = Callable[[Any], Iterable[Optional[str]]]
+
+
+def normalize(value: str) -> str:
+    """Кључ за претрагу вредности (без белина на крајевима, независно од писма и величине слова)."""
+    return fold_text(value).strip()
+
+
+def to_number(value: Any) -> Optional[int]:
+    """Враћа целобројну вредност поља (нпр. године "1945."), или None ако је нема."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip().rstrip('.'))
+    except ValueError:
+        return None
+
+
+def split_values(text: Optional[str]) -> List[str]:
+    """Дели вредност са више ставки раздвојених са ';' (писци, издавачи)."""
+    if not text:
+        return []
+    return [part.strip() for part in text.split(';') if part.strip()]
+
+
+class CatalogIndex:
+    """
+    Инверзни индекси над ставкама каталога (књигама или CSV редовима).
+
+    За свако поље индекс чува нормализовану вредност (fold_text) → скуп
+    кључева ставки, па се тачна претрага и фасетни упити извршавају у
+    времену сразмерном резултату. Нормализују се само кључеви за претрагу:
+    различите вредности и бројеви по вредности (values, counts) чувају облик
+    из каталога, па се нпр. "Andrić" и "Андрић" приказују као две вредности.
+    Уз сваку ставку се памте вредности које су индексиране, тако да уклањање
+    ради исправно и када је ставка у међувремену измењена.
+    """
+
+    def __init__(self, fields: Dict[str, Izdvajac]):
+        self.fields = dict(fields)
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Празни индекс."""
+        with self._lock:
+            self._items: Dict[Hashable, Any] = {}
+            self._indexed: Dict[Hashable, Dict[str, List[str]]] = {}
+            # Редослед ставки у каталогу, за враћање резултата истим редом
+            self._order: Dict[Hashable, int] = {}
+            self._next_order = 0
+            self._postings: Dict[str, Dict[str, Set[Hashable]]] = {field: {} for field in self.fields}
+            # Вредности у облику из каталога → скуп кључева ставки, за приказ и бројање
+            self._spellings: Dict[str, Dict[str, Set[Hashable]]] = {field: {} for field in self.fields}
+            self._sorted: Dict[str, Optional[List[str]]] = {field: None for field in self.fields}
+
+    def build(self, items: Iterable[tuple]) -> None:
+        """Поново гради индекс од парова (кључ, ставка) у редоследу каталога."""
+        with self._lock:
+            self.clear()
+            for key, item in items:
+                self.add(key, item)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def _extract(self, item: Any) -> Dict[str, List[str]]:
+        values = {}
+        for field, extractor in self.fields.items():
+            values[field] = [v.strip() for v in extractor(item) if v and v.strip()]
+        return values
+
+    def _link(self, key: Hashable, values: Dict[str, List[str]]) -> None:
+        for field, field_values in values.items():
+            postings = self._postings[field]
+            spellings = self._spellings[field]
+            for value in field_values:
+                postings.setdefault(normalize(value), set()).add(key)
+                if value not in spellings:
+                    spellings[value] = set()
+                    self._sorted[field] = None
+                spellings[value].add(key)
+
+    def _unlink(self, key: Hashable, values: Dict[str, List[str]]) -> None:
+        for field, field_values in values.items():
+            postings = self._postings[field]
+            spellings = self._spellings[field]
+            for value in field_values:
+                norm = normalize(value)
+                keys = postings.get(norm)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del postings[norm]
+                keys = spellings.get(value)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del spellings[value]
+                        self._sorted[field] = None
+
+    def add(self, key: Hashable, item: Any) -> None:
+        """Додаје ставку на крај каталога, или замењује постојећу на истом месту."""
+        self.replace(key, key, item)
+
+    def replace(self, old_key: Hashable, key: Hashable, item: Any) -> None:
+        """Замењује ставку `old_key` новом ставком под кључем `key`, на истом месту у редоследу."""
+        with self._lock:
+            order = self._order.get(old_key)
+            self.remove(old_key)
+            if key != old_key:
+                self.remove(key)
+            if order is None:
+                order = self._next_order
+                self._next_order += 1
+            values = self._extract(item)
+            self._items[key] = item
+            self._indexed[key] = values
+            self._order[key] = order
+            self._link(key, values)
+
+    def remove(self, key: Hashable) -> bool:
+        """Уклања ставку; враћа False ако није била у индексу."""
+        with self._lock:
+            if key not in self._items:
+                return False
+            self._unlink(key, self._indexed.pop(key))
+            del self._items[key]
+            del self._order[key]
+            return True
+
+    def keys(self, field: str, value: str) -> Set[Hashable]:
+        """Враћа кључеве ставки којима поље има дату вредност."""
+        with self._lock:
+            return set(self._postings[field].get(normalize(value), ()))
+
+    def count(self, field: str, value: str) -> int:
+        """Враћа број ставки којима поље има дату вредност."""
+        with self._lock:
+            return len(self._postings[field].get(normalize(value), ()))
+
+    def find(self, criteria: Dict[str, str]) -> List[Any]:
+        """
+        Враћа ставке које имају све задате вредности поља, у редоследу каталога.
+
+        Скупови се пресецају од најмањег, па је цена сразмерна најмањем скупу.
+        """
+        with self._lock:
+            sets = []
+            for field, value in criteria.items():
+                keys = self._postings[field].get(normalize(value))
+                if not keys:
+                    return []
+                sets.append(keys)
+            if not sets:
+                return []
+            sets.sort(key=len)
+            result = set(sets[0])
+            for keys in sets[1:]:
+                result &= keys
+            return [self._items[key] for key in sorted(result, key=self._order.__getitem__)]
+
+    def values(self, field: str) -> List[str]:
+        """Враћа сортиране различите вредности поља, у облику из каталога."""
+        with self._lock:
+            if self._sorted[field] is None:
+                self._sorted[field] = sorted(self._spellings[field])
+            return list(self._sorted[field])
+
+    def counts(self, field: str) -> Dict[str, int]:
+        """Враћа број ставки за сваку различиту вредност поља (у облику из каталога)."""
+        with self._lock:
+            return {value: len(keys) for value, keys in self._spellings[field].items()}
+
+
+class RangeIndex:
+    """
+    Индекс целобројног поља (нпр. године издавања) за упите по опсегу.
+
+    Чува вредност → скуп кључева и сортирану листу различитих вредности, па
+    се опсег налази бисекцијом, а цена зависи од броја различитих вредности
+    у опсегу. Ставке без вредности (to_number враћа None) се не индексирају.
+    """
+
+    def __init__(self, extract: Callable[[Any], Any]):
+        self.extract = extract
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Празни индекс."""
+        with self._lock:
+            self._values: Dict[Hashable, int] = {}
+            self._postings: Dict[int, Set[Hashable]] = {}
+            self._sorted: List[int] = []
+
+    def build(self, items: Iterable[tuple]) -> None:
+        """Поново гради индекс од парова (кључ, ставка)."""
+        with self._lock:
+            self.clear()
+            for key, item in items:
+                self.add(key, item)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, key: Hashable, item: Any) -> None:
+        """Додаје ставку, или замењује постојећу са истим кључем."""
+        self.replace(key, key, item)
+
+    def replace(self, old_key: Hashable, key: Hashable, item: Any) -> None:
+        """Замењује ставку `old_key` новом ставком под кључем `key`."""
+        with self._lock:
+            self.remove(old_key)
+            if key != old_key:
+                self.remove(key)
+            value = to_number(self.extract(item))
+            if value is None:
+                return
+            self._values[key] = value
+            if value not in self._postings:
+                self._postings[value] = set()
+                self._sorted.insert(bisect_left(self._sorted, value), value)
+            self._postings[value].add(key)
+
+    def remove(self, key: Hashable) -> bool:
+        """Уклања ставку; враћа False ако није била у индексу."""
+        with self._lock:
+            value = self._values.pop(key, None)
+            if value is None:
+                return False
+            keys = self._postings[value]
+            keys.discard(key)
+            if not keys:
+                del self._postings[value]
+                del self._sorted[bisect_left(self._sorted, value)]
+            return True
+
+    def _span(self, low: Optional[int], high: Optional[int]) -> List[int]:
+        start = 0 if low is None else bisect_left(self._sorted, low)
+        end = len(self._sorted) if high is None else bisect_right(self._sorted, high)
+        return self._sorted[start:end]
+
+    def count(self, low: Optional[int] = None, high: Optional[int] = None) -> int:
+        """Враћа број ставки са вредношћу у опсегу [low, high] (граница None је отворена)."""
+        with self._lock:
+            return sum(len(self._postings[value]) for value in self._span(low, high))
+
+    def keys(self, low: Optional[int] = None, high: Optional[int] = None) -> Set[Hashable]:
+        """Враћа кључеве ставки са вредношћу у опсегу [low, high]."""
+        with self._lock:
+            result = set()
+            for value in self._span(low, high):
+                result |= self._postings[value]
+            return result
+
+
+class SortedIndex:
+    """
+    Ставке каталога сортиране по једном пољу, за страничење по курсору.
+
+    Уносе чува као сортирану листу (вредност, редослед, кључ); редослед у
+    каталогу разрешава једнаке вредности, па је сваки унос јединствен и
+    страница после курсора се налази бисекцијом, без пролаза кроз
+    претходне странице. Текст се пореди сведен са fold_text, а ставке без
+    вредности су на крају растућег редоследа.
+    """
+
+    def __init__(self, extract: Callable[[Any], Any], numeric: bool = False):
+        self.extract = extract
+        self.numeric = numeric
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Празни индекс."""
+        with self._lock:
+            self._entries: List[tuple] = []
+            self._by_key: Dict[Hashable, tuple] = {}
+            self._order: Dict[Hashable, int] = {}
+            self._next_order = 0
+
+    def build(self, items: Iterable[tuple]) -> None:
+        """Поново гради индекс од парова (кључ, ставка) у редоследу каталога."""
+        with self._lock:
+            self.clear()
+            entries = []
+            for key, item in items:
+                entry = self._make_entry(key, item, self._next_order)
+                self._next_order += 1
+                self._by_key[key] = entry
+                self._order[key] = entry[2]
+                entries.append(entry)
+            entries.sort()
+            self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def sort_value(self, item: Any) -> tuple:
+        """Вредност по којој се ставка сортира: (0, вредност) или (1, празно) када је нема."""
+        value = self.extract(item)
+        if self.numeric:
+            number = to_number(value)
+            return (1, 0) if number is None else (0, number)
+        text = fold_text(value).strip()
+        return (0, text) if text else (1, '')
+
+    def _make_entry(self, key: Hashable, item: Any, order: int) -> tuple:
+        flag, value = self.sort_value(item)
+        return (flag, value, order, key)
+
+    def add(self, key: Hashable, item: Any) -> None:
+        """Додаје ставку на крај каталога, или замењује постојећу на истом месту."""
+        self.replace(key, key, item)
+
+    def replace(self, old_key: Hashable, key: Hashable, item: Any) -> None:
+        """Замењује ставку `old_key` новом ставком под кључем `key`, на истом месту у редоследу."""
+        with self._lock:
+            order = self._order.get(old_key)
+            self.remove(old_key)
+            if key != old_key:
+                self.remove(key)
+            if order is None:
+                order = self._next_order
+                self._next_order += 1
+            entry = self._make_entry(key, item, order)
+            self._by_key[key] = entry
+            self._order[key] = order
+            self._entries.insert(bisect_left(self._entries, entry[:3]), entry)
+
+    def remove(self, key: Hashable) -> bool:
+        """Уклања ставку; враћа False ако није била у индексу."""
+        with self._lock:
+            entry = self._by_key.pop(key, None)
+            if entry is None:
+                return False
+            del self._order[key]
+            del self._entries[bisect_left(self._entries, entry[:3])]
+            return True
+
+    def position(self, key: Hashable) -> tuple:
+        """Враћа позицију ставке у сортирању (вредност и редослед), за курсор."""
+        return self._by_key[key][:3]
+
+    def walk(self, after: Optional[tuple] = None, descending: bool = False) -> Iterator[Hashable]:
+        """
+        Враћа кључеве после позиције `after` (искључиво), у растућем или опадајућем редоследу.
+
+        Листа се не копира, па позивалац плаћа само онолико уноса колико
+        прочита; индекс не треба мењати док се итератор користи.
+        """
+        with self._lock:
+            entries = self._entries
+            if descending:
+                end = len(entries) if after is None else bisect_left(entries, tuple(after))
+                return (entries[i][3] for i in range(end - 1, -1, -1))
+            start = 0 if after is None else bisect_left(entries, (after[0], after[1], after[2] + 1))
+            return (entries[i][3] for i in range(start, len(entries)))
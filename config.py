@@ -64,6 +64,23 @@ CSV_COLUMNS = [
     'Позајмљена', 'Враћена', 'Ко је позајмио'
 ]
 
+# CSV storage settings
+# Чување је атомско (привремени фајл + os.replace), па резервна копија пре
+# сваког чувања више није неопходна
+BACKUP_ON_SAVE = False
+# Број дописаних књига после ког се прави резервна копија
+APPEND_BACKUP_INTERVAL = 25
+# Журнал измена: свака измена се бележи као мали запис уместо преписивања CSV-а
+CSV_JOURNAL_ENABLED = False
+# Праг после ког се журнал сажима назад у CSV
+JOURNAL_MAX_RECORDS = 500
+JOURNAL_MAX_BYTES = 1024 * 1024  # 1MB
+
+# SQLite settings
+SQLITE_CACHE_SIZE_KIB = 16 * 1024  # 16MB кеша страница
+SQLITE_MMAP_SIZE = 64 * 1024 * 1024  # 64MB
+SQLITE_CACHED_STATEMENTS = 256
+
 # Create required directories
 for directory in [DATA_DIR, BACKUP_DIR]:
     if not os.path.exists(directory):
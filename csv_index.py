@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : csv_index.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Индекс бајт-позиција редова CSV каталога за читање појединачних књига преко mmap-а
+
+import csv
+import io
+import json
+import mmap
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from catalog_cache import potpis_fajla
+from csv_journal import KLJUC, OP_UPSERT, CSVJournal, get_journal
+from csv_storage import atomicni_upis
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Верзија формата .idx фајла; индекс друге верзије се гради поново
+VERZIJA_INDEKSA = 1
+
+KOLONA_NASLOVA = 'Наслов'
+
+# Позиција реда у фајлу: (почетак, дужина) у бајтовима
+Pozicija = Tuple[int, int]
+
+
+def putanja_indeksa(putanja_do_csv: str) -> str:
+    """Враћа путању до пратећег .idx фајла."""
+    return f"{putanja_do_csv}.idx"
+
+
+def kljuc_naslova(naslov: str) -> str:
+    """Нормализује наслов за претрагу у индексу."""
+    return naslov.strip().lower()
+
+
+def _granice_redova(mm) -> List[Pozicija]:
+    """
+    Налази бајт-границе CSV записа у фајлу.
+
+    Запис се завршава новим редом ван наводника. Пошто се наводници унутар
+    поља удвостручују, запис је потпун када је број наводника у њему паран.
+    """
+    granice = []
+    kraj_fajla = len(mm)
+    pos = 0
+    while pos < kraj_fajla:
+        pocetak = pos
+        navodnici = 0
+        while True:
+            nl = mm.find(b'\n', pos)
+            kraj = kraj_fajla if nl == -1 else nl + 1
+            navodnici += mm[pos:kraj].count(b'"')
+            pos = kraj
+            if navodnici % 2 == 0 or pos >= kraj_fajla:
+                break
+        granice.append((pocetak, pos - pocetak))
+    return granice
+
+
+class CSVIndex:
+    """
+    Индекс редова CSV каталога по редном броју и нормализованом наслову.
+
+    Индекс чува бајт-позицију и дужину сваког реда и трајно се чува у пратећем
+    .idx фајлу. Појединачни ред се чита из mmap-а фајла и парсира на захтев,
+    без читања остатка каталога. Индекс важи док се не промени mtime,
+    величина или inode CSV фајла; застарео индекс се гради поново у позадини.
+    Журнал измена се примењује на прочитане редове, као и при учитавању.
+    """
+
+    def __init__(self, putanja_do_csv: str, zurnal: Optional[CSVJournal] = None):
+        self.putanja = putanja_do_csv
+        self.putanja_indeksa = putanja_indeksa(putanja_do_csv)
+        self.zurnal = zurnal or get_journal(putanja_do_csv)
+        self._podaci: Optional[Dict[str, Any]] = None
+        self._lock = threading.RLock()
+        self._nit: Optional[threading.Thread] = None
+        # Потпис фајла за који изградња није успела, да се не покушава изнова
+        self._neuspeli_potpis = None
+        # Записи журнала по кључу, памте се уз потпис журнала
+        self._zapisi_zurnala: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        self._potpis_zurnala = None
+
+    # Изградња и учитавање
+
+    def _vazeci(self, podaci: Optional[Dict[str, Any]]) -> bool:
+        if podaci is None or podaci.get('verzija') != VERZIJA_INDEKSA:
+            return False
+        potpis = potpis_fajla(self.putanja)
+        return potpis is not None and podaci.get('potpis') == list(potpis)
+
+    def _ucitaj(self) -> Optional[Dict[str, Any]]:
+        """Враћа важећи индекс из меморије или из .idx фајла."""
+        with self._lock:
+            if self._vazeci(self._podaci):
+                return self._podaci
+            try:
+                with open(self.putanja_indeksa, 'r', encoding='utf-8') as f:
+                    sirovi = json.load(f)
+            except (OSError, ValueError):
+                return None
+            if not self._vazeci(sirovi):
+                return None
+            try:
+                self._podaci = self._napravi_mape(sirovi)
+            except (KeyError, IndexError, TypeError, ValueError):
+                return None
+            return self._podaci
+
+    def spreman(self) -> bool:
+        """
+        Проверава да ли је индекс важећи за тренутни CSV фајл.
+
+        Ако није, покреће изградњу у позадини и враћа False, па позивалац
+        треба да прочита каталог на уобичајен начин.
+        """
+        if self._ucitaj() is not None:
+            return True
+        if potpis_fajla(self.putanja) != self._neuspeli_potpis:
+            self.osvezi_u_pozadini()
+        return False
+
+    @property
+    def zaglavlje(self) -> Optional[List[str]]:
+        """Заглавље CSV фајла из важећег индекса, или None."""
+        podaci = self._ucitaj()
+        return podaci['zaglavlje'] if podaci is not None else None
+
+    def osvezi_u_pozadini(self) -> None:
+        """Покреће изградњу индекса у позадинској нити ако већ није покренута."""
+        with self._lock:
+            if self._nit is not None and self._nit.is_alive():
+                return
+            self._nit = threading.Thread(target=self.izgradi, name="csv-index", daemon=True)
+            self._nit.start()
+
+    def sacekaj(self, timeout: Optional[float] = None) -> None:
+        """Чека да се заврши изградња индекса у позадини."""
+        nit = self._nit
+        if nit is not None:
+            nit.join(timeout)
+
+    def izgradi(self) -> bool:
+        """Гради индекс читањем CSV фајла преко mmap-а и чува га у .idx фајл."""
+        potpis = potpis_fajla(self.putanja)
+        if potpis is None:
+            return False
+
+        try:
+            with open(self.putanja, 'rb') as f:
+                if potpis[1] == 0:
+                    granice, zaglavlje, redovi = [], [], []
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        granice = _granice_redova(mm)
+                        zapisi = [mm[p:p + d].decode('utf-8') for p, d in granice]
+                    zaglavlje = next(csv.reader([zapisi[0]]), []) if zapisi else []
+                    redovi = zapisi[1:]
+        except (OSError, ValueError, UnicodeDecodeError, csv.Error) as e:
+            logger.warning(f"Nije moguće izgraditi indeks za {self.putanja}: {e}")
+            self._neuspeli_potpis = potpis
+            return False
+
+        # Сваки ред индекса: кључ, нормализован наслов и позиција у фајлу
+        kljucevi: List[Optional[str]] = []
+        naslovi: List[Optional[str]] = []
+        pozicije: List[int] = []
+        if KLJUC in zaglavlje:
+            i_kljuca = zaglavlje.index(KLJUC)
+            i_naslova = zaglavlje.index(KOLONA_NASLOVA) if KOLONA_NASLOVA in zaglavlje else len(zaglavlje)
+            # Сваки запис је цео CSV ред, па csv.reader враћа тачно један ред по запису
+            for (pocetak, duzina), vrednosti in zip(granice[1:], csv.reader(redovi)):
+                if not vrednosti:
+                    continue
+                kljucevi.append(vrednosti[i_kljuca] if i_kljuca < len(vrednosti) else None)
+                naslovi.append(kljuc_naslova(vrednosti[i_naslova]) if i_naslova < len(vrednosti) else None)
+                pozicije.extend((pocetak, duzina))
+
+        if potpis_fajla(self.putanja) != potpis:
+            # Фајл је измењен током изградње; индекс би био нетачан
+            return False
+
+        sirovi = {
+            'verzija': VERZIJA_INDEKSA,
+            'potpis': list(potpis),
+            'zaglavlje': zaglavlje,
+            'kljucevi': kljucevi,
+            'naslovi': naslovi,
+            'pozicije': pozicije,
+        }
+        with self._lock:
+            self._podaci = self._napravi_mape(sirovi)
+        try:
+            with atomicni_upis(self.putanja_indeksa) as f:
+                f.write(json.dumps(sirovi, ensure_ascii=False))
+        except OSError as e:
+            # Индекс је само убрзање, па грешка при упису није фатална
+            logger.warning(f"Nije moguće sačuvati indeks: {e}")
+        return True
+
+    @staticmethod
+    def _napravi_mape(sirovi: Dict[str, Any]) -> Dict[str, Any]:
+        """Прави мапу редни број → ред индекса од низова сачуваних у .idx фајлу."""
+        kljucevi = sirovi['kljucevi']
+        if len(sirovi['naslovi']) != len(kljucevi) or len(sirovi['pozicije']) != 2 * len(kljucevi):
+            raise ValueError("Neispravan indeks")
+        podaci = dict(sirovi)
+        # Обрнутим редоследом важи прво појављивање кључа, као при примени журнала
+        podaci['po_broju'] = dict(zip(reversed(kljucevi), range(len(kljucevi) - 1, -1, -1)))
+        # Мапа наслова се прави тек при првој претрази по наслову
+        podaci['po_naslovu'] = None
+        return podaci
+
+    @staticmethod
+    def _pozicija(podaci: Dict[str, Any], i: int) -> Pozicija:
+        pozicije = podaci['pozicije']
+        return (pozicije[2 * i], pozicije[2 * i + 1])
+
+    def _po_naslovu(self, podaci: Dict[str, Any]) -> Dict[str, List[int]]:
+        with self._lock:
+            if podaci['po_naslovu'] is None:
+                po_naslovu: Dict[str, List[int]] = {}
+                for i, naslov in enumerate(podaci['naslovi']):
+                    if naslov is not None:
+                        po_naslovu.setdefault(naslov, []).append(i)
+                podaci['po_naslovu'] = po_naslovu
+            return podaci['po_naslovu']
+
+    def ponisti(self) -> None:
+        """Брише индекс из меморије и са диска."""
+        with self._lock:
+            self._podaci = None
+            try:
+                os.remove(self.putanja_indeksa)
+            except FileNotFoundError:
+                pass
+
+    # Читање редова
+
+    def _podaci_ili_izgradi(self) -> Optional[Dict[str, Any]]:
+        podaci = self._ucitaj()
+        if podaci is None and self.izgradi():
+            podaci = self._ucitaj()
+        return podaci
+
+    def _procitaj(self, zaglavlje: List[str], pozicije: List[Pozicija]) -> List[Dict[str, str]]:
+        """Чита и парсира редове са датих позиција, без читања остатка фајла."""
+        if not pozicije:
+            return []
+        with open(self.putanja, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                tekstovi = [mm[p:p + d].decode('utf-8') for p, d in pozicije]
+        return [next(csv.DictReader(io.StringIO(tekst), fieldnames=zaglavlje)) for tekst in tekstovi]
+
+    def _zapisi_po_kljucu(self) -> Dict[str, List[Tuple[int, Dict[str, Any]]]]:
+        """Враћа записе журнала груписане по кључу."""
+        potpis = potpis_fajla(self.zurnal.path)
+        with self._lock:
+            if potpis != self._potpis_zurnala:
+                zapisi: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+                if potpis is not None:
+                    for i, zapis in enumerate(self.zurnal.read_records()):
+                        if zapis['op'] == OP_UPSERT:
+                            kljuc = str(zapis['red'].get(KLJUC, ''))
+                        else:
+                            kljuc = zapis['kljuc']
+                        zapisi.setdefault(kljuc, []).append((i, zapis))
+                self._zapisi_zurnala = zapisi
+                self._potpis_zurnala = potpis
+            return self._zapisi_zurnala
+
+    def procitaj_red(self, redni_broj) -> Optional[Dict[str, str]]:
+        """Враћа ред са датим редним бројем, или None ако не постоји."""
+        podaci = self._podaci_ili_izgradi()
+        if podaci is None:
+            return None
+
+        kljuc = str(redni_broj)
+        i = podaci['po_broju'].get(kljuc)
+        osnovni = self._procitaj(podaci['zaglavlje'], [self._pozicija(podaci, i)])[0] if i is not None else None
+
+        zapisi = self._zapisi_po_kljucu().get(kljuc)
+        if not zapisi:
+            return osnovni
+        opstaje, vrednost, dopisan = CSVJournal.final_state(zapisi, in_base=osnovni is not None)
+        if opstaje:
+            return dict(vrednost) if vrednost is not None else osnovni
+        return dict(dopisan[1]) if dopisan is not None else None
+
+    def pronadji_po_naslovu(self, naslov: str) -> List[Dict[str, str]]:
+        """
+        Враћа редове чији се нормализовани наслов поклапа са `naslov`.
+
+        Редослед је исти као у учитаном каталогу: прво редови из CSV фајла по
+        позицији, па књиге које је журнал дописао на крај.
+        """
+        podaci = self._podaci_ili_izgradi()
+        if podaci is None:
+            return []
+
+        trazeni = kljuc_naslova(naslov)
+        zapisi = self._zapisi_po_kljucu()
+        po_broju = podaci['po_broju']
+
+        # (0, ред индекса) за редове из CSV-а, (1, редни број записа) за дописане
+        pronadjeni: List[Tuple[Tuple[int, int], Dict[str, str]]] = []
+        redovi_indeksa = self._po_naslovu(podaci).get(trazeni, [])
+        pozicije = [self._pozicija(podaci, i) for i in redovi_indeksa]
+        for i, red in zip(redovi_indeksa, self._procitaj(podaci['zaglavlje'], pozicije)):
+            kljuc = red.get(KLJUC, '')
+            if kljuc in zapisi and po_broju.get(kljuc) == i:
+                # Ред је мењан кроз журнал; обрађује се у наставку
+                continue
+            pronadjeni.append(((0, i), red))
+
+        for kljuc, zapisi_kljuca in zapisi.items():
+            i = po_broju.get(kljuc)
+            opstaje, vrednost, dopisan = CSVJournal.final_state(zapisi_kljuca, in_base=i is not None)
+            if opstaje:
+                if vrednost is None:
+                    vrednost = self._procitaj(podaci['zaglavlje'], [self._pozicija(podaci, i)])[0]
+                mesto, red = (0, i), vrednost
+            elif dopisan is not None:
+                mesto, red = (1, dopisan[0]), dopisan[1]
+            else:
+                continue
+            if kljuc_naslova(red.get(KOLONA_NASLOVA) or '') == trazeni:
+                pronadjeni.append((mesto, dict(red)))
+
+        pronadjeni.sort(key=lambda stavka: stavka[0])
+        return [red for _, red in pronadjeni]
+
+
+# Инстанце индекса по путањи CSV фајла
+_INDEKSI: Dict[str, CSVIndex] = {}
+_INDEKSI_LOCK = threading.Lock()
+
+def get_csv_index(putanja_do_csv: str) -> CSVIndex:
+    """Враћа заједничку инстанцу индекса за дати CSV фајл"""
+    kljuc = os.path.abspath(putanja_do_csv)
+    with _INDEKSI_LOCK:
+        if kljuc not in _INDEKSI:
+            _INDEKSI[kljuc] = CSVIndex(putanja_do_csv)
+        return _INDEKSI[kljuc]
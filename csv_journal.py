@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : csv_journal.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Журнал измена (write-ahead log) за CSV каталог са периодичним сажимањем
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from catalog_cache import potpis_fajla
+from config import JOURNAL_MAX_RECORDS, JOURNAL_MAX_BYTES
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Колона по којој журнал препознаје књигу
+KLJUC = 'Редни број'
+
+# Операције у журналу
+OP_UPSERT = 'upsert'
+OP_DELETE = 'delete'
+
+
+def journal_path(csv_path: str) -> str:
+    """Враћа путању до журнала за дати CSV фајл."""
+    return f"{csv_path}.journal"
+
+
+class CSVJournal:
+    """
+    Журнал измена над CSV каталогом.
+
+    Свака измена је један JSON ред који се одмах fsync-ује на диск, тако да
+    измена кошта O(1) без обзира на величину каталога. При учитавању се журнал
+    примењује преко основног CSV фајла, а сажимање га враћа у CSV.
+    """
+
+    def __init__(self, csv_path: str, max_records: int = JOURNAL_MAX_RECORDS,
+                 max_bytes: int = JOURNAL_MAX_BYTES):
+        self.csv_path = csv_path
+        self.path = journal_path(csv_path)
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Број записа се памти уз потпис фајла да се журнал не би пребројавао
+        self._count: Optional[int] = None
+        self._count_signature = None
+
+    def append_upsert(self, row: Dict[str, str]) -> None:
+        """Бележи додавање или измену реда (цео ред после измене)."""
+        self._append({'op': OP_UPSERT, 'red': row})
+
+    def append_delete(self, key: str) -> None:
+        """Бележи брисање реда са датим редним бројем."""
+        self._append({'op': OP_DELETE, 'kljuc': str(key)})
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            count = self.record_count()
+            with open(self.path, 'a+b') as f:
+                # Ако је претходни упис прекинут, нови запис почиње у новом реду
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        f.write(b'\n')
+                f.write(line.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            self._count = count + 1
+            self._count_signature = potpis_fajla(self.path)
+
+    def read_records(self) -> List[Dict[str, Any]]:
+        """Чита записе из журнала, прескачући непотпуне или оштећене редове."""
+        records = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line_num, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Preskočen oštećen zapis {line_num} u žurnalu {self.path}")
+                        continue
+                    if record.get('op') in (OP_UPSERT, OP_DELETE):
+                        records.append(record)
+        except FileNotFoundError:
+            pass
+        return records
+
+    def replay(self, rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Примењује записе из журнала на редове основног CSV фајла."""
+        return list(self.iter_replay(rows))
+
+    def iter_replay(self, rows: Iterable[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+        """
+        Примењује журнал на ток редова основног CSV фајла, ред по ред.
+
+        Журнал је мали (ограничен прагом сажимања), па се унапред своди на
+        коначно стање сваког кључа. Редови из CSV-а се затим пропуштају један
+        по један, а нове књиге из журнала се дописују на крају. Редослед је
+        исти као да се журнал примењује запис по запис на целу листу.
+        """
+        records = self.read_records()
+        if not records:
+            yield from rows
+            return
+
+        ops: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        for i, record in enumerate(records):
+            if record['op'] == OP_UPSERT:
+                key = str(record['red'].get(KLJUC, ''))
+            else:
+                key = record['kljuc']
+            ops.setdefault(key, []).append((i, record))
+
+        seen = set()
+        for row in rows:
+            key = row.get(KLJUC, '')
+            if key in ops and key not in seen:
+                seen.add(key)
+                alive, value, _ = self.final_state(ops[key], in_base=True)
+                if alive:
+                    yield value if value is not None else row
+            else:
+                yield row
+
+        appended = []
+        for key, key_ops in ops.items():
+            _, _, tail = self.final_state(key_ops, in_base=key in seen)
+            if tail is not None:
+                appended.append(tail)
+        appended.sort(key=lambda item: item[0])
+        for _, row in appended:
+            yield row
+
+    @staticmethod
+    def final_state(key_ops: List[Tuple[int, Dict[str, Any]]], in_base: bool):
+        """
+        Своди записе једног кључа на коначно стање.
+
+        Враћа (да ли ред из CSV-а опстаје, његова нова вредност или None ако
+        није мењан, (редни број записа, ред) дописан на крају или None).
+        """
+        alive = in_base
+        value = None
+        tail = None
+        for i, record in key_ops:
+            if record['op'] == OP_UPSERT:
+                if alive:
+                    value = record['red']
+                elif tail is not None:
+                    tail = (tail[0], record['red'])
+                else:
+                    tail = (i, record['red'])
+            elif alive:
+                alive = False
+            else:
+                tail = None
+        return alive, value, tail
+
+    def record_count(self) -> int:
+        """Враћа број записа у журналу."""
+        signature = potpis_fajla(self.path)
+        if signature is None:
+            return 0
+        if self._count is None or signature != self._count_signature:
+            self._count = len(self.read_records())
+            self._count_signature = signature
+        return self._count
+
+    def needs_compaction(self) -> bool:
+        """Проверава да ли је журнал прешао праг броја записа или величине."""
+        signature = potpis_fajla(self.path)
+        if signature is None:
+            return False
+        return signature[1] >= self.max_bytes or self.record_count() >= self.max_records
+
+    def clear(self) -> None:
+        """Брише журнал након што је његов садржај сачуван у CSV фајл."""
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self._count = None
+            self._count_signature = None
+
+
+# Инстанце журнала по путањи CSV фајла
+_JOURNALS: Dict[str, CSVJournal] = {}
+_JOURNALS_LOCK = threading.Lock()
+
+def get_journal(csv_path: str) -> CSVJournal:
+    """Враћа заједничку инстанцу журнала за дати CSV фајл"""
+    key = os.path.abspath(csv_path)
+    with _JOURNALS_LOCK:
+        if key not in _JOURNALS:
+            _JOURNALS[key] = CSVJournal(csv_path)
+        return _JOURNALS[key]
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : csv_storage.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Помоћне функције ниског нивоа за упис у CSV каталог и пратећи .meta фајл
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+from catalog_cache import potpis_kataloga
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Завршетак реда који користи csv.DictWriter
+KRAJ_REDA = '\r\n'
+
+
+def procitaj_zaglavlje(putanja_do_csv: str) -> Optional[List[str]]:
+    """Чита само заглавље CSV фајла, без парсирања остатка."""
+    try:
+        with open(putanja_do_csv, 'r', newline='', encoding='utf-8') as csvfile:
+            return next(csv.reader(csvfile), None)
+    except (OSError, UnicodeDecodeError, csv.Error):
+        return None
+
+
+def dodaj_red(putanja_do_csv: str, fieldnames: List[str], red: Dict[str, str]) -> None:
+    """Дописује један исправно цитиран CSV ред на крај фајла."""
+    with open(putanja_do_csv, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            nedostaje_kraj_reda = f.read(1) not in (b'\n', b'\r')
+        else:
+            nedostaje_kraj_reda = False
+
+    with open(putanja_do_csv, 'a', newline='', encoding='utf-8') as csvfile:
+        if nedostaje_kraj_reda:
+            csvfile.write(KRAJ_REDA)
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, lineterminator=KRAJ_REDA)
+        writer.writerow(red)
+        csvfile.flush()
+        os.fsync(csvfile.fileno())
+
+
+@contextmanager
+def atomicni_upis(putanja: str, encoding: str = 'utf-8', newline: str = '',
+                  binarno: bool = False) -> Iterator[IO]:
+    """
+    Отвара привремени фајл који на крају атомски замењује `putanja`.
+
+    Садржај се пише у привремени фајл у истом директоријуму, који се затим
+    fsync-ује и преко os.replace замењује циљни фајл, па се fsync-ује и сам
+    директоријум. Прекид у било ком тренутку оставља или стари или нови фајл,
+    никада окрњен. Ако упис баци изузетак, циљни фајл остаје нетакнут.
+    Са `binarno=True` фајл се отвара у бинарном режиму.
+    """
+    direktorijum = os.path.dirname(os.path.abspath(putanja))
+    fd, privremena = tempfile.mkstemp(
+        prefix=f".{os.path.basename(putanja)}.", suffix='.tmp', dir=direktorijum
+    )
+    try:
+        if binarno:
+            f = os.fdopen(fd, 'wb')
+        else:
+            f = os.fdopen(fd, 'w', encoding=encoding, newline=newline)
+        with f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(putanja):
+            # Задржавамо дозволе постојећег фајла (mkstemp прави фајл са 0600)
+            shutil.copymode(putanja, privremena)
+        os.replace(privremena, putanja)
+    except BaseException:
+        try:
+            os.remove(privremena)
+        except OSError:
+            pass
+        raise
+    _fsync_direktorijuma(direktorijum)
+
+
+def _fsync_direktorijuma(direktorijum: str) -> None:
+    """Fsync-ује директоријум да би преименовање преживело нестанак струје."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        # Windows не подржава отварање директоријума
+        return
+    try:
+        fd = os.open(direktorijum, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def putanja_meta(putanja_do_csv: str) -> str:
+    """Враћа путању до пратећег .meta фајла."""
+    return f"{putanja_do_csv}.meta"
+
+
+def ucitaj_meta(putanja_do_csv: str, samo_vazeci: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Учитава пратећи .meta фајл.
+
+    Враћа None ако фајл не постоји, није исправан или не одговара
+    тренутном стању каталога (CSV или журнал су мењани мимо дописивања).
+    Са samo_vazeci=False враћа и застарео .meta.
+    """
+    try:
+        with open(putanja_meta(putanja_do_csv), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not samo_vazeci:
+        return meta if isinstance(meta, dict) else None
+
+    potpis = potpis_kataloga(putanja_do_csv)
+    # Потпис се пореди у облику у ком је сачуван у JSON-у
+    if potpis is None or meta.get('potpis') != json.loads(json.dumps(potpis)):
+        return None
+    return meta
+
+
+def sacuvaj_meta(putanja_do_csv: str, meta: Dict[str, Any]) -> None:
+    """Чува .meta фајл везан за тренутни потпис каталога."""
+    meta = dict(meta)
+    meta['potpis'] = potpis_kataloga(putanja_do_csv)
+    try:
+        with open(putanja_meta(putanja_do_csv), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+    except OSError as e:
+        # .meta је само убрзање, па грешка при упису није фатална
+        logger.warning(f"Nije moguće sačuvati meta fajl: {e}")
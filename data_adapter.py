@@ -6,16 +6,27 @@
 # @Опис     : Модернизовани адаптер за рад са подацима (CSV/SQLite)
 
 import csv
+import re
 import sqlite3
 import json
+import threading
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Union
+from itertools import islice
+from typing import Callable, Iterator, List, Dict, Optional, Union
 from pathlib import Path
 from datetime import datetime
 
 from models import Knjiga, Pisac, Izdavac, Statistika
 from logger import get_logger, log_success, log_error, log_warning
-from config import CSV_COLUMNS, DEFAULT_DB_PATH
+from config import (
+    CSV_COLUMNS, DEFAULT_DB_PATH, CSV_JOURNAL_ENABLED, BACKUP_ON_SAVE,
+    SQLITE_CACHE_SIZE_KIB, SQLITE_MMAP_SIZE, SQLITE_CACHED_STATEMENTS
+)
+from catalog_cache import potpis_fajla
+from csv_storage import atomicni_upis
+from csv_journal import get_journal
+from snapshot import sacuvaj_snimak, ucitaj_snimak
+from transliteration import FOLD_SQL_STEPS, fold_sql, fold_text
 
 logger = get_logger(__name__)
 
@@ -37,18 +48,47 @@ class DataAdapter(ABC):
     def backup_data(self) -> bool:
         """Прави резервну копију података"""
         pass
+    
+    def iter_books(self, predicate: Optional[Callable[[Knjiga], bool]] = None) -> Iterator[Knjiga]:
+        """
+        Враћа књиге једну по једну, опционо само оне које задовољавају `predicate`.
+        
+        Подразумевана имплементација учитава све књиге; адаптери је
+        преклапају тако да књиге стижу док се извор још чита.
+        """
+        for book in self.load_books():
+            if predicate is None or predicate(book):
+                yield book
+    
+    def iter_book_batches(self, batch_size: int = 500,
+                          predicate: Optional[Callable[[Knjiga], bool]] = None) -> Iterator[List[Knjiga]]:
+        """Враћа књиге у групама од највише `batch_size` књига"""
+        if batch_size < 1:
+            raise ValueError("Величина групе мора бити позитивна")
+        books = self.iter_books(predicate)
+        while True:
+            batch = list(islice(books, batch_size))
+            if not batch:
+                return
+            yield batch
 
 
 class CSVDataAdapter(DataAdapter):
     """Модернизовани CSV адаптер са Pydantic моделима"""
     
-    def __init__(self, file_path: str = DEFAULT_DB_PATH):
+    def __init__(self, file_path: str = DEFAULT_DB_PATH, use_journal: bool = CSV_JOURNAL_ENABLED,
+                 backup_on_save: bool = BACKUP_ON_SAVE):
         self.file_path = Path(file_path)
         self.backup_dir = self.file_path.parent / "backups"
         self.backup_dir.mkdir(exist_ok=True)
+        self.use_journal = use_journal
+        self.backup_on_save = backup_on_save
+        self.journal = get_journal(str(self.file_path))
+        # CSV редови последњег учитаног/сачуваног стања, по редном броју
+        self._persisted_rows: Optional[Dict[str, Dict[str, str]]] = None
     
     def load_books(self) -> List[Knjiga]:
-        """Учитава књиге из CSV фајла"""
+        """Учитава књиге из CSV фајла (са примењеним журналом измена)"""
         books = []
         
         if not self.file_path.exists():
@@ -56,19 +96,10 @@ class CSVDataAdapter(DataAdapter):
             return books
         
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                
-                for row_num, row in enumerate(reader, start=2):
-                    try:
-                        # Мапирање CSV колона на Pydantic модел
-                        book_data = self._map_csv_to_model(row)
-                        book = Knjiga(**book_data)
-                        books.append(book)
-                    except Exception as e:
-                        log_error(f"Грешка у реду {row_num}: {e}")
-                        continue
-            
+            books = list(self.iter_books())
+            # Претходно стање је потребно само за поређење при упису у журнал
+            if self.use_journal:
+                self._persisted_rows = {str(book.redni_broj): self._map_model_to_csv(book) for book in books}
             log_success(f"Учитано {len(books)} књига из {self.file_path}")
             
         except Exception as e:
@@ -76,21 +107,89 @@ class CSVDataAdapter(DataAdapter):
         
         return books
     
+    def iter_rows(self) -> Iterator[Dict[str, str]]:
+        """Враћа CSV редове један по један, са примењеним журналом измена"""
+        if not self.file_path.exists():
+            return
+        snapshot = ucitaj_snimak(str(self.file_path))
+        if snapshot is not None:
+            yield from self.journal.iter_replay(snapshot.redovi)
+            return
+        with open(self.file_path, 'r', encoding='utf-8') as csvfile:
+            yield from self.journal.iter_replay(csv.DictReader(csvfile))
+    
+    def iter_books(self, predicate: Optional[Callable[[Knjiga], bool]] = None) -> Iterator[Knjiga]:
+        """
+        Враћа валидиране књиге док се CSV фајл чита, прескачући неисправне редове.
+        
+        Ако постоји снимак који је адаптер сачувао из већ валидираних књига, а
+        журнал је празан, књиге се праве из снимка без поновне валидације.
+        """
+        snapshot = ucitaj_snimak(str(self.file_path)) if self.file_path.exists() else None
+        if snapshot is not None and snapshot.validirano and not self.journal.record_count():
+            for book in self._books_from_validated_snapshot(snapshot):
+                if predicate is None or predicate(book):
+                    yield book
+            return
+        
+        for row_num, row in enumerate(self.iter_rows(), start=2):
+            try:
+                # Мапирање CSV колона на Pydantic модел
+                book = Knjiga(**self._map_csv_to_model(row))
+            except Exception as e:
+                log_error(f"Грешка у реду {row_num}: {e}")
+                continue
+            if predicate is None or predicate(book):
+                yield book
+    
     def save_books(self, books: List[Knjiga]) -> bool:
-        """Чува књиге у CSV фајл"""
+        """
+        Чува књиге у CSV фајл.
+        
+        Фајл се замењује атомски (привремени фајл, fsync, os.replace), па
+        резервна копија пре чувања није обавезна (backup_on_save).
+        
+        У режиму журнала у журнал се бележе само књиге измењене од последњег
+        учитавања/чувања, а цео фајл се преписује тек при сажимању журнала.
+        """
+        rows = {str(book.redni_broj): self._map_model_to_csv(book) for book in books}
+        compacting = False
+        if (self.use_journal and self._persisted_rows is not None
+                and self.file_path.exists() and len(rows) == len(books)):
+            try:
+                for key, row in rows.items():
+                    if self._persisted_rows.get(key) != row:
+                        self.journal.append_upsert(row)
+                for key in self._persisted_rows:
+                    if key not in rows:
+                        self.journal.append_delete(key)
+                self._persisted_rows = rows
+                if not self.journal.needs_compaction():
+                    log_success(f"Измене сачуване у журнал {self.journal.path}")
+                    return True
+                compacting = True
+            except Exception as e:
+                log_error(f"Грешка при упису у журнал: {e}")
+                return False
+        
         try:
-            # Прави backup пре чувања
-            if self.file_path.exists():
+            # Backup пре чувања само ако је тражен или се сажима журнал
+            if (self.backup_on_save or compacting) and self.file_path.exists():
                 self.backup_data()
             
-            with open(self.file_path, 'w', encoding='utf-8', newline='') as csvfile:
+            csv_rows = [self._map_model_to_csv(book) for book in books]
+            with atomicni_upis(str(self.file_path)) as csvfile:
                 writer = csv.DictWriter(csvfile, fieldnames=CSV_COLUMNS)
                 writer.writeheader()
-                
-                for book in books:
-                    row = self._map_model_to_csv(book)
-                    writer.writerow(row)
+                writer.writerows(csv_rows)
             
+            # Цео каталог је сада у CSV фајлу, па журнал више није потребан
+            self.journal.clear()
+            # Редови потичу од валидираних књига, па снимак може да прескочи валидацију
+            sacuvaj_snimak(str(self.file_path), CSV_COLUMNS,
+                           [{column: row.get(column, '') for column in CSV_COLUMNS} for row in csv_rows],
+                           potpis_fajla(str(self.file_path)), validirano=True)
+            self._persisted_rows = rows
             log_success(f"Сачувано {len(books)} књига у {self.file_path}")
             return True
             
@@ -131,7 +230,7 @@ class CSVDataAdapter(DataAdapter):
             'zanr': row.get('Жанр', '').strip() or None,
             'serijal': row.get('Серијал', '').strip() or None,
             'kolekcija': row.get('Колекција', '').strip() or None,
-            'izdavaci': row.get('Издавачи', '').strip() or None,
+            'izdavaci': (row.get('Издавачи') or row.get('Издавач') or '').strip() or None,
             'isbn': row.get('ИСБН', '').strip() or None,
             'povez': row.get('Повез', '').strip() or None,
             'napomena': row.get('Напомена', '').strip() or None,
@@ -139,6 +238,39 @@ class CSVDataAdapter(DataAdapter):
             'ko_je_pozajmio': row.get('Ко је позајмио', '').strip() or None,
         }
     
+    def _books_from_validated_snapshot(self, snapshot) -> Iterator[Knjiga]:
+        """
+        Прави књиге из снимка сачуваног од валидираних књига, колону по колону.
+        
+        Исто мапирање као _map_csv_to_model, али над целим колонама, и без
+        поновне валидације модела. Вредности су већ очишћене од белина јер
+        потичу од модела.
+        """
+        def column(name):
+            values = snapshot.kolona(name)
+            return values if values is not None else [''] * snapshot.broj_redova
+        
+        def optional(name):
+            return [value or None for value in column(name)]
+        
+        izdavaci = snapshot.kolona('Издавачи') or column('Издавач')
+        fields = {
+            'redni_broj': [int(value or 0) or 1 for value in column('Редни број')],
+            'naslov': column('Наслов'),
+            'pisac': column('Писац'),
+            'godina_izdavanja': [int(value) if value else None for value in column('Година издавања')],
+            'zanr': optional('Жанр'),
+            'serijal': optional('Серијал'),
+            'kolekcija': optional('Колекција'),
+            'izdavaci': [value or None for value in izdavaci],
+            'isbn': optional('ИСБН'),
+            'povez': optional('Повез'),
+            'napomena': optional('Напомена'),
+            'pozajmljena': [(value or '').lower() in ('да', 'yes', 'true', '1') for value in column('Позајмљена')],
+            'ko_je_pozajmio': optional('Ко је позајмио'),
+        }
+        return Knjiga.iz_proverenih_kolona(fields, snapshot.broj_redova)
+    
     def _map_model_to_csv(self, book: Knjiga) -> Dict[str, str]:
         """Мапира Pydantic модел на CSV ред"""
         return {
@@ -149,7 +281,7 @@ class CSVDataAdapter(DataAdapter):
             'Жанр': book.zanr or '',
             'Серијал': book.serijal or '',
             'Колекција': book.kolekcija or '',
-            'Издавачи': book.izdavaci or '',
+            'Издавач': book.izdavaci or '',
             'ИСБН': book.isbn or '',
             'Повез': book.povez or '',
             'Напомена': book.napomena or '',
@@ -172,15 +304,82 @@ class CSVDataAdapter(DataAdapter):
 
 
 class SQLiteDataAdapter(DataAdapter):
-    """SQLite адаптер за будуће проширење"""
+    """
+    SQLite адаптер са једном трајном конекцијом.
     
-    def __init__(self, db_path: str = "biblioteka.db"):
+    Конекција се отвара при првом коришћењу и подешава за WAL режим,
+    synchronous=NORMAL, већи кеш страница и mmap. Једна конекција се дели
+    између нити, а сваки приступ бази се серијализује закључавањем. Адаптер
+    треба затворити позивом close() или коришћењем као context manager.
+    """
+    
+    # Колоне које адаптер уписује, редом којим их враћа _book_to_row
+    _COLUMNS = (
+        'redni_broj', 'naslov', 'pisac', 'godina_izdavanja', 'zanr',
+        'serijal', 'kolekcija', 'izdavaci', 'isbn', 'povez', 'napomena',
+        'pozajmljena', 'datum_pozajmice', 'datum_vracanja', 'ko_je_pozajmio',
+    )
+    
+    # Поља обухваћена FTS5 индексом (иста поља која претражује BookService.search_books)
+    _FTS_COLUMNS = ('naslov', 'pisac', 'zanr', 'serijal', 'izdavaci', 'napomena')
+    
+    _UPSERT_SQL = f"""
+        INSERT INTO knjige ({', '.join(_COLUMNS)})
+        VALUES ({', '.join('?' for _ in _COLUMNS)})
+        ON CONFLICT(redni_broj) DO UPDATE SET
+            {', '.join(f'{c} = excluded.{c}' for c in _COLUMNS[1:])},
+            poslednja_izmena = CURRENT_TIMESTAMP
+    """
+    
+    def __init__(self, db_path: str = "biblioteka.db", cache_size_kib: int = SQLITE_CACHE_SIZE_KIB,
+                 mmap_size: int = SQLITE_MMAP_SIZE):
         self.db_path = Path(db_path)
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        # Редови последњег учитаног/сачуваног стања, по редном броју
+        self._persisted_rows: Optional[Dict[int, tuple]] = None
+        self.fts_enabled = False
         self._init_database()
     
+    def _connection(self) -> sqlite3.Connection:
+        """Враћа трајну конекцију, отварајући је и подешавајући при првом позиву"""
+        if self._conn is None:
+            conn = sqlite3.connect(
+                str(self.db_path),
+                check_same_thread=False,  # приступ штити self._lock
+                cached_statements=SQLITE_CACHED_STATEMENTS,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._conn = conn
+        return self._conn
+    
+    def close(self) -> None:
+        """Затвара конекцију ка бази"""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    # Пребацује WAL у главни фајл да би база била потпуна и без -wal фајла
+                    self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                except sqlite3.Error:
+                    pass
+                self._conn.close()
+                self._conn = None
+    
+    def __enter__(self) -> "SQLiteDataAdapter":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
     def _init_database(self):
         """Иницијализује SQLite базу"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._connection() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS knjige (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -203,21 +402,160 @@ class SQLiteDataAdapter(DataAdapter):
                     poslednja_izmena TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+        self._init_fts()
+    
+    def _init_fts(self):
+        """
+        Прави FTS5 индекс над табелом knjige и окидаче који га одржавају.
+        
+        Окидачи уписују текст сведен као у fold_text у табелу knjige_pretraga,
+        а индекс је external content над њом, да претрага не зависи од писма.
+        Текст се своди чистим SQL изразима (fold_sql), без Python функција,
+        јер окидаче покреће свака конекција која пише у knjige, не само адаптер.
+        Ако SQLite није преведен са FTS5, претрага остаје на скенирању у меморији.
+        """
+        columns = ', '.join(self._FTS_COLUMNS)
+        
+        def folded_rows(row_id: str, source: str, table: str = '') -> str:
+            # Сваки корак свођења је засебан подупит, да израз не пређе дубину парсера
+            select = ', '.join(f'{fold_sql(source + c, 0)} AS {c}' for c in self._FTS_COLUMNS)
+            select = f"SELECT {row_id} AS id, {select} {table}"
+            for step in range(1, FOLD_SQL_STEPS):
+                folded = ', '.join(f'{fold_sql(c, step)} AS {c}' for c in self._FTS_COLUMNS)
+                select = f"SELECT id, {folded} FROM ({select})"
+            return select
+        
+        insert_row = f"""
+            INSERT INTO knjige_pretraga(id, {columns}) {folded_rows('new.id', 'new.')};
+            INSERT INTO knjige_fts(rowid, {columns})
+            SELECT id, {columns} FROM knjige_pretraga WHERE id = new.id;
+        """
+        delete_row = f"""
+            INSERT INTO knjige_fts(knjige_fts, rowid, {columns})
+            SELECT 'delete', id, {columns} FROM knjige_pretraga WHERE id = old.id;
+            DELETE FROM knjige_pretraga WHERE id = old.id;
+        """
+        
+        try:
+            with self._lock, self._connection() as conn:
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'knjige_fts'"
+                ).fetchone()
+                trigger = conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'knjige_fts_ai'"
+                ).fetchone()
+                stale = exists is not None and (trigger is None or 'knjige_pretraga' not in trigger[0])
+                if stale:
+                    # Индекс из ранијих верзија садржи несведен текст или зависи
+                    # од функције fold_text, регистроване само на конекцији адаптера
+                    for name in ('knjige_fts_ai', 'knjige_fts_ad', 'knjige_fts_au'):
+                        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+                    conn.execute("DROP TABLE knjige_fts")
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS knjige_pretraga (
+                        id INTEGER PRIMARY KEY,
+                        {', '.join(f'{c} TEXT' for c in self._FTS_COLUMNS)}
+                    )
+                """)
+                conn.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS knjige_fts USING fts5(
+                        {columns},
+                        content='knjige_pretraga', content_rowid='id',
+                        tokenize='unicode61 remove_diacritics 2'
+                    )
+                """)
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS knjige_fts_ai AFTER INSERT ON knjige BEGIN
+                        {insert_row}
+                    END
+                """)
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS knjige_fts_ad AFTER DELETE ON knjige BEGIN
+                        {delete_row}
+                    END
+                """)
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS knjige_fts_au AFTER UPDATE ON knjige BEGIN
+                        {delete_row}
+                        {insert_row}
+                    END
+                """)
+                if not exists or stale:
+                    # Постојеће књиге се своде у knjige_pretraga, па индекс гради из ње
+                    conn.execute("DELETE FROM knjige_pretraga")
+                    conn.execute(
+                        f"INSERT INTO knjige_pretraga(id, {columns}) {folded_rows('id', '', 'FROM knjige')}"
+                    )
+                    conn.execute("INSERT INTO knjige_fts(knjige_fts) VALUES ('rebuild')")
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            log_warning(f"FTS5 није доступан, претрага ће користити скенирање: {e}")
+            self.fts_enabled = False
+    
+    @classmethod
+    def _fts_match_query(cls, query: str, field: Optional[str] = None) -> Optional[str]:
+        """
+        Преводи упит корисника у FTS5 MATCH израз.
+        
+        Текст под наводницима се тражи као фраза, а свака остала реч као
+        префикс. Враћа None ако упит не може да се изрази преко индекса.
+        """
+        if field is not None and field not in cls._FTS_COLUMNS:
+            return None
+        
+        parts = []
+        for phrase, term in re.findall(r'"([^"]*)"|(\S+)', query):
+            if phrase:
+                if any(ch.isalnum() for ch in phrase):
+                    parts.append(f'"{phrase}"')
+            elif any(ch.isalnum() for ch in term):
+                term = term.replace('"', '')
+                parts.append(f'"{term}"*')
+        if not parts:
+            return None
+        
+        expression = ' '.join(parts)
+        if field is not None:
+            expression = f'{{{field}}}: ({expression})'
+        return expression
+    
+    def search_ids(self, query: str, field: Optional[str] = None) -> Optional[List[int]]:
+        """
+        Претражује FTS5 индекс и враћа редне бројеве пронађених књига.
+        
+        Враћа None када индекс не може да одговори на упит (FTS5 није
+        доступан, непознато поље или упит без речи), па позивалац треба да
+        претражи књиге у меморији. Упит се своди са fold_text као и индекс.
+        """
+        if not self.fts_enabled:
+            return None
+        match = self._fts_match_query(fold_text(query), field)
+        if match is None:
+            return None
+        
+        try:
+            with self._lock:
+                cursor = self._connection().execute(
+                    """
+                    SELECT k.redni_broj FROM knjige_fts
+                    JOIN knjige AS k ON k.id = knjige_fts.rowid
+                    WHERE knjige_fts MATCH ?
+                    ORDER BY k.redni_broj
+                    """,
+                    (match,),
+                )
+                return [row[0] for row in cursor]
+        except sqlite3.Error as e:
+            log_warning(f"FTS претрага није успела за упит '{query}': {e}")
+            return None
     
     def load_books(self) -> List[Knjiga]:
         """Учитава књиге из SQLite базе"""
         books = []
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.execute("SELECT * FROM knjige ORDER BY redni_broj")
-                
-                for row in cursor:
-                    book_data = dict(row)
-                    book = Knjiga(**book_data)
-                    books.append(book)
-            
+            books = list(self.iter_books())
+            self._persisted_rows = {book.redni_broj: self._book_to_row(book) for book in books}
             log_success(f"Учитано {len(books)} књига из SQLite базе")
             
         except Exception as e:
@@ -225,35 +563,91 @@ class SQLiteDataAdapter(DataAdapter):
         
         return books
     
+    def iter_books(self, predicate: Optional[Callable[[Knjiga], bool]] = None,
+                   fetch_size: int = 1000) -> Iterator[Knjiga]:
+        """
+        Враћа књиге по редном броју, читајући их из базе у групама.
+        
+        Свака група је засебан упит (redni_broj > последњи прочитани), па се
+        закључавање конекције не држи док позивалац обрађује књиге.
+        """
+        last_id = None
+        while True:
+            with self._lock:
+                cursor = self._connection().cursor()
+                cursor.row_factory = sqlite3.Row
+                if last_id is None:
+                    cursor.execute("SELECT * FROM knjige ORDER BY redni_broj LIMIT ?", (fetch_size,))
+                else:
+                    cursor.execute(
+                        "SELECT * FROM knjige WHERE redni_broj > ? ORDER BY redni_broj LIMIT ?",
+                        (last_id, fetch_size),
+                    )
+                rows = cursor.fetchall()
+            
+            for row in rows:
+                book = Knjiga(**dict(row))
+                if predicate is None or predicate(book):
+                    yield book
+            
+            if len(rows) < fetch_size:
+                return
+            last_id = rows[-1]['redni_broj']
+    
     def save_books(self, books: List[Knjiga]) -> bool:
-        """Чува књиге у SQLite базу"""
+        """
+        Чува књиге у SQLite базу.
+        
+        Пореде се књиге са стањем из последњег учитавања/чувања, па се у једној
+        трансакцији уписују (INSERT ... ON CONFLICT DO UPDATE) само измењене
+        књиге, а бришу само уклоњене. Цена чувања зависи од броја измена, а не
+        од величине каталога.
+        """
+        rows = {book.redni_broj: self._book_to_row(book) for book in books}
+        if len(rows) != len(books):
+            log_error("Грешка при чувању у SQLite базу: дуплирани редни бројеви")
+            return False
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                # Обриши постојеће записе
-                conn.execute("DELETE FROM knjige")
+            with self._lock, self._connection() as conn:
+                persisted = self._persisted_rows
+                if persisted is None:
+                    persisted = self._read_persisted_rows(conn)
+                
+                changed = [row for key, row in rows.items() if persisted.get(key) != row]
+                removed = [(key,) for key in persisted if key not in rows]
                 
-                # Убаци нове записе
-                for book in books:
-                    conn.execute("""
-                        INSERT INTO knjige (
-                            redni_broj, naslov, pisac, godina_izdavanja, zanr,
-                            serijal, kolekcija, izdavaci, isbn, povez, napomena,
-                            pozajmljena, datum_pozajmice, datum_vracanja, ko_je_pozajmio
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        book.redni_broj, book.naslov, book.pisac, book.godina_izdavanja,
-                        book.zanr, book.serijal, book.kolekcija, book.izdavaci,
-                        book.isbn, book.povez, book.napomena, book.pozajmljena,
-                        book.datum_pozajmice, book.datum_vracanja, book.ko_je_pozajmio
-                    ))
+                if removed:
+                    conn.executemany("DELETE FROM knjige WHERE redni_broj = ?", removed)
+                if changed:
+                    conn.executemany(self._UPSERT_SQL, changed)
             
-            log_success(f"Сачувано {len(books)} књига у SQLite базу")
+            self._persisted_rows = rows
+            log_success(f"Сачувано {len(books)} књига у SQLite базу "
+                        f"({len(changed)} измењених, {len(removed)} обрисаних)")
             return True
             
         except Exception as e:
             log_error(f"Грешка при чувању у SQLite базу: {e}")
             return False
     
+    @classmethod
+    def _book_to_row(cls, book: Knjiga) -> tuple:
+        """Мапира књигу на ред табеле у облику у ком га SQLite враћа"""
+        return (
+            book.redni_broj, book.naslov, book.pisac, book.godina_izdavanja,
+            book.zanr, book.serijal, book.kolekcija, book.izdavaci,
+            book.isbn, book.povez, book.napomena, int(book.pozajmljena),
+            book.datum_pozajmice.isoformat() if book.datum_pozajmice else None,
+            book.datum_vracanja.isoformat() if book.datum_vracanja else None,
+            book.ko_je_pozajmio,
+        )
+    
+    def _read_persisted_rows(self, conn: sqlite3.Connection) -> Dict[int, tuple]:
+        """Чита тренутно стање табеле када адаптер још није учитавао књиге"""
+        cursor = conn.execute(f"SELECT {', '.join(self._COLUMNS)} FROM knjige")
+        return {row[0]: tuple(row) for row in cursor}
+    
     def backup_data(self) -> bool:
         """Прави резервну копију SQLite базе"""
         if not self.db_path.exists():
@@ -263,8 +657,13 @@ class SQLiteDataAdapter(DataAdapter):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_path = self.db_path.with_suffix(f".backup_{timestamp}.db")
             
-            import shutil
-            shutil.copy2(self.db_path, backup_path)
+            # Online backup API обухвата и садржај WAL фајла, за разлику од копирања фајла
+            with self._lock:
+                target = sqlite3.connect(str(backup_path))
+                try:
+                    self._connection().backup(target)
+                finally:
+                    target.close()
             
             log_success(f"Направљен SQLite backup: {backup_path}")
             return True
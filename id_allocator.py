@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : id_allocator.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Додела редних бројева књига: празнине после брисања и највећи додељени број
+
+import heapq
+import threading
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Празнина је полуотворени интервал слободних бројева [почетак, крај)
+Praznina = Tuple[int, int]
+
+
+class IdAllocator:
+    """
+    Додела редних бројева без линеарног претраживања каталога.
+
+    Бројеви мањи од `next_id` (high-water mark) који нису у употреби чувају
+    се као интервали у min-heap-у, па је најмањи слободан број увек на врху.
+    Број заузет из средине неке празнине бележи се у скупу и прескаче се
+    тек када дође на ред, тако да су све операције O(log n).
+    """
+
+    def __init__(self, next_id: int = 1, gaps: Iterable[Praznina] = ()):
+        self.next_id = max(int(next_id), 1)
+        self._gaps: List[Praznina] = [(int(a), min(int(b), self.next_id))
+                                      for a, b in gaps if 0 < int(a) < min(int(b), self.next_id)]
+        heapq.heapify(self._gaps)
+        # Бројеви из празнина који су заузети мимо allocate()
+        self._claimed = set()
+        # Опсези резервисани за масовни увоз; њихово заузимање не мења празнине
+        self._reserved: List[range] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> "IdAllocator":
+        """Прави алокатор од бројева који су већ у употреби."""
+        used = sorted({int(i) for i in ids if int(i) > 0})
+        gaps = []
+        previous = 0
+        for current in used:
+            if current > previous + 1:
+                gaps.append((previous + 1, current))
+            previous = current
+        return cls(previous + 1, gaps)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IdAllocator":
+        """Враћа алокатор из облика сачуваног у .meta фајлу."""
+        return cls(data['sledeci_redni_broj'], [tuple(p) for p in data.get('praznine', ())])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Враћа стање алокатора за чување у .meta фајлу."""
+        with self._lock:
+            self._drop_claimed()
+            gaps = []
+            for start, end in sorted(self._gaps):
+                # Заузети бројеви из средине празнина деле интервал на делове
+                for number in sorted(n for n in self._claimed if start <= n < end):
+                    if number > start:
+                        gaps.append([start, number])
+                    start = number + 1
+                if start < end:
+                    gaps.append([start, end])
+            return {'sledeci_redni_broj': self.next_id, 'praznine': gaps}
+
+    def _drop_claimed(self) -> None:
+        """Уклања заузете бројеве са почетка најмање празнине."""
+        while self._gaps:
+            start, end = self._gaps[0]
+            if start not in self._claimed:
+                return
+            self._claimed.discard(start)
+            if start + 1 < end:
+                heapq.heapreplace(self._gaps, (start + 1, end))
+            else:
+                heapq.heappop(self._gaps)
+
+    def peek(self, fill_gaps: bool = True) -> int:
+        """Враћа број који би allocate() доделио, без заузимања."""
+        with self._lock:
+            if fill_gaps:
+                self._drop_claimed()
+                if self._gaps:
+                    return self._gaps[0][0]
+            return self.next_id
+
+    def allocate(self, fill_gaps: bool = True) -> int:
+        """
+        Додељује најмањи слободан број.
+
+        Са `fill_gaps=False` празнине се прескачу и број је увек већи од свих
+        до сада додељених.
+        """
+        with self._lock:
+            if fill_gaps:
+                self._drop_claimed()
+                if self._gaps:
+                    start, end = self._gaps[0]
+                    if start + 1 < end:
+                        heapq.heapreplace(self._gaps, (start + 1, end))
+                    else:
+                        heapq.heappop(self._gaps)
+                    return start
+            number = self.next_id
+            self.next_id += 1
+            return number
+
+    def allocate_range(self, count: int) -> range:
+        """Резервише `count` узастопних бројева изнад свих додељених (за масовни увоз)."""
+        if count < 0:
+            raise ValueError("count мора бити ненегативан")
+        with self._lock:
+            numbers = range(self.next_id, self.next_id + count)
+            self.next_id += count
+            if numbers:
+                self._reserved.append(numbers)
+            return numbers
+
+    def claim(self, number: int) -> None:
+        """
+        Бележи да је број заузет мимо allocate() (нпр. књига са задатим редним бројем).
+
+        Број мањи од `next_id` мора бити слободан или из резервисаног опсега.
+        """
+        number = int(number)
+        if number < 1:
+            return
+        with self._lock:
+            if number >= self.next_id:
+                if number > self.next_id:
+                    heapq.heappush(self._gaps, (self.next_id, number))
+                self.next_id = number + 1
+            elif not any(number in numbers for numbers in self._reserved):
+                self._claimed.add(number)
+
+    def release(self, number: int) -> None:
+        """Враћа број обрисане књиге међу слободне."""
+        number = int(number)
+        if number < 1:
+            return
+        with self._lock:
+            if number >= self.next_id:
+                return
+            if number in self._claimed:
+                # Број је још у својој празнини, само више није заузет
+                self._claimed.discard(number)
+            else:
+                heapq.heappush(self._gaps, (number, number + 1))
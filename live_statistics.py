@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : live_statistics.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Статистике каталога које се ажурирају при свакој измени, без поновног пролаза
+
+import heapq
+import threading
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+from data_adapter import calculate_statistics
+from models import Knjiga, Statistika
+
+
+class _Udeo(NamedTuple):
+    """Шта једна књига доприноси статистикама (као у calculate_statistics)."""
+    pisac: Optional[str]
+    zanr: Optional[str]
+    izdavaci: FrozenSet[str]
+    pozajmljena: bool
+    datum_pozajmice: Optional[date]
+
+
+def _udeo(book: Knjiga) -> _Udeo:
+    pozajmljena = bool(book.je_pozajmljena())
+    return _Udeo(
+        pisac=book.pisac,
+        zanr=book.zanr or None,
+        izdavaci=frozenset(i.strip() for i in book.izdavaci.split(';')) if book.izdavaci else frozenset(),
+        pozajmljena=pozajmljena,
+        datum_pozajmice=book.datum_pozajmice if pozajmljena and book.datum_pozajmice else None,
+    )
+
+
+class LiveStatistics:
+    """
+    Збирне статистике каталога одржаване уз измене, са истим API-јем као индекси.
+
+    Различити писци, жанрови и издавачи броје се бројачима референци, па
+    брисање последње књиге неког писца смањује број писаца. Последњи датум
+    позајмице чува се у гомили са лењим брисањем. Свака измена кошта O(1)
+    (гомила амортизовано O(log n)), а snapshot() не пролази кроз каталог.
+    Кључ је идентитет књиге, као у осталим индексима сервиса.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Празни статистике."""
+        with self._lock:
+            self._udeli: Dict[Hashable, _Udeo] = {}
+            self._pisci: Counter = Counter()
+            self._zanrovi: Counter = Counter()
+            self._izdavaci: Counter = Counter()
+            self._pozajmljene = 0
+            self._datumi: Counter = Counter()
+            # Најновији датум на врху; датуми чији је број пао на нулу се прескачу
+            self._heap: List[Tuple[int, date]] = []
+
+    def build(self, items: Iterable[tuple]) -> None:
+        """Поново рачуна статистике од парова (кључ, књига)."""
+        with self._lock:
+            self.clear()
+            for key, book in items:
+                self.add(key, book)
+
+    def __len__(self) -> int:
+        return len(self._udeli)
+
+    def _primeni(self, udeo: _Udeo, smer: int) -> None:
+        self._pisci[udeo.pisac] += smer
+        if not self._pisci[udeo.pisac]:
+            del self._pisci[udeo.pisac]
+        for brojac, vrednosti in ((self._zanrovi, (udeo.zanr,) if udeo.zanr else ()),
+                                  (self._izdavaci, udeo.izdavaci)):
+            for vrednost in vrednosti:
+                brojac[vrednost] += smer
+                if not brojac[vrednost]:
+                    del brojac[vrednost]
+        if udeo.pozajmljena:
+            self._pozajmljene += smer
+        if udeo.datum_pozajmice:
+            datum = udeo.datum_pozajmice
+            if smer > 0 and not self._datumi[datum]:
+                heapq.heappush(self._heap, (-datum.toordinal(), datum))
+            self._datumi[datum] += smer
+            if not self._datumi[datum]:
+                del self._datumi[datum]
+            if len(self._heap) > 2 * len(self._datumi) + 16:
+                # Превише застарелих уноса (нпр. честе позајмице и враћања истог дана)
+                self._heap = [(-d.toordinal(), d) for d in self._datumi]
+                heapq.heapify(self._heap)
+
+    def add(self, key: Hashable, book: Knjiga) -> None:
+        """Додаје књигу, или поново рачуна допринос књиге која је измењена на месту."""
+        with self._lock:
+            self.remove(key)
+            udeo = _udeo(book)
+            self._udeli[key] = udeo
+            self._primeni(udeo, 1)
+
+    def replace(self, old_key: Hashable, key: Hashable, book: Knjiga) -> None:
+        """Замењује књигу `old_key` књигом под кључем `key`."""
+        with self._lock:
+            self.remove(old_key)
+            self.add(key, book)
+
+    def remove(self, key: Hashable) -> bool:
+        """Уклања допринос књиге; враћа False ако није била бројана."""
+        with self._lock:
+            udeo = self._udeli.pop(key, None)
+            if udeo is None:
+                return False
+            self._primeni(udeo, -1)
+            return True
+
+    def _poslednja_pozajmica(self) -> Optional[date]:
+        while self._heap and not self._datumi[self._heap[0][1]]:
+            heapq.heappop(self._heap)
+        return self._heap[0][1] if self._heap else None
+
+    def snapshot(self) -> Statistika:
+        """Враћа тренутне статистике, исте као calculate_statistics над целим каталогом."""
+        with self._lock:
+            ukupno = len(self._udeli)
+            if not ukupno:
+                return Statistika()
+            return Statistika(
+                ukupno_knjiga=ukupno,
+                pozajmljene_knjige=self._pozajmljene,
+                dostupne_knjige=ukupno - self._pozajmljene,
+                broj_pisaca=len(self._pisci),
+                broj_zanrova=len(self._zanrovi),
+                broj_izdavaca=len(self._izdavaci),
+                poslednja_pozajmica=self._poslednja_pozajmica(),
+            )
+
+    def verify(self, books: List[Knjiga]) -> Statistika:
+        """
+        Поново рачуна статистике од нуле и пореди их са одржаваним.
+
+        Служи за тестове и дијагностику; подиже AssertionError ако се
+        разликују (нпр. ако је књига мењана мимо сервиса).
+        """
+        with self._lock:
+            ocekivano = calculate_statistics(books)
+            stvarno = self.snapshot()
+            if stvarno != ocekivano:
+                raise AssertionError(f"Статистике се разликују: {stvarno} != {ocekivano}")
+            return stvarno
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : loan_ledger.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Књига позајмица: историја позајмица која се само дописује, са индексима по читаоцу и књизи
+
+import json
+import os
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from catalog_cache import potpis_fajla
+from logger import get_logger
+from transliteration import fold_text
+
+logger = get_logger(__name__)
+
+# Операције у књизи позајмица
+OP_LOAN = 'pozajmica'
+OP_RETURN = 'vracanje'
+# Књига је обрисана из каталога: отворена позајмица се затвара, а историја броја почиње испочетка
+OP_DELETE = 'brisanje'
+
+
+def ledger_path(csv_path: str) -> str:
+    """Враћа путању до књиге позајмица за дати CSV фајл."""
+    return f"{csv_path}.loans"
+
+
+class Loan(NamedTuple):
+    """Једна позајмица; returned је None док књига није враћена, а loaned када датум није познат."""
+    id: int
+    book: str
+    borrower: str
+    loaned: Optional[date]
+    due: Optional[date] = None
+    returned: Optional[date] = None
+    note: Optional[str] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.returned is None
+
+
+def _date(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
+def _iso(value: Optional[date]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def borrower_key(borrower: str) -> str:
+    """Кључ читаоца: без обзира на писмо, велика слова и размаке на крајевима."""
+    return fold_text(borrower).strip()
+
+
+class LoanLedger:
+    """
+    Књига позајмица над JSON-lines фајлом поред каталога (<csv>.loans).
+
+    Свака позајмица и враћање је један запис који се дописује и fsync-ује,
+    па се историја никад не преписује. У меморији се држе сви записи и
+    индекси отворених позајмица по књизи и по читаоцу, па су питања "да ли
+    је књига напољу" и "шта читалац тренутно држи" O(1). Књига се
+    препознаје по редном броју; брисање књиге се бележи записом OP_DELETE,
+    па број који касније добије друга књига не наслеђује ни позајмицу ни
+    историју. Ако фајл промени други процес, поново се учитава при
+    следећем позиву.
+    """
+
+    def __init__(self, csv_path: str):
+        self.csv_path = csv_path
+        self.path = ledger_path(csv_path)
+        self._lock = threading.RLock()
+        self._signature = None
+        self._loaded = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._loans: List[Loan] = []
+        # Редни број књиге → id отворене позајмице
+        self._open: Dict[str, int] = {}
+        # Кључ читаоца → редни бројеви књига које држи → id позајмице
+        self._by_borrower: Dict[str, Dict[str, int]] = {}
+        # Редни број књиге → id свих њених позајмица, од најстарије
+        self._by_book: Dict[str, List[int]] = {}
+
+    def _apply(self, record: Dict) -> None:
+        if record.get('op') == OP_LOAN:
+            book = str(record['knjiga'])
+            if book in self._open:
+                return
+            loan = Loan(len(self._loans), book, record['ko'], _date(record['datum']),
+                        _date(record.get('rok')), None, record.get('napomena'))
+            self._loans.append(loan)
+            self._open[book] = loan.id
+            self._by_borrower.setdefault(borrower_key(loan.borrower), {})[book] = loan.id
+            self._by_book.setdefault(book, []).append(loan.id)
+        elif record.get('op') == OP_RETURN:
+            self._close(str(record['knjiga']), _date(record['datum']))
+        elif record.get('op') == OP_DELETE:
+            book = str(record['knjiga'])
+            self._close(book, _date(record['datum']))
+            # Позајмице остају у _loans, али се више не налазе преко броја књиге
+            self._by_book.pop(book, None)
+
+    def _close(self, book: str, returned: Optional[date]) -> None:
+        loan_id = self._open.pop(book, None)
+        if loan_id is None:
+            return
+        loan = self._loans[loan_id]._replace(returned=returned)
+        self._loans[loan_id] = loan
+        held = self._by_borrower[borrower_key(loan.borrower)]
+        del held[loan.book]
+        if not held:
+            del self._by_borrower[borrower_key(loan.borrower)]
+
+    def _refresh(self) -> None:
+        """Учитава фајл ако још није учитан или га је променио неко други."""
+        signature = potpis_fajla(self.path)
+        if self._loaded and signature == self._signature:
+            return
+        self._reset()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line_num, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        self._apply(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning(f"Preskočen oštećen zapis {line_num} u knjizi pozajmica {self.path}")
+        except FileNotFoundError:
+            pass
+        self._loaded = True
+        self._signature = signature
+
+    def _append(self, records: Iterable[Dict]) -> None:
+        data = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        with open(self.path, 'a+b') as f:
+            # Ако је претходни упис прекинут, нови запис почиње у новом реду
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+            f.write(data.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        self._signature = potpis_fajla(self.path)
+
+    def exists(self) -> bool:
+        """Проверава да ли фајл књиге позајмица постоји."""
+        return os.path.exists(self.path)
+
+    def lend(self, book: str, borrower: str, loaned: Optional[date] = None,
+             due: Optional[date] = None, note: Optional[str] = None) -> Loan:
+        """Бележи позајмицу; подиже ValueError ако је књига већ позајмљена."""
+        book = str(book)
+        with self._lock:
+            self._refresh()
+            if book in self._open:
+                raise ValueError(f"Књига {book} је већ позајмљена")
+            record = {'op': OP_LOAN, 'knjiga': book, 'ko': borrower, 'datum': _iso(loaned or date.today()),
+                      'rok': _iso(due), 'napomena': note}
+            self._append([record])
+            self._apply(record)
+            return self._loans[-1]
+
+    def return_book(self, book: str, returned: Optional[date] = None) -> Loan:
+        """Бележи враћање; подиже ValueError ако књига није позајмљена."""
+        book = str(book)
+        with self._lock:
+            self._refresh()
+            loan_id = self._open.get(book)
+            if loan_id is None:
+                raise ValueError(f"Књига {book} није позајмљена")
+            record = {'op': OP_RETURN, 'knjiga': book, 'datum': _iso(returned or date.today())}
+            self._append([record])
+            self._apply(record)
+            return self._loans[loan_id]
+
+    def import_open_loans(self, loans: Iterable[Tuple[str, str, Optional[date]]]) -> int:
+        """
+        Уписује већ отворене позајмице (редни број, читалац, датум или None) одједном.
+
+        Служи за прелазак са колона каталога на књигу позајмица; књиге које
+        су већ позајмљене у књизи се прескачу. Враћа број уписаних.
+        """
+        with self._lock:
+            self._refresh()
+            records = []
+            seen = set(self._open)
+            for book, borrower, loaned in loans:
+                book = str(book)
+                if book in seen:
+                    continue
+                seen.add(book)
+                records.append({'op': OP_LOAN, 'knjiga': book, 'ko': borrower, 'datum': _iso(loaned),
+                                'rok': None, 'napomena': None})
+            # Фајл се прави и када нема отворених позајмица, да се прелазак не понавља
+            self._append(records)
+            for record in records:
+                self._apply(record)
+            return len(records)
+
+    def sync(self, book: str, borrower: Optional[str], loaned: Optional[date] = None,
+             due: Optional[date] = None, note: Optional[str] = None, returned: Optional[date] = None) -> bool:
+        """
+        Усклађује отворену позајмицу књиге са стањем из каталога.
+
+        `borrower` је читалац ако је књига по каталогу позајмљена, иначе
+        None. Отворена позајмица која не одговара каталогу се затвара
+        (датумом `returned`, односно данашњим), а позајмица која недостаје
+        се бележи. Враћа True ако је нешто уписано.
+        """
+        book = str(book)
+        with self._lock:
+            self._refresh()
+            loan_id = self._open.get(book)
+            records = []
+            if loan_id is not None:
+                if borrower is not None and borrower_key(self._loans[loan_id].borrower) == borrower_key(borrower):
+                    return False
+                records.append({'op': OP_RETURN, 'knjiga': book,
+                                'datum': _iso((returned if borrower is None else None) or date.today())})
+            if borrower is not None:
+                records.append({'op': OP_LOAN, 'knjiga': book, 'ko': borrower, 'datum': _iso(loaned or date.today()),
+                                'rok': _iso(due), 'napomena': note})
+            if records:
+                self._append(records)
+                for record in records:
+                    self._apply(record)
+            return bool(records)
+
+    def remove_books(self, books: Iterable[str], removed: Optional[date] = None) -> int:
+        """
+        Бележи да су књиге обрисане из каталога.
+
+        Отворена позајмица обрисане књиге се затвара, а њен редни број
+        почиње без историје. Књиге које никад нису позајмљене се прескачу.
+        Враћа број уписаних записа.
+        """
+        with self._lock:
+            self._refresh()
+            records = [{'op': OP_DELETE, 'knjiga': book, 'datum': _iso(removed or date.today())}
+                       for book in dict.fromkeys(map(str, books)) if book in self._by_book]
+            if records:
+                self._append(records)
+                for record in records:
+                    self._apply(record)
+            return len(records)
+
+    def is_out(self, book: str) -> bool:
+        """Да ли је књига тренутно позајмљена."""
+        with self._lock:
+            self._refresh()
+            return str(book) in self._open
+
+    def open_loan(self, book: str) -> Optional[Loan]:
+        """Враћа отворену позајмицу књиге или None."""
+        with self._lock:
+            self._refresh()
+            loan_id = self._open.get(str(book))
+            return None if loan_id is None else self._loans[loan_id]
+
+    def held_by(self, borrower: str) -> List[Loan]:
+        """Враћа отворене позајмице читаоца, од најстарије."""
+        with self._lock:
+            self._refresh()
+            return [self._loans[loan_id] for loan_id in self._by_borrower.get(borrower_key(borrower), {}).values()]
+
+    def history(self, book: str) -> List[Loan]:
+        """Враћа све позајмице књиге, од најстарије."""
+        with self._lock:
+            self._refresh()
+            return [self._loans[loan_id] for loan_id in self._by_book.get(str(book), ())]
+
+    def open_loans(self) -> List[Loan]:
+        """Враћа све отворене позајмице, од најстарије."""
+        with self._lock:
+            self._refresh()
+            return [self._loans[loan_id] for loan_id in sorted(self._open.values())]
+
+    def overdue(self, today: Optional[date] = None) -> List[Loan]:
+        """Враћа отворене позајмице којима је прошао рок враћања."""
+        today = today or date.today()
+        return [loan for loan in self.open_loans() if loan.due is not None and loan.due < today]
+
+
+# Књиге позајмица по путањи CSV фајла
+_LEDGERS: Dict[str, LoanLedger] = {}
+_LEDGERS_LOCK = threading.Lock()
+
+
+def get_loan_ledger(csv_path: str) -> LoanLedger:
+    """Враћа заједничку инстанцу књиге позајмица за дати CSV фајл"""
+    key = os.path.abspath(csv_path)
+    with _LEDGERS_LOCK:
+        if key not in _LEDGERS:
+            _LEDGERS[key] = LoanLedger(csv_path)
+        return _LEDGERS[key]
@@ -7,7 +7,8 @@
 
 # Увозимо потребне модуле
 from datetime import datetime, date
-from typing import Optional, List, Union
+from itertools import repeat
+from typing import Iterator, Optional, List, Union
 from pydantic import BaseModel, Field, validator
 from enum import Enum
 
@@ -80,6 +81,38 @@ class Knjiga(BaseModel):
                 raise ValueError('Датум враћања не може бити пре датума позајмице')
         return v
 
+    # Прави књиге од већ проверених вредности
+    @classmethod
+    def iz_proverenih_kolona(cls, kolone: dict, broj: int) -> Iterator["Knjiga"]:
+        """
+        Прави `broj` књига од колона вредности које су већ прошле валидацију.
+
+        Користи се при учитавању снимка каталога. Резултат је исти као
+        Knjiga(**podaci) за сваки ред, али без цене валидације; model_construct
+        није погодан јер је спорији од саме валидације (за свако поље
+        default_factory проверава кроз inspect).
+        """
+        imena = list(cls.model_fields)
+        nizovi = []
+        for ime, polje in cls.model_fields.items():
+            if ime in kolone:
+                nizovi.append(kolone[ime])
+            elif polje.default_factory is not None:
+                # Бесконачан низ позива фабрике; zip узима онолико колико треба
+                nizovi.append(iter(polje.default_factory, object()))
+            else:
+                nizovi.append(repeat(polje.default, broj))
+        postavljena = frozenset(kolone)
+
+        postavi = object.__setattr__
+        for vrednosti in zip(*nizovi):
+            knjiga = cls.__new__(cls)
+            postavi(knjiga, '__dict__', dict(zip(imena, vrednosti)))
+            postavi(knjiga, '__pydantic_fields_set__', set(postavljena))
+            postavi(knjiga, '__pydantic_extra__', None)
+            postavi(knjiga, '__pydantic_private__', None)
+            yield knjiga
+
     # Методи за проверу и измену статуса
     def je_pozajmljena(self) -> bool:
         """Проверава да ли је књига тренутно позајмљена"""
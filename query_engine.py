@@ -0,0 +1,507 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : query_engine.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Упити са више критеријума: предикати, планирање по селективности индекса, explain и странице
+
+import base64
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Set, Union
+
+from catalog_index import CatalogIndex, RangeIndex, SortedIndex, normalize, to_number
+from transliteration import fold_text
+from trigram_index import TrigramIndex
+
+# Виртуелно поље са статусом позајмице и његове вредности
+STATUS_FIELD = 'status'
+DOSTUPNA = 'dostupna'
+POZAJMLJENA = 'pozajmljena'
+
+
+class Predicate(ABC):
+    """
+    Услов упита над једном ставком каталога.
+
+    Предикати се комбинују операторима & (AND), | (OR) и ~ (NOT).
+    """
+
+    @abstractmethod
+    def matches(self, item: Any, engine: "QueryEngine") -> bool:
+        """Проверава да ли ставка задовољава услов."""
+        pass
+
+    @abstractmethod
+    def fields(self) -> Set[str]:
+        """Враћа поља која услов користи."""
+        pass
+
+    def __and__(self, other: "Predicate") -> "And":
+        return And(self, other)
+
+    def __or__(self, other: "Predicate") -> "Or":
+        return Or(self, other)
+
+    def __invert__(self) -> "Not":
+        return Not(self)
+
+
+class Contains(Predicate):
+    """Поље садржи подниску (без обзира на писмо и велика слова)."""
+
+    def __init__(self, field: str, value: str):
+        self.field = field
+        self.value = value
+        self._folded = fold_text(value).strip()
+
+    def matches(self, item, engine):
+        return self._folded in fold_text(engine.value(item, self.field))
+
+    def fields(self):
+        return {self.field}
+
+    def __str__(self):
+        return f"{self.field} ~ {self.value!r}"
+
+
+class Equals(Predicate):
+    """
+    Поље има тачно дату вредност (без обзира на писмо и велика слова).
+
+    За поља са више вредности (нпр. писци раздвојени са ;) довољно је
+    поклапање са једном од њих.
+    """
+
+    def __init__(self, field: str, value: Any):
+        self.field = field
+        self.value = value
+        self._normalized = normalize(str(value))
+
+    def matches(self, item, engine):
+        return any(normalize(str(v)) == self._normalized for v in engine.values(item, self.field) if v is not None)
+
+    def fields(self):
+        return {self.field}
+
+    def __str__(self):
+        return f"{self.field} = {self.value!r}"
+
+
+class Between(Predicate):
+    """Целобројна вредност поља (нпр. година) је у опсегу [low, high]; None је отворена граница."""
+
+    def __init__(self, field: str, low: Optional[int] = None, high: Optional[int] = None):
+        self.field = field
+        self.low = low
+        self.high = high
+
+    def matches(self, item, engine):
+        value = to_number(engine.value(item, self.field))
+        if value is None:
+            return False
+        return (self.low is None or value >= self.low) and (self.high is None or value <= self.high)
+
+    def fields(self):
+        return {self.field}
+
+    def __str__(self):
+        low = '' if self.low is None else f"{self.low} <= "
+        high = '' if self.high is None else f" <= {self.high}"
+        return f"{low}{self.field}{high}"
+
+
+class And(Predicate):
+    """Сви услови важе; без услова важи за сваку ставку."""
+
+    def __init__(self, *predicates: Predicate):
+        self.predicates = list(predicates)
+
+    def matches(self, item, engine):
+        return all(p.matches(item, engine) for p in self.predicates)
+
+    def fields(self):
+        return set().union(*(p.fields() for p in self.predicates))
+
+    def __str__(self):
+        return '(' + ' AND '.join(map(str, self.predicates)) + ')' if self.predicates else 'TRUE'
+
+
+class Or(Predicate):
+    """Бар један од услова важи."""
+
+    def __init__(self, *predicates: Predicate):
+        self.predicates = list(predicates)
+
+    def matches(self, item, engine):
+        return any(p.matches(item, engine) for p in self.predicates)
+
+    def fields(self):
+        return set().union(*(p.fields() for p in self.predicates))
+
+    def __str__(self):
+        return '(' + ' OR '.join(map(str, self.predicates)) + ')' if self.predicates else 'FALSE'
+
+
+class Not(Predicate):
+    """Услов не важи."""
+
+    def __init__(self, predicate: Predicate):
+        self.predicate = predicate
+
+    def matches(self, item, engine):
+        return not self.predicate.matches(item, engine)
+
+    def fields(self):
+        return self.predicate.fields()
+
+    def __str__(self):
+        return f"NOT {self.predicate}"
+
+
+def available(flag: bool = True) -> Equals:
+    """Услов да књига јесте (или није) доступна, по пољу STATUS_FIELD."""
+    return Equals(STATUS_FIELD, DOSTUPNA if flag else POZAJMLJENA)
+
+
+def from_criteria(criteria: Dict[str, str]) -> And:
+    """Претвара речник поље → подниска (као у pretraga) у упит; празне вредности се прескачу."""
+    return And(*(Contains(field, value) for field, value in criteria.items() if value))
+
+
+# Приступ кандидатима преко индекса
+
+class AccessPath(ABC):
+    """Индекс преко ког се налазе кандидати за једну врсту услова."""
+
+    name = 'index'
+
+    @abstractmethod
+    def supports(self, predicate: Predicate) -> bool:
+        """Да ли се кандидати за услов могу наћи преко овог индекса."""
+        pass
+
+    @abstractmethod
+    def estimate(self, predicate: Predicate) -> int:
+        """Процена броја кандидата, за избор најселективнијег индекса."""
+        pass
+
+    @abstractmethod
+    def lookup(self, predicate: Predicate) -> Iterable[Hashable]:
+        """Враћа кључеве кандидата за услов."""
+        pass
+
+
+class KeyPath(AccessPath):
+    """Тачан приступ по јединственом пољу (редни број)."""
+
+    name = 'id'
+
+    def __init__(self, field: str, find: Callable[[Any], Iterable[Hashable]]):
+        self.field = field
+        self.find = find
+
+    def supports(self, predicate):
+        return isinstance(predicate, Equals) and predicate.field == self.field
+
+    def estimate(self, predicate):
+        return 1
+
+    def lookup(self, predicate):
+        return self.find(predicate.value)
+
+
+class FacetPath(AccessPath):
+    """Тачне вредности преко инверзног индекса (писац, жанр, статус позајмице, ...)."""
+
+    name = 'facet'
+
+    def __init__(self, index: CatalogIndex):
+        self.index = index
+
+    def supports(self, predicate):
+        return isinstance(predicate, Equals) and predicate.field in self.index.fields
+
+    def estimate(self, predicate):
+        return self.index.count(predicate.field, str(predicate.value))
+
+    def lookup(self, predicate):
+        return self.index.keys(predicate.field, str(predicate.value))
+
+
+class TextPath(AccessPath):
+    """Подниске преко индекса триграма."""
+
+    name = 'trigram'
+
+    def __init__(self, index: TrigramIndex):
+        self.index = index
+
+    def supports(self, predicate):
+        return isinstance(predicate, Contains) and predicate.field in self.index.fields
+
+    def estimate(self, predicate):
+        return self.index.estimate(predicate.value, predicate.field)
+
+    def lookup(self, predicate):
+        return self.index.search_keys(predicate.value, predicate.field)
+
+
+class RangePath(AccessPath):
+    """Опсег вредности преко индекса целобројног поља (година издавања)."""
+
+    name = 'range'
+
+    def __init__(self, field: str, index: RangeIndex):
+        self.field = field
+        self.index = index
+
+    def supports(self, predicate):
+        return isinstance(predicate, Between) and predicate.field == self.field
+
+    def estimate(self, predicate):
+        return self.index.count(predicate.low, predicate.high)
+
+    def lookup(self, predicate):
+        return self.index.keys(predicate.low, predicate.high)
+
+
+# План извршавања
+
+class IndexScan:
+    """Кандидати из једног индекса."""
+
+    def __init__(self, path: AccessPath, predicate: Predicate, estimate: int):
+        self.path = path
+        self.predicate = predicate
+        self.estimate = estimate
+
+    def keys(self, engine: "QueryEngine") -> Set[Hashable]:
+        return set(self.path.lookup(self.predicate))
+
+    def lines(self, depth: int) -> List[str]:
+        return ['  ' * depth + f"IndexScan {self.path.name} [{self.predicate}] ~{self.estimate}"]
+
+
+class UnionScan:
+    """Унија кандидата подпланова (за OR чији су сви услови индексирани)."""
+
+    def __init__(self, plans: List["Plan"]):
+        self.plans = plans
+        self.estimate = sum(plan.estimate for plan in plans)
+
+    def keys(self, engine: "QueryEngine") -> Set[Hashable]:
+        result = set()
+        for plan in self.plans:
+            result |= plan.keys(engine)
+        return result
+
+    def lines(self, depth: int) -> List[str]:
+        result = ['  ' * depth + f"Union ~{self.estimate}"]
+        for plan in self.plans:
+            result.extend(plan.lines(depth + 1))
+        return result
+
+
+class FullScan:
+    """Пролаз кроз цео каталог, када ниједан индекс не одговара упиту."""
+
+    def __init__(self, estimate: int):
+        self.estimate = estimate
+
+    def keys(self, engine: "QueryEngine") -> None:
+        return None
+
+    def lines(self, depth: int) -> List[str]:
+        return ['  ' * depth + f"FullScan ~{self.estimate}"]
+
+
+class Plan:
+    """Приступ кандидатима и услов (residual) који се проверава само над њима."""
+
+    def __init__(self, access, residual: Optional[Predicate] = None):
+        self.access = access
+        self.residual = residual
+        self.estimate = access.estimate
+
+    def keys(self, engine: "QueryEngine") -> Set[Hashable]:
+        """Враћа кључеве ставки које задовољавају упит (без редоследа)."""
+        candidates = self.access.keys(engine)
+        if candidates is None:
+            return {key for key, item in engine.store.items()
+                    if self.residual is None or self.residual.matches(item, engine)}
+        if self.residual is None:
+            return candidates
+        return {key for key in candidates if self.residual.matches(engine.store.get(key), engine)}
+
+    def lines(self, depth: int = 0) -> List[str]:
+        result = self.access.lines(depth + (self.residual is not None))
+        if self.residual is not None:
+            result.insert(0, '  ' * depth + f"Filter [{self.residual}]")
+        return result
+
+    def __str__(self):
+        return '\n'.join(self.lines())
+
+
+class Page(NamedTuple):
+    """Једна страница резултата и курсор за следећу (None када је ово последња)."""
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(sort: str, position: tuple) -> str:
+    """Прави непрозиран курсор од кључа сортирања и позиције последње ставке на страници."""
+    data = json.dumps([sort, *position], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple:
+    """Враћа позицију из курсора; ValueError ако је курсор неисправан или за други кључ сортирања."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        cursor_sort, flag, value, order = data
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Неисправан курсор") from None
+    if cursor_sort != sort:
+        raise ValueError(f"Курсор је за сортирање '{cursor_sort}', а не '{sort}'")
+    return (flag, value, order)
+
+
+def _combine(predicates: List[Predicate]) -> Optional[Predicate]:
+    if not predicates:
+        return None
+    return predicates[0] if len(predicates) == 1 else And(*predicates)
+
+
+class QueryEngine:
+    """
+    Извршава упите над ставкама каталога уз избор најселективнијег индекса.
+
+    `fields` за свако поље даје функцију која из ставке враћа вредност, а
+    `multi_valued` за поља са више вредности даје функцију која враћа листу
+    (исте као у CatalogIndex, да провера и индекс дају исти резултат).
+    `store` је индекс са свим ставкама (TrigramIndex): из њега се узимају
+    ставке по кључу, редослед каталога и пун пролаз. За AND се кандидати
+    узимају из индекса са најмањом проценом, а остали услови се проверавају
+    само над њима; OR се решава унијом само ако је сваки услов индексиран.
+    `sorts` су сортирани индекси по којима page() враћа странице.
+    """
+
+    def __init__(self, fields: Dict[str, Callable[[Any], Any]], store: TrigramIndex,
+                 paths: Iterable[AccessPath] = (),
+                 multi_valued: Optional[Dict[str, Callable[[Any], Iterable[Any]]]] = None,
+                 sorts: Optional[Dict[str, SortedIndex]] = None):
+        self.fields = dict(fields)
+        self.store = store
+        self.paths = list(paths)
+        self.multi_valued = dict(multi_valued or {})
+        self.sorts = dict(sorts or {})
+
+    def value(self, item: Any, field: str) -> Any:
+        """Враћа вредност поља ставке."""
+        return self.fields[field](item)
+
+    def values(self, item: Any, field: str) -> List[Any]:
+        """Враћа вредности поља ставке (листу и за поља са једном вредношћу)."""
+        if field in self.multi_valued:
+            return list(self.multi_valued[field](item))
+        return [self.fields[field](item)]
+
+    def _prepare(self, query: Union[Predicate, Dict[str, str]]) -> Predicate:
+        if isinstance(query, dict):
+            query = from_criteria(query)
+        unknown = sorted(query.fields() - set(self.fields))
+        if unknown:
+            raise ValueError(f"Непозната поља у упиту: {', '.join(unknown)}")
+        return query
+
+    def _plan(self, predicate: Predicate) -> Optional[Plan]:
+        """Враћа план са индексом, или None ако услов не може да се реши преко индекса."""
+        if isinstance(predicate, And):
+            plans = [(p, self._plan(p)) for p in predicate.predicates]
+            indexed = [(p, plan) for p, plan in plans if plan is not None]
+            if not indexed:
+                return None
+            driver, plan = min(indexed, key=lambda pair: pair[1].estimate)
+            others = [p for p in predicate.predicates if p is not driver]
+            residual = ([plan.residual] if plan.residual is not None else []) + others
+            return Plan(plan.access, _combine(residual))
+        if isinstance(predicate, Or):
+            plans = [self._plan(p) for p in predicate.predicates]
+            if not plans or any(plan is None for plan in plans):
+                return None
+            return Plan(UnionScan(plans))
+        if isinstance(predicate, Not):
+            return None
+
+        best = None
+        for path in self.paths:
+            if path.supports(predicate):
+                estimate = path.estimate(predicate)
+                if best is None or estimate < best.estimate:
+                    best = IndexScan(path, predicate, estimate)
+        return None if best is None else Plan(best)
+
+    def compile(self, query: Union[Predicate, Dict[str, str]]) -> Plan:
+        """Претвара упит (предикат или речник поље → подниска) у план извршавања."""
+        query = self._prepare(query)
+        if isinstance(query, And) and not query.predicates:
+            return Plan(FullScan(len(self.store)))
+        return self._plan(query) or Plan(FullScan(len(self.store)), query)
+
+    def execute(self, query: Union[Predicate, Dict[str, str], Plan]) -> List[Any]:
+        """Враћа ставке које задовољавају упит, у редоследу каталога."""
+        plan = query if isinstance(query, Plan) else self.compile(query)
+        keys = sorted(plan.keys(self), key=self.store.order)
+        return [self.store.get(key) for key in keys]
+
+    def explain(self, query: Union[Predicate, Dict[str, str]]) -> str:
+        """Враћа изабрани план као текст, нпр. "Filter [...]" изнад "IndexScan facet [...] ~12"."""
+        return str(self.compile(query))
+
+    def page(self, query: Union[Predicate, Dict[str, str]], sort: str, limit: int = 50,
+             cursor: Optional[str] = None) -> Page:
+        """
+        Враћа једну страницу резултата упита сортираних по `sort` ("-поље" за опадајуће).
+
+        Курсор памти позицију последње враћене ставке у сортираном индексу,
+        па се страница N налази без рачунања страница пре ње, а измене
+        каталога између страница не померају резултате. Без индекса се
+        сортирани индекс чита од курсора и сваки унос проверава док страница
+        не буде пуна. Са индексом се кандидати или сортирају (када их је
+        мало), или се сортирани индекс чита и пропушта само кандидате.
+        """
+        if limit < 1:
+            raise ValueError("limit мора бити позитиван")
+        descending = sort.startswith('-')
+        index = self.sorts.get(sort.lstrip('-'))
+        if index is None:
+            raise ValueError(f"Нема сортираног индекса за '{sort.lstrip('-')}'")
+        after = None if cursor is None else decode_cursor(cursor, sort)
+        plan = self.compile(query)
+        residual = plan.residual
+        candidates = plan.access.keys(self)
+
+        if candidates is not None and len(candidates) ** 2 <= limit * max(len(index), 1):
+            # Мало кандидата: сортирају се сами, уместо читања индекса
+            positions = sorted(((index.position(key), key) for key in candidates), reverse=descending)
+            if after is not None:
+                positions = [(p, key) for p, key in positions if (p < after if descending else p > after)]
+            keys = (key for _, key in positions)
+        else:
+            keys = index.walk(after, descending)
+            if candidates is not None:
+                keys = (key for key in keys if key in candidates)
+
+        found = []
+        for key in keys:
+            if residual is None or residual.matches(self.store.get(key), self):
+                found.append(key)
+                if len(found) > limit:
+                    break
+        next_cursor = None
+        if len(found) > limit:
+            found.pop()
+            next_cursor = encode_cursor(sort, index.position(found[-1]))
+        return Page([self.store.get(key) for key in found], next_cursor)
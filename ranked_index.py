@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : ranked_index.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Инверзни индекс речи са BM25 рангирањем и тежинама поља
+
+import heapq
+import math
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from stemmer import tokens
+
+# Параметри BM25: засићење учесталости речи и утицај дужине поља
+K1 = 1.2
+B = 0.75
+
+
+class RankedIndex:
+    """
+    Инверзни индекс основа речи (stemmer.tokens) са BM25F рангирањем.
+
+    За сваку основу чува кључ ставке → учесталости по пољима. При упиту се
+    учесталости поља нормализују дужином поља, множе тежином поља и
+    сабирају, па погодак у наслову вреди више од поготка у напомени. Од
+    свих погодака гомилом се бира само `limit` најбољих.
+    """
+
+    def __init__(self, fields: Dict[str, Callable[[Any], Optional[str]]],
+                 boosts: Optional[Dict[str, float]] = None):
+        self.fields = dict(fields)
+        self.boosts = [float((boosts or {}).get(field, 1.0)) for field in self.fields]
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Празни индекс."""
+        with self._lock:
+            self._items: Dict[Hashable, Any] = {}
+            self._order: Dict[Hashable, int] = {}
+            self._next_order = 0
+            # Основа → кључ → парови (редни број поља, учесталост) за поља где се јавља
+            self._postings: Dict[str, Dict[Hashable, Tuple[Tuple[int, int], ...]]] = {}
+            # Кључ → (дужине поља, основе ставке), за уклањање и нормализацију
+            self._docs: Dict[Hashable, Tuple[Tuple[int, ...], Tuple[str, ...]]] = {}
+            self._total_lengths = [0] * len(self.fields)
+
+    def build(self, items: Iterable[tuple]) -> None:
+        """Поново гради индекс од парова (кључ, ставка) у редоследу каталога."""
+        with self._lock:
+            self.clear()
+            for key, item in items:
+                self.add(key, item)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, key: Hashable, item: Any) -> None:
+        """Додаје ставку на крај каталога, или замењује постојећу на истом месту."""
+        self.replace(key, key, item)
+
+    def replace(self, old_key: Hashable, key: Hashable, item: Any) -> None:
+        """Замењује ставку `old_key` новом ставком под кључем `key`, на истом месту у редоследу."""
+        with self._lock:
+            order = self._order.get(old_key)
+            self.remove(old_key)
+            if key != old_key:
+                self.remove(key)
+            if order is None:
+                order = self._next_order
+                self._next_order += 1
+
+            counts = [Counter(tokens(extract(item))) for extract in self.fields.values()]
+            lengths = tuple(sum(c.values()) for c in counts)
+            terms = set().union(*counts)
+            for term in terms:
+                self._postings.setdefault(term, {})[key] = tuple(
+                    (i, c[term]) for i, c in enumerate(counts) if term in c)
+            for i, length in enumerate(lengths):
+                self._total_lengths[i] += length
+            self._items[key] = item
+            self._order[key] = order
+            self._docs[key] = (lengths, tuple(terms))
+
+    def remove(self, key: Hashable) -> bool:
+        """Уклања ставку; враћа False ако није била у индексу."""
+        with self._lock:
+            if key not in self._items:
+                return False
+            lengths, terms = self._docs.pop(key)
+            for term in terms:
+                postings = self._postings[term]
+                del postings[key]
+                if not postings:
+                    del self._postings[term]
+            for i, length in enumerate(lengths):
+                self._total_lengths[i] -= length
+            del self._items[key]
+            del self._order[key]
+            return True
+
+    def scores(self, query: str) -> Dict[Hashable, float]:
+        """Враћа BM25F оцену сваке ставке која садржи бар једну реч упита."""
+        with self._lock:
+            count = len(self._items)
+            if not count:
+                return {}
+            # Нормализација дужине: 1 - B + B * дужина / просечна дужина поља
+            slopes = [B / max(total / count, 1e-9) for total in self._total_lengths]
+            boosts = self.boosts
+            docs = self._docs
+            result: Dict[Hashable, float] = {}
+            for term in set(tokens(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, frequencies in postings.items():
+                    lengths = docs[key][0]
+                    weight = 0.0
+                    for i, tf in frequencies:
+                        weight += boosts[i] * tf / (1 - B + slopes[i] * lengths[i])
+                    result[key] = result.get(key, 0.0) + idf * weight * (K1 + 1) / (weight + K1)
+            return result
+
+    def search_keys(self, query: str, limit: int = 20) -> List[Tuple[Hashable, float]]:
+        """Враћа до `limit` парова (кључ, оцена), од најбоље оцене; једнаке оцене по каталогу."""
+        with self._lock:
+            scores = self.scores(query)
+            order = self._order
+            return heapq.nsmallest(limit, scores.items(), key=lambda pair: (-pair[1], order[pair[0]]))
+
+    def search(self, query: str, limit: int = 20) -> List[Any]:
+        """Враћа до `limit` најрелевантнијих ставки за упит."""
+        with self._lock:
+            return [self._items[key] for key, _ in self.search_keys(query, limit)]
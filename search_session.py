@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : search_session.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Инкрементална претрага док корисник куца, уз LRU кеш претходних резултата
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Union
+
+from transliteration import fold_text
+from trigram_index import TrigramIndex
+
+# Колико последњих упита сесија памти
+MAX_UPITA = 32
+
+
+class SearchSession:
+    """
+    Сесија претраге подниске над индексом триграма, за претрагу док се куца.
+
+    Резултат упита је подскуп резултата сваког упита који је његова
+    подниска, па се проширен упит ("андр" → "андри") решава филтрирањем
+    претходног резултата уместо претраге целог каталога. При брисању
+    знакова претходни упити се налазе у LRU кешу (највише `max_entries`).
+    Кеш се празни када се индекс промени (TrigramIndex.version).
+    """
+
+    def __init__(self, get_index: Callable[[], TrigramIndex],
+                 field: Union[str, Sequence[str], None] = None, max_entries: int = MAX_UPITA):
+        self.get_index = get_index
+        self.field = field
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, List[Hashable]]" = OrderedDict()
+        self._state = None
+        # Бројачи за праћење колико упита је решено из кеша
+        self.stats: Dict[str, int] = {'hits': 0, 'refined': 0, 'full': 0}
+
+    def _current_index(self) -> TrigramIndex:
+        index = self.get_index()
+        state = (id(index), index.version)
+        if state != self._state:
+            self._cache.clear()
+            self._state = state
+        return index
+
+    def search_keys(self, query: str) -> List[Hashable]:
+        """Враћа кључеве ставки које садрже упит, у редоследу каталога."""
+        index = self._current_index()
+        folded = fold_text(query).strip()
+        keys = self._cache.get(folded)
+        if keys is not None:
+            self._cache.move_to_end(folded)
+            self.stats['hits'] += 1
+            return keys
+
+        # Најужи кеширан резултат неког упита који је подниска новог
+        ancestor = None
+        for cached, cached_keys in self._cache.items():
+            if cached in folded and (ancestor is None or len(cached_keys) < len(ancestor)):
+                ancestor = cached_keys
+        if ancestor is not None and len(ancestor) <= index.estimate(folded, self.field):
+            keys = [key for key in ancestor if index.matches(key, folded, self.field)]
+            self.stats['refined'] += 1
+        else:
+            keys = index.search_keys(folded, self.field)
+            if keys is None:
+                raise ValueError(f"Поље '{self.field}' није у индексу")
+            self.stats['full'] += 1
+
+        self._cache[folded] = keys
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return keys
+
+    def search(self, query: str) -> List[Any]:
+        """Враћа ставке које садрже упит, у редоследу каталога."""
+        index = self.get_index()
+        return [index.get(key) for key in self.search_keys(query)]
+
+    def reset(self) -> None:
+        """Празни кеш сесије."""
+        self._cache.clear()
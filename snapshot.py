@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : snapshot.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Бинарни колонски снимак CSV каталога за брзо покретање апликације
+
+import json
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, List, Optional
+
+from catalog_cache import PotpisFajla, potpis_fajla
+from csv_storage import atomicni_upis
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Заглавље фајла: ознака формата и верзија
+OZNAKA = b'KBSNAP'
+VERZIJA_SNIMKA = 1
+_ZAGLAVLJE = struct.Struct('<6sHI')
+_BROJ = struct.Struct('<I')
+
+# Начин записа колоне: вредности раздвојене NUL знаком, или низ крајњих помераја
+# када нека вредност садржи NUL
+_RAZDVOJENO = 0
+_POMERAJI = 1
+_RAZDVAJAC = '\x00'
+
+
+class Snimak:
+    """
+    Садржај снимка по колонама.
+
+    `validirano` означава да су редови сачувани из књига које су прошле
+    валидацију модела. Редови као речници се праве тек при првом приступу.
+    """
+
+    def __init__(self, kolone: List[str], vrednosti_kolona: List[List[Optional[str]]],
+                 broj_redova: int, validirano: bool):
+        self.kolone = kolone
+        self.vrednosti_kolona = vrednosti_kolona
+        self.broj_redova = broj_redova
+        self.validirano = validirano
+        self._redovi: Optional[List[Dict[str, Optional[str]]]] = None
+
+    def kolona(self, ime: str) -> Optional[List[Optional[str]]]:
+        """Враћа вредности колоне или None ако колона не постоји."""
+        if ime not in self.kolone:
+            return None
+        return self.vrednosti_kolona[self.kolone.index(ime)]
+
+    @property
+    def redovi(self) -> List[Dict[str, Optional[str]]]:
+        if self._redovi is None:
+            if self.kolone:
+                self._redovi = [dict(zip(self.kolone, red)) for red in zip(*self.vrednosti_kolona)]
+            else:
+                self._redovi = [{} for _ in range(self.broj_redova)]
+        return self._redovi
+
+
+def putanja_snimka(putanja_do_csv: str) -> str:
+    """Враћа путању до пратећег .snap фајла."""
+    return f"{putanja_do_csv}.snap"
+
+
+def _pomeraji(niz: array) -> bytes:
+    """Бајтови низа помераја у little-endian редоследу."""
+    if sys.byteorder != 'little':
+        niz = array(niz.typecode, niz)
+        niz.byteswap()
+    return niz.tobytes()
+
+
+def sacuvaj_snimak(putanja_do_csv: str, kolone: List[str], redovi: List[Dict[str, Optional[str]]],
+                   potpis: Optional[PotpisFajla], validirano: bool = False) -> bool:
+    """
+    Чува редове основног CSV фајла као колонски снимак.
+
+    Свака колона се чува као један UTF-8 блок (вредности раздвојене NUL
+    знаком, или са низом крајњих помераја када нека вредност садржи NUL),
+    па се при учитавању декодира једним позивом. `potpis` је потпис CSV
+    фајла коме редови одговарају; снимак важи само док се фајл не промени.
+    Ред са колонама које се не поклапају са `kolone` онемогућава снимак.
+    """
+    if potpis is None:
+        return False
+    kolone = list(kolone)
+    kljucevi = tuple(kolone)
+    if any(tuple(red) != kljucevi for red in redovi):
+        return False
+
+    prazne: Dict[str, List[int]] = {}
+    blokovi = []
+    for i, kolona in enumerate(kolone):
+        vrednosti = [red[kolona] for red in redovi]
+        nule = [j for j, v in enumerate(vrednosti) if v is None]
+        if nule:
+            prazne[str(i)] = nule
+            vrednosti = ['' if v is None else v for v in vrednosti]
+        tekst = _RAZDVAJAC.join(vrednosti)
+        if tekst.count(_RAZDVAJAC) == max(len(vrednosti) - 1, 0):
+            # Ниједна вредност не садржи NUL, па се колона декодира једним split-ом
+            blok = tekst.encode('utf-8')
+            blokovi.append(bytes([_RAZDVOJENO]) + _BROJ.pack(len(blok)) + blok)
+        else:
+            krajevi = array('I')
+            kraj = 0
+            for v in vrednosti:
+                kraj += len(v)
+                krajevi.append(kraj)
+            blok = ''.join(vrednosti).encode('utf-8')
+            blokovi.append(bytes([_POMERAJI]) + _pomeraji(krajevi) + _BROJ.pack(len(blok)) + blok)
+
+    zaglavlje = json.dumps({
+        'potpis': list(potpis),
+        'kolone': kolone,
+        'broj_redova': len(redovi),
+        'validirano': validirano,
+        'prazne': prazne,
+    }, ensure_ascii=False).encode('utf-8')
+
+    sadrzaj = _ZAGLAVLJE.pack(OZNAKA, VERZIJA_SNIMKA, len(zaglavlje)) + zaglavlje + b''.join(blokovi)
+    try:
+        with atomicni_upis(putanja_snimka(putanja_do_csv), binarno=True) as f:
+            f.write(sadrzaj)
+            f.write(_BROJ.pack(zlib.crc32(sadrzaj)))
+    except OSError as e:
+        # Снимак је само убрзање, па грешка при упису није фатална
+        logger.warning(f"Nije moguće sačuvati snimak kataloga: {e}")
+        return False
+    return True
+
+
+def ucitaj_snimak(putanja_do_csv: str) -> Optional[Snimak]:
+    """
+    Учитава снимак ако постоји, исправан је и одговара тренутном CSV фајлу.
+
+    Враћа None ако је снимак застарео, друге верзије или оштећен (не
+    поклапа се контролни збир), па позивалац треба да парсира CSV.
+    """
+    potpis = potpis_fajla(putanja_do_csv)
+    if potpis is None:
+        return None
+    try:
+        with open(putanja_snimka(putanja_do_csv), 'rb') as f:
+            podaci = f.read()
+    except OSError:
+        return None
+
+    try:
+        return _dekodiraj(podaci, potpis)
+    except (ValueError, KeyError, IndexError, TypeError, struct.error, UnicodeDecodeError) as e:
+        logger.warning(f"Snimak kataloga je neispravan i biće zanemaren: {e}")
+        return None
+
+
+def _dekodiraj(podaci: bytes, potpis: PotpisFajla) -> Optional[Snimak]:
+    """Декодира садржај снимка; враћа None ако снимак не одговара потпису фајла."""
+    if len(podaci) < _ZAGLAVLJE.size + _BROJ.size:
+        return None
+    oznaka, verzija, duzina_zaglavlja = _ZAGLAVLJE.unpack_from(podaci)
+    if oznaka != OZNAKA or verzija != VERZIJA_SNIMKA:
+        return None
+    (kontrolni_zbir,) = _BROJ.unpack_from(podaci, len(podaci) - _BROJ.size)
+    sadrzaj = memoryview(podaci)[:len(podaci) - _BROJ.size]
+    if zlib.crc32(sadrzaj) != kontrolni_zbir:
+        raise ValueError("kontrolni zbir se ne poklapa")
+
+    pos = _ZAGLAVLJE.size
+    zaglavlje = json.loads(bytes(sadrzaj[pos:pos + duzina_zaglavlja]).decode('utf-8'))
+    pos += duzina_zaglavlja
+    if zaglavlje['potpis'] != list(potpis):
+        return None
+
+    broj_redova = zaglavlje['broj_redova']
+    kolone = zaglavlje['kolone']
+    prazne = zaglavlje['prazne']
+    vrednosti_kolona = []
+    for i in range(len(kolone)):
+        nacin = sadrzaj[pos]
+        pos += 1
+        if nacin == _POMERAJI:
+            krajevi = array('I')
+            krajevi.frombytes(sadrzaj[pos:pos + 4 * broj_redova])
+            if sys.byteorder != 'little':
+                krajevi.byteswap()
+            pos += 4 * broj_redova
+        elif nacin != _RAZDVOJENO:
+            raise ValueError(f"nepoznat način zapisa kolone: {nacin}")
+        (duzina,) = _BROJ.unpack_from(sadrzaj, pos)
+        pos += _BROJ.size
+        tekst = str(sadrzaj[pos:pos + duzina], 'utf-8')
+        pos += duzina
+
+        if nacin == _RAZDVOJENO:
+            vrednosti = tekst.split(_RAZDVAJAC) if broj_redova else []
+        else:
+            vrednosti = [tekst[a:b] for a, b in zip([0] + krajevi[:-1].tolist(), krajevi)]
+        if len(vrednosti) != broj_redova:
+            raise ValueError("neispravan broj vrednosti u koloni")
+        for j in prazne.get(str(i), ()):
+            vrednosti[j] = None
+        vrednosti_kolona.append(vrednosti)
+
+    if pos != len(sadrzaj):
+        raise ValueError("neočekivana dužina snimka")
+    return Snimak(kolone, vrednosti_kolona, broj_redova, bool(zaglavlje['validirano']))
+
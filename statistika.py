@@ -10,6 +10,57 @@
 Сви коментари су на српском, ћирилицом.
 """
 
+import heapq
+from typing import Any, Callable, Dict, Iterable, List
+
+
+def izracunaj_statistiku(data: Iterable[Dict[str, str]], podeli_pisce: Callable[[str], List[str]],
+                         top_n: int = 5) -> Dict[str, Any]:
+    """
+    Израчунава све статистике екрана статистике у једном пролазу кроз редове.
+
+    Враћа речник са кључевима ukupno_knjiga, ukupno_autora, broj_zanrova,
+    broj_serijala, broj_pozajmica, knjige_po_zanru, knjige_po_izdavacu и
+    top_autori; вредности су исте као из појединачних функција испод.
+    """
+    ukupno = 0
+    pozajmice = 0
+    zanrovi: Dict[str, int] = {}
+    izdavaci: Dict[str, int] = {}
+    serijali = set()
+    autori_broj: Dict[str, int] = {}
+    for row in data:
+        ukupno += 1
+        for autor in podeli_pisce(row.get("Писац", "")):
+            autori_broj[autor] = autori_broj.get(autor, 0) + 1
+        zanr = row.get("Жанр", "").strip()
+        if zanr:
+            zanrovi[zanr] = zanrovi.get(zanr, 0) + 1
+        izdavac = row.get("Издавач", "").strip()
+        if izdavac:
+            izdavaci[izdavac] = izdavaci.get(izdavac, 0) + 1
+        serijal = row.get("Серијал", "").strip()
+        if serijal:
+            serijali.add(serijal)
+        if row.get("Позајмљена", "").strip() and not row.get("Враћена", "").strip():
+            pozajmice += 1
+
+    # nlargest је стабилан као sorted(..., reverse=True), па једнаки бројеви задржавају редослед појављивања
+    if top_n >= 0:
+        top = heapq.nlargest(top_n, autori_broj.items(), key=lambda x: x[1])
+    else:
+        top = sorted(autori_broj.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    return {
+        "ukupno_knjiga": ukupno,
+        "ukupno_autora": len(autori_broj),
+        "broj_zanrova": len(zanrovi),
+        "broj_serijala": len(serijali),
+        "broj_pozajmica": pozajmice,
+        "knjige_po_zanru": zanrovi,
+        "knjige_po_izdavacu": izdavaci,
+        "top_autori": top,
+    }
+
 # Функције за статистику по броју књига
 def ukupno_knjiga(data):
     """Враћа укупан број књига."""
@@ -18,52 +69,38 @@ def ukupno_knjiga(data):
 # Функције за статистику по броју аутора
 def ukupno_autora(data, podeli_pisce):
     """Враћа укупан број јединствених аутора."""
-    autori = set()
-    for row in data:
-        for autor in podeli_pisce(row.get("Писац", "")):
-            autori.add(autor)
-    return len(autori)
+    return izracunaj_statistiku(data, podeli_pisce, 0)["ukupno_autora"]
 
 # Функције за статистику по броју жанрова
 def broj_zanrova(data):
     """Враћа број јединствених жанрова."""
-    return len({row.get("Жанр", "").strip() for row in data if row.get("Жанр", "").strip()})
+    return izracunaj_statistiku(data, _bez_pisaca, 0)["broj_zanrova"]
 
 # Функције за статистику по броју серијала
 def broj_serijala(data):
     """Враћа број јединствених серијала."""
-    return len({row.get("Серијал", "").strip() for row in data if row.get("Серијал", "").strip()})
+    return izracunaj_statistiku(data, _bez_pisaca, 0)["broj_serijala"]
 
 # Функције за статистику по броју позајмљених књига
 def broj_pozajmica(data):
     """Враћа број тренутно позајмљених књига (нису враћене)."""
-    return sum(1 for row in data if row.get("Позајмљена", "").strip() and not row.get("Враћена", "").strip())
+    return izracunaj_statistiku(data, _bez_pisaca, 0)["broj_pozajmica"]
 
 # Функције за статистику по броју књига по жанру
 def knjige_po_zanru(data):
     """Враћа речник: жанр -> број књига."""
-    rez = {}
-    for row in data:
-        zanr = row.get("Жанр", "").strip()
-        if zanr:
-            rez[zanr] = rez.get(zanr, 0) + 1
-    return rez
+    return izracunaj_statistiku(data, _bez_pisaca, 0)["knjige_po_zanru"]
 
 # Функције за статистику по броју књига по издавачу
 def knjige_po_izdavacu(data):
     """Враћа речник: издавач -> број књига."""
-    rez = {}
-    for row in data:
-        izdavac = row.get("Издавач", "").strip()
-        if izdavac:
-            rez[izdavac] = rez.get(izdavac, 0) + 1
-    return rez
+    return izracunaj_statistiku(data, _bez_pisaca, 0)["knjige_po_izdavacu"]
 
 # Функције за статистику по броју топ N аутора
 def top_autori(data, podeli_pisce, top_n=5):
     """Враћа листу топ N аутора као (име, број књига)."""
-    autori_broj = {}
-    for row in data:
-        for autor in podeli_pisce(row.get("Писац", "")):
-            autori_broj[autor] = autori_broj.get(autor, 0) + 1
-    return sorted(autori_broj.items(), key=lambda x: x[1], reverse=True)[:top_n]
\ No newline at end of file
+    return izracunaj_statistiku(data, podeli_pisce, top_n)["top_autori"]
+
+def _bez_pisaca(pisci_text):
+    """Замена за podeli_pisce када функцији писци нису потребни."""
+    return ()
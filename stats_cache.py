@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : stats_cache.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Кеш израчунатих статистика и исцртаних графикона, везан за потпис каталога
+
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from catalog_cache import potpis_kataloga
+
+
+class _Unos:
+    """Статистике и графикони једне верзије каталога."""
+
+    def __init__(self, potpis: tuple, agregati: Any):
+        self.potpis = potpis
+        self.agregati = agregati
+        self.grafikoni: Dict[Hashable, bytes] = {}
+
+
+class StatsCache:
+    """
+    Кеш статистика и PNG слика графикона по путањи каталога.
+
+    Верзија каталога је његов потпис (potpis_kataloga: mtime, величина и
+    inode CSV-а и журнала), па свако чување, дописивање или упис у журнал
+    аутоматски поништава унос. Поновно отварање статистике над непромењеним
+    каталогом не чита CSV и не црта графиконе поново.
+    """
+
+    def __init__(self):
+        self._unosi: Dict[str, _Unos] = {}
+        self._lock = threading.RLock()
+        self.pogoci = 0
+        self.promasaji = 0
+
+    @staticmethod
+    def _kljuc(putanja: str) -> str:
+        return os.path.abspath(putanja)
+
+    def _vazeci(self, putanja: str, potpis: Optional[tuple]) -> Optional[_Unos]:
+        unos = self._unosi.get(self._kljuc(putanja))
+        if unos is not None and potpis is not None and unos.potpis == potpis:
+            return unos
+        return None
+
+    def agregati(self, putanja: str, izracunaj: Callable[[str], Any]) -> Any:
+        """Враћа статистике каталога из кеша или их рачуна помоћу `izracunaj(putanja)`."""
+        potpis = potpis_kataloga(putanja)
+        with self._lock:
+            unos = self._vazeci(putanja, potpis)
+            if unos is not None:
+                self.pogoci += 1
+                return unos.agregati
+            self.promasaji += 1
+
+        agregati = izracunaj(putanja)
+
+        with self._lock:
+            if potpis is None:
+                self._unosi.pop(self._kljuc(putanja), None)
+            else:
+                # Потпис је узет пре рачунања: ако се каталог у међувремену
+                # променио, следећи позив ће видети други потпис
+                self._unosi[self._kljuc(putanja)] = _Unos(potpis, agregati)
+        return agregati
+
+    def grafikon(self, putanja: str, kljuc: Hashable, nacrtaj: Callable[[], bytes]) -> bytes:
+        """
+        Враћа PNG слику графикона `kljuc` за тренутну верзију каталога.
+
+        Кључ треба да садржи све што утиче на изглед (нпр. натписе на
+        тренутном језику). Слика се памти само уз важеће статистике истог
+        каталога; иначе се само исцрта.
+        """
+        potpis = potpis_kataloga(putanja)
+        with self._lock:
+            unos = self._vazeci(putanja, potpis)
+            if unos is not None and kljuc in unos.grafikoni:
+                self.pogoci += 1
+                return unos.grafikoni[kljuc]
+            self.promasaji += 1
+
+        slika = nacrtaj()
+
+        with self._lock:
+            unos = self._vazeci(putanja, potpis)
+            if unos is not None:
+                unos.grafikoni[kljuc] = slika
+        return slika
+
+    def ponisti(self, putanja: Optional[str] = None) -> None:
+        """Поништава кеш за дату путању, или цео кеш ако путања није задата."""
+        with self._lock:
+            if putanja is None:
+                self._unosi.clear()
+            else:
+                self._unosi.pop(self._kljuc(putanja), None)
+
+    def statistika(self) -> Dict[str, int]:
+        """Враћа бројаче погодака и промашаја кеша."""
+        with self._lock:
+            return {
+                'pogoci': self.pogoci,
+                'promasaji': self.promasaji,
+                'unosi': len(self._unosi),
+            }
+
+
+# Глобална инстанца кеша статистика
+STATS_CACHE = None
+
+def get_stats_cache() -> StatsCache:
+    """Враћа глобалну инстанцу кеша статистика"""
+    global STATS_CACHE
+    if STATS_CACHE is None:
+        STATS_CACHE = StatsCache()
+    return STATS_CACHE
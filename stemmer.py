@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : stemmer.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Лаки стемер за српски: скидање падежних и бројних наставака за претрагу
+
+import re
+from functools import lru_cache
+from typing import List
+
+from transliteration import fold_text
+
+# Наставци (над текстом сведеним са fold_text), од дужих ка краћим, да се
+# прво скине најдужи: књигама → knjig, књиге → knjig, књигу → knjig
+_NASTAVCI = (
+    'ovima', 'evima', 'ijama',
+    'ama', 'ima', 'ega', 'emu', 'omu', 'oga', 'ove', 'eve', 'ovi', 'evi', 'ova', 'eva',
+    'om', 'em', 'og', 'oj', 'ih', 'im', 'ju', 'ji',
+    'a', 'e', 'i', 'o', 'u',
+)
+
+# Најкраћа основа која остаје после скидања наставка
+MIN_OSNOVA = 3
+
+_REC = re.compile(r'\w+')
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """
+    Враћа основу речи сведене са fold_text (нпр. "knjige" → "knjig").
+
+    Стемер је намерно лак: скида један наставак ако после њега остаје бар
+    MIN_OSNOVA знакова, без гласовних промена (књизи остаје "knjiz").
+    Речник каталога је мали, па се основе памте.
+    """
+    for nastavak in _NASTAVCI:
+        if word.endswith(nastavak) and len(word) - len(nastavak) >= MIN_OSNOVA:
+            return word[:-len(nastavak)]
+    return word
+
+
+def tokens(text) -> List[str]:
+    """Дели текст на речи, своди их са fold_text и враћа њихове основе."""
+    return [stem(word) for word in _REC.findall(fold_text(text))]
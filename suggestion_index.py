@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : suggestion_index.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Индекс предлога за допуњавање: сортирани низ за префиксе и триграми за подниске
+
+import heapq
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Union
+
+from transliteration import fold_text
+
+# Колико предлога се подразумевано враћа
+MAX_PREDLOGA = 7
+
+# Дужина n-грама за претрагу подниске
+N = 3
+
+# Знак већи од свих осталих, за горњу границу опсега префикса
+_KRAJ = chr(0x10FFFF)
+
+
+class SuggestionIndex:
+    """
+    Индекс различитих вредности (нпр. регистар писаца) за предлоге док се куца.
+
+    Вредности се своде са fold_text, па упит не зависи од писма ни
+    дијакритика. Почеци свих речи вредности чувају се у сортираном низу,
+    па се префикс вредности или речи налази бисекцијом; за подниске од N и
+    више знакова служи мапа N-грама. Предлози се рангирају: прво префикс
+    целе вредности, па префикс речи, па подниска, а унутар групе по
+    учесталости вредности.
+    """
+
+    def __init__(self, values: Union[Iterable[str], Dict[str, int]] = ()):
+        self.build(values)
+
+    def build(self, values: Union[Iterable[str], Dict[str, int]]) -> None:
+        """
+        Гради индекс од вредности; поновљене вредности повећавају учесталост.
+
+        Може се проследити и речник вредност → учесталост.
+        """
+        counts = Counter(value for value in values if value) if not isinstance(values, dict) \
+            else Counter({value: count for value, count in values.items() if value})
+        self._values: List[str] = list(counts)
+        self._counts: List[int] = [counts[value] for value in self._values]
+        self._keys: List[str] = [fold_text(value) for value in self._values]
+
+        suffixes = []
+        grams: Dict[str, List[int]] = {}
+        for vid, key in enumerate(self._keys):
+            for pos, char in enumerate(key):
+                if not char.isspace() and (pos == 0 or key[pos - 1].isspace()):
+                    suffixes.append((key[pos:], vid))
+            for gram in {key[i:i + N] for i in range(len(key) - N + 1)}:
+                grams.setdefault(gram, []).append(vid)
+        suffixes.sort()
+        self._suffixes = [suffix for suffix, _ in suffixes]
+        self._suffix_ids = [vid for _, vid in suffixes]
+        self._grams = grams
+        # Кратких упита има мало различитих, а опсег префикса им је највећи
+        self._short: Dict[tuple, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def suggest(self, query: str, limit: int = MAX_PREDLOGA) -> List[str]:
+        """Враћа до `limit` вредности које садрже упит, најбоље рангиране прве."""
+        folded = fold_text(query).lstrip()
+        if not folded.strip() or limit <= 0:
+            return []
+        if len(folded) < N:
+            cached = self._short.get((folded, limit))
+            if cached is None:
+                cached = self._short[(folded, limit)] = self._suggest(folded, limit)
+            return list(cached)
+        return self._suggest(folded, limit)
+
+    def _suggest(self, folded: str, limit: int) -> List[str]:
+        keys = self._keys
+
+        # Разред поготка: 0 - префикс вредности, 1 - префикс речи, 2 - подниска
+        classes: Dict[int, int] = {}
+        lo = bisect_left(self._suffixes, folded)
+        hi = bisect_left(self._suffixes, folded + _KRAJ, lo)
+        for vid in self._suffix_ids[lo:hi]:
+            classes[vid] = 0 if keys[vid].startswith(folded) else min(classes.get(vid, 1), 1)
+
+        # Подниске само попуњавају места која префикси нису попунили
+        if len(classes) < limit:
+            if len(folded) >= N:
+                candidates = min((self._grams.get(folded[i:i + N], ()) for i in range(len(folded) - N + 1)),
+                                 key=len)
+            else:
+                # Упит краћи од N-грама ретко стигне довде: префикси обично попуне листу
+                candidates = range(len(keys))
+            for vid in candidates:
+                if vid not in classes and folded in keys[vid]:
+                    classes[vid] = 2
+
+        counts = self._counts
+        best = heapq.nsmallest(limit, classes.items(),
+                               key=lambda pair: (pair[1], -counts[pair[0]], keys[pair[0]]))
+        return [self._values[vid] for vid, _ in best]
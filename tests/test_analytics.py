@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_analytics.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за аналитику каталога над колонама
+
+import pytest
+
+import Biblioteka as bib
+import statistika
+from analytics import PythonAnalitika, analitika_iz_kolona, napravi_analitiku
+from catalog_cache import get_catalog_cache
+from stats_cache import get_stats_cache
+from tests.test_biblioteka import napravi_red
+from tests.test_statistika import napravi_redove
+
+
+def dodaj_godine(redovi):
+    for i, red in enumerate(redovi):
+        red["Година издавања"] = ["", "1945.", "1962", "1969", "2001", "није година"][i % 6]
+        red["Повез"] = ["Тврди повез", "", "Меки повез"][i % 3]
+    return redovi
+
+
+class TestPythonAnalitika:
+    """Тестови за чист Python мотор"""
+
+    def test_isto_kao_statistika(self):
+        """Тест да груписања и топ листе одговарају функцијама из statistika.py"""
+        redovi = dodaj_godine(napravi_redove(200))
+        analitika = PythonAnalitika(redovi, bib.podeli_pisce)
+        assert len(analitika) == 200
+        assert analitika.grupisi("Жанр") == statistika.knjige_po_zanru(redovi)
+        assert analitika.grupisi("Издавач") == statistika.knjige_po_izdavacu(redovi)
+        assert analitika.top_autori(3) == statistika.top_autori(redovi, bib.podeli_pisce, 3)
+        assert analitika.broj_pozajmica() == statistika.broj_pozajmica(redovi)
+
+    def test_godine_i_decenije(self):
+        """Тест хистограма година и расподеле по деценијама"""
+        analitika = PythonAnalitika(dodaj_godine(napravi_redove(12)), bib.podeli_pisce)
+        assert analitika.histogram_godina() == {1945: 2, 1962: 2, 1969: 2, 2001: 2}
+        assert analitika.po_decenijama() == {1940: 2, 1960: 4, 2000: 2}
+
+
+def test_numpy_isto_kao_python():
+    """Тест да NumPy мотор даје исте резултате као чист Python"""
+    pytest.importorskip("numpy")
+    for seme in range(4):
+        redovi = dodaj_godine(napravi_redove(500, seme))
+        py = napravi_analitiku(redovi, bib.podeli_pisce, koristi_numpy=False)
+        nump = napravi_analitiku(redovi, bib.podeli_pisce, koristi_numpy=True)
+        for kolona in ("Жанр", "Издавач", "Повез", "Серијал"):
+            assert list(nump.grupisi(kolona).items()) == list(py.grupisi(kolona).items())
+            for n in (0, 1, 2, 3, 10):
+                assert nump.top(kolona, n) == py.top(kolona, n)
+        for n in (1, 2, 4, 5, 20):
+            assert nump.top_autori(n) == py.top_autori(n)
+        assert nump.histogram_godina() == py.histogram_godina()
+        assert nump.po_decenijama() == py.po_decenijama()
+        assert nump.broj_pozajmica() == py.broj_pozajmica()
+    assert napravi_analitiku([], bib.podeli_pisce).top_autori() == []
+
+
+def test_statistika_isto_kao_izracunaj_statistiku():
+    """Тест да статистика из колона (и са празним ћелијама) одговара izracunaj_statistiku"""
+    redovi = dodaj_godine(napravi_redove(300, 1))
+    ocekivano = statistika.izracunaj_statistiku(redovi, bib.podeli_pisce)
+    kolone = {kolona: [red.get(kolona) for red in redovi] for kolona in redovi[0]}
+    kolone["Серијал"] = [None] * len(redovi)
+    bez_serijala = [{**red, "Серијал": ""} for red in redovi]
+    assert napravi_analitiku(redovi, bib.podeli_pisce, koristi_numpy=False).statistika() == ocekivano
+    assert analitika_iz_kolona(kolone, bib.podeli_pisce, koristi_numpy=False).statistika() == \
+        statistika.izracunaj_statistiku(bez_serijala, bib.podeli_pisce)
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return
+    assert napravi_analitiku(redovi, bib.podeli_pisce, koristi_numpy=True).statistika() == ocekivano
+
+
+def test_statistika_kataloga_nad_snimkom(tmp_path, monkeypatch):
+    """Тест да се велики неучитан каталог броји над колонама снимка, без кеширања редова"""
+    monkeypatch.setattr(bib, "PRAG_ANALITIKE", 10)
+    putanja = str(tmp_path / "Biblioteka.csv")
+    redovi = [{**napravi_red(red["Редни број"], f"Наслов {red['Редни број']}"), **red}
+              for red in dodaj_godine(napravi_redove(50, 2))]
+    assert bib.sacuvaj_podatke(putanja, redovi)
+    redovi = bib.ucitaj_podatke(putanja)
+    get_catalog_cache().ponisti()
+    get_stats_cache().ponisti()
+
+    assert bib.statistika_kataloga(putanja) == statistika.izracunaj_statistiku(redovi, bib.podeli_pisce)
+    assert not get_catalog_cache().sadrzi(putanja)
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_biblioteka.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за рад са CSV каталогом у модулу Biblioteka
+
+import csv
+import os
+
+import pytest
+
+import Biblioteka as bib
+import utils
+from catalog_cache import get_catalog_cache
+from config import CSV_COLUMNS
+from csv_storage import ucitaj_meta
+
+
+def napravi_red(redni_broj, naslov, pisac="Тест аутор", **ostalo):
+    """Прави CSV ред са свим обавезним колонама"""
+    red = {kolona: "" for kolona in CSV_COLUMNS}
+    red.update({"Редни број": str(redni_broj), "Наслов": naslov, "Писац": pisac})
+    red.update(ostalo)
+    return red
+
+
+@pytest.fixture
+def putanja(tmp_path):
+    """Прави привремени CSV каталог са две књиге"""
+    putanja = tmp_path / "Biblioteka.csv"
+    with open(putanja, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerow(napravi_red(1, "На Дрини ћуприја", "Иво Андрић", Жанр="Роман"))
+        writer.writerow(napravi_red(2, "Дервиш и смрт", "Меша Селимовић", Жанр="Роман"))
+    get_catalog_cache().ponisti()
+    return str(putanja)
+
+
+class TestKesKataloga:
+    """Тестови за кеш учитаног каталога"""
+
+    def test_ponovno_ucitavanje_pogadja_kes(self, putanja):
+        """Тест да друго учитавање непромењеног фајла не парсира поново"""
+        kes = get_catalog_cache()
+        kes.resetuj_brojace()
+
+        prvi = bib.ucitaj_podatke(putanja)
+        drugi = bib.ucitaj_podatke(putanja)
+
+        assert prvi == drugi
+        assert kes.statistika()["promasaji"] == 1
+        assert kes.statistika()["pogoci"] == 1
+
+    def test_izmena_reda_ne_kvari_kes(self, putanja):
+        """Тест да измена враћених редова не мења садржај кеша"""
+        podaci = bib.ucitaj_podatke(putanja)
+        podaci[0]["Наслов"] = "Измењено"
+
+        assert bib.ucitaj_podatke(putanja)[0]["Наслов"] == "На Дрини ћуприја"
+
+    def test_spoljna_izmena_fajla_ponistava_kes(self, putanja):
+        """Тест да се фајл поново парсира када се промени на диску"""
+        bib.ucitaj_podatke(putanja)
+        with open(putanja, "a", newline="", encoding="utf-8") as f:
+            csv.DictWriter(f, fieldnames=CSV_COLUMNS).writerow(napravi_red(3, "Сеобе"))
+
+        assert len(bib.ucitaj_podatke(putanja)) == 3
+
+    def test_cuvanje_puni_kes(self, putanja):
+        """Тест да чување уписује нове редове у кеш"""
+        kes = get_catalog_cache()
+        podaci = bib.ucitaj_podatke(putanja)
+        podaci[1]["Напомена"] = "Прво издање"
+        assert bib.sacuvaj_podatke(putanja, podaci)
+
+        kes.resetuj_brojace()
+        ucitani = bib.ucitaj_podatke(putanja)
+
+        assert ucitani[1]["Напомена"] == "Прво издање"
+        assert kes.statistika()["pogoci"] == 1
+        assert kes.statistika()["promasaji"] == 0
+
+
+class TestIteracijaKataloga:
+    """Тестови за учитавање каталога ред по ред"""
+
+    def test_filtar_i_rani_prekid(self, putanja):
+        """Тест да се редови враћају док се фајл чита и да филтар ради"""
+        tok = bib.iter_podataka(putanja, lambda k: k["Писац"] == "Меша Селимовић")
+        assert next(tok)["Наслов"] == "Дервиш и смрт"
+        assert next(tok, None) is None
+
+    def test_iteracija_iz_kesa(self, putanja):
+        """Тест да се учитан каталог не парсира поново"""
+        kes = get_catalog_cache()
+        bib.ucitaj_podatke(putanja)
+        kes.resetuj_brojace()
+
+        assert [k["Редни број"] for k in bib.iter_podataka(putanja)] == ["1", "2"]
+        assert kes.statistika()["pogoci"] == 1
+
+    def test_ostecen_fajl_daje_praznu_listu(self, tmp_path):
+        """Тест да CSV грешка усред фајла не враћа делимичан каталог"""
+        putanja = tmp_path / "Biblioteka.csv"
+        prazno = "," * (len(CSV_COLUMNS) - 2)
+        # Поље дуже од csv.field_size_limit() изазива csv.Error у другом реду
+        redovi = [",".join(CSV_COLUMNS), "1,Наслов" + prazno, "2," + "x" * (csv.field_size_limit() + 1) + prazno]
+        putanja.write_text("\n".join(redovi), encoding="utf-8")
+
+        assert bib.ucitaj_podatke(str(putanja)) == []
+
+
+class TestDodavanjeKnjige:
+    """Тестови за дописивање књига на крај каталога"""
+
+    def test_dodavanje_dopisuje_red(self, putanja):
+        """Тест да се књига дописује без преписивања постојећих редова"""
+        with open(putanja, "rb") as f:
+            pre = f.read()
+
+        assert bib.dodaj_knjigu(putanja, {"Наслов": "Сеобе", "Писац": "Милош Црњански"})
+
+        with open(putanja, "rb") as f:
+            posle = f.read()
+        assert posle.startswith(pre)
+        podaci = bib.ucitaj_podatke(putanja)
+        assert [k["Редни број"] for k in podaci] == ["1", "2", "3"]
+        assert podaci[2]["Писац"] == "Милош Црњански"
+
+    def test_redni_broj_iz_meta_fajla(self, putanja):
+        """Тест да узастопна додавања добијају узастопне редне бројеве"""
+        bib.dodaj_knjigu(putanja, {"Наслов": "Прва"})
+        bib.dodaj_knjigu(putanja, {"Наслов": "Друга, са зарезом"})
+
+        podaci = bib.ucitaj_podatke(putanja)
+        assert [k["Редни број"] for k in podaci] == ["1", "2", "3", "4"]
+        assert podaci[3]["Наслов"] == "Друга, са зарезом"
+        assert os.path.exists(putanja + ".meta")
+
+    def test_broj_obrisane_knjige_se_ne_dodeljuje(self, putanja):
+        """Тест да се број обрисане књиге не додељује поново ни после других измена"""
+        assert bib.obrisi_knjigu(putanja, "Дервиш и смрт")
+        assert ucitaj_meta(putanja)["sledeci_redni_broj"] == 3
+        # Измена мимо дописивања чини .meta застарелим
+        assert bib.izmeni_knjigu(putanja, "На Дрини ћуприја", {"Напомена": "Потписана"})
+        assert ucitaj_meta(putanja) is None
+
+        assert bib.dodaj_knjigu(putanja, {"Наслов": "Сеобе"})
+        assert bib.dodaj_knjigu(putanja, {"Наслов": "Прва", "Оцена": "5"})
+        assert [k["Редни број"] for k in bib.ucitaj_podatke(putanja)] == ["1", "3", "4"]
+        assert ucitaj_meta(putanja)["praznine"] == [[2, 3]]
+
+    def test_nepoznata_kolona_prepisuje_fajl(self, putanja):
+        """Тест да непозната колона изазива потпуно преписивање фајла"""
+        assert bib.dodaj_knjigu(putanja, {"Наслов": "Сеобе", "Оцена": "5"})
+
+        with open(putanja, encoding="utf-8") as f:
+            zaglavlje = next(csv.reader(f))
+        assert "Оцена" in zaglavlje
+        assert len(bib.ucitaj_podatke(putanja)) == 3
+
+    def test_backup_po_rasporedu(self, putanja, monkeypatch):
+        """Тест да се резервна копија прави тек после задатог броја дописивања"""
+        monkeypatch.setattr(bib, "APPEND_BACKUP_INTERVAL", 2)
+        for i in range(3):
+            bib.dodaj_knjigu(putanja, {"Наслов": f"Књига {i}"})
+
+        backupi = [f for f in os.listdir(os.path.dirname(putanja)) if ".backup_" in f]
+        assert len(backupi) == 1
+
+
+class TestZurnalIzmena:
+    """Тестови за журнал измена над CSV каталогом"""
+
+    @pytest.fixture(autouse=True)
+    def ukljuci_zurnal(self, monkeypatch):
+        monkeypatch.setattr(bib, "CSV_JOURNAL_ENABLED", True)
+
+    def test_izmena_ne_prepisuje_csv(self, putanja):
+        """Тест да се измена бележи у журнал, а CSV остаје непромењен"""
+        with open(putanja, "rb") as f:
+            pre = f.read()
+
+        assert bib.izmeni_knjigu(putanja, "Дервиш и смрт", {"Напомена": "Потписана"})
+
+        with open(putanja, "rb") as f:
+            assert f.read() == pre
+        assert os.path.exists(putanja + ".journal")
+
+        get_catalog_cache().ponisti()
+        assert bib.ucitaj_podatke(putanja)[1]["Напомена"] == "Потписана"
+
+    def test_promena_rednog_broja(self, putanja):
+        """Тест да књига са промењеним редним бројем после поновног учитавања није удвостручена"""
+        assert bib.izmeni_knjigu(putanja, "На Дрини ћуприја", {"Редни број": 10, "Напомена": None})
+        u_kesu = bib.ucitaj_podatke(putanja)
+        assert [k["Редни број"] for k in u_kesu] == ["10", "2"]
+        assert u_kesu[0]["Напомена"] == ""
+
+        get_catalog_cache().ponisti()
+        assert bib.ucitaj_podatke(putanja) == u_kesu
+
+    def test_izmena_u_kesu_kao_posle_ucitavanja(self, putanja):
+        """Тест да кеш после измене кроз журнал садржи ред какав враћа поновно учитавање"""
+        assert bib.izmeni_knjigu(putanja, "Дервиш и смрт", {"Година издавања": 1966, "Напомена": None})
+        u_kesu = bib.ucitaj_podatke(putanja)
+        assert os.path.exists(putanja + ".journal")
+
+        get_catalog_cache().ponisti()
+        assert bib.ucitaj_podatke(putanja) == u_kesu
+        assert u_kesu[1]["Година издавања"] == "1966"
+
+    def test_brisanje_i_dodavanje_kroz_zurnal(self, putanja):
+        """Тест да се брисање и додавање примењују при поновном учитавању"""
+        assert bib.obrisi_knjigu(putanja, "На Дрини ћуприја")
+        assert bib.dodaj_knjigu(putanja, {"Наслов": "Сеобе"})
+
+        get_catalog_cache().ponisti()
+        podaci = bib.ucitaj_podatke(putanja)
+        assert [k["Наслов"] for k in podaci] == ["Дервиш и смрт", "Сеобе"]
+        assert podaci[1]["Редни број"] == "3"
+
+    def test_iter_podataka_primenjuje_zurnal(self, putanja):
+        """Тест да редови у току имају исти редослед као учитана листа"""
+        assert bib.obrisi_knjigu(putanja, "На Дрини ћуприја")
+        assert bib.dodaj_knjigu(putanja, {"Наслов": "Сеобе"})
+        assert bib.izmeni_knjigu(putanja, "Дервиш и смрт", {"Напомена": "Потписана"})
+
+        get_catalog_cache().ponisti()
+        tok = list(bib.iter_podataka(putanja))
+        assert tok == bib.ucitaj_podatke(putanja)
+        assert [k["Наслов"] for k in tok] == ["Дервиш и смрт", "Сеобе"]
+        assert utils.ucitaj_podatke(putanja) == tok
+
+    def test_ostecen_zapis_se_preskace(self, putanja):
+        """Тест да прекинут упис у журнал не квари учитавање"""
+        bib.izmeni_knjigu(putanja, "Дервиш и смрт", {"Напомена": "Прва"})
+        with open(putanja + ".journal", "a", encoding="utf-8") as f:
+            f.write('{"op": "upsert", "red": {"Редни')
+        bib.izmeni_knjigu(putanja, "На Дрини ћуприја", {"Напомена": "Друга"})
+
+        get_catalog_cache().ponisti()
+        podaci = bib.ucitaj_podatke(putanja)
+        assert [k["Напомена"] for k in podaci] == ["Друга", "Прва"]
+
+    def test_sazimanje_posle_praga(self, putanja, monkeypatch):
+        """Тест да се журнал сажима у CSV када пређе праг броја записа"""
+        from csv_journal import get_journal
+        monkeypatch.setattr(get_journal(putanja), "max_records", 3)
+
+        for i in range(3):
+            bib.izmeni_knjigu(putanja, "Дервиш и смрт", {"Напомена": f"Измена {i}"})
+
+        assert not os.path.exists(putanja + ".journal")
+        get_catalog_cache().ponisti()
+        assert bib.ucitaj_podatke(putanja)[1]["Напомена"] == "Измена 2"
+
+
+class TestAtomskoCuvanje:
+    """Тестови за атомско чување CSV фајла"""
+
+    def test_prekinut_upis_ne_menja_fajl(self, putanja):
+        """Тест да грешка током уписа оставља стари фајл нетакнут"""
+        from csv_storage import atomicni_upis
+        with open(putanja, "rb") as f:
+            pre = f.read()
+
+        with pytest.raises(RuntimeError):
+            with atomicni_upis(putanja) as f:
+                f.write("Редни број,Наслов\r\n1,Окрњен")
+                raise RuntimeError("нестанак струје")
+
+        with open(putanja, "rb") as f:
+            assert f.read() == pre
+        assert os.listdir(os.path.dirname(putanja)) == ["Biblioteka.csv"]
+
+    def test_cuvanje_bez_obavezne_rezervne_kopije(self, putanja):
+        """Тест да чување подразумевано не прави резервну копију"""
+        podaci = bib.ucitaj_podatke(putanja)
+        assert bib.sacuvaj_podatke(putanja, podaci)
+        assert not any(".backup_" in f for f in os.listdir(os.path.dirname(putanja)))
+
+        assert bib.sacuvaj_podatke(putanja, podaci, napravi_rezervnu_kopiju=True)
+        assert any(".backup_" in f for f in os.listdir(os.path.dirname(putanja)))
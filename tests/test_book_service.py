@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_book_service.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за сервис за управљање књигама
+
+import random
+from datetime import date
+
+import pytest
+
+from book_service import BookService
+from data_adapter import CSVDataAdapter, SQLiteDataAdapter
+from loan_ledger import get_loan_ledger
+from models import Knjiga
+
+
+@pytest.fixture
+def knjige():
+    return [
+        Knjiga(redni_broj=1, naslov="На Дрини ћуприја", pisac="Иво Андрић", zanr="Роман"),
+        Knjiga(redni_broj=2, naslov="Проклета авлија", pisac="Иво Андрић", zanr="Роман"),
+        Knjiga(redni_broj=3, naslov="Дервиш и смрт", pisac="Меша Селимовић", zanr="Роман"),
+    ]
+
+
+class TestPretraga:
+    """Тестови за претрагу књига"""
+
+    def test_pretraga_preko_fts_indeksa(self, tmp_path, knjige):
+        """Тест да се претрага са SQLite адаптером извршава у бази"""
+        adapter = SQLiteDataAdapter(str(tmp_path / "biblioteka.db"))
+        adapter.save_books(knjige)
+        servis = BookService(adapter)
+        servis.load_books()
+
+        pozivi = []
+        search_ids = adapter.search_ids
+        adapter.search_ids = lambda *args: pozivi.append(args) or search_ids(*args)
+
+        assert [k.redni_broj for k in servis.search_books("андр")] == [1, 2]
+        assert [k.redni_broj for k in servis.search_books("авл", field="naslov")] == [2]
+        assert [k.redni_broj for k in servis.search_books("Andric")] == [1, 2]
+        assert len(pozivi) == 3
+        adapter.close()
+
+    def test_nesacuvane_izmene_koriste_skeniranje(self, tmp_path, knjige):
+        """Тест да се несачуване измене виде у претрази"""
+        with SQLiteDataAdapter(str(tmp_path / "biblioteka.db")) as adapter:
+            adapter.save_books(knjige)
+            servis = BookService(adapter)
+            servis.load_books()
+
+            servis.add_book(Knjiga(redni_broj=4, naslov="Госпођица", pisac="Иво Андрић"))
+            assert [k.redni_broj for k in servis.search_books("андр")] == [1, 2, 4]
+
+            servis.save_books()
+            assert [k.redni_broj for k in servis.search_books("андр")] == [1, 2, 4]
+
+    def test_csv_adapter_skenira_u_memoriji(self, tmp_path, knjige):
+        """Тест да CSV адаптер и даље тражи подниске"""
+        adapter = CSVDataAdapter(str(tmp_path / "Biblioteka.csv"))
+        adapter.save_books(knjige)
+        servis = BookService(adapter)
+        servis.load_books()
+
+        assert [k.redni_broj for k in servis.search_books("ндри")] == [1, 2]
+
+
+class TestIndeksRednihBrojeva:
+    """Тестови за индекс књига по редном броју"""
+
+    @pytest.fixture
+    def servis(self, tmp_path, knjige):
+        adapter = CSVDataAdapter(str(tmp_path / "Biblioteka.csv"))
+        adapter.save_books(knjige)
+        servis = BookService(adapter)
+        servis.load_books()
+        return servis
+
+    def test_brisanje_ne_pomera_ostale(self, servis):
+        """Тест да брисање оставља редослед и проналажење осталих књига"""
+        assert servis.delete_book(2)
+        assert servis.get_book_by_id(2) is None
+        assert servis.get_book_by_id(3).naslov == "Дервиш и смрт"
+        assert not servis.delete_book(2)
+
+        assert servis.add_book(Knjiga(redni_broj=2, naslov="Госпођица", pisac="Иво Андрић"))
+        assert [k.redni_broj for k in servis.get_all_books()] == [1, 3, 2]
+        assert servis.get_next_available_id() == 4
+
+        assert servis.save_books()
+        servis.load_books()
+        assert [k.redni_broj for k in servis.get_all_books()] == [1, 3, 2]
+
+    def test_izmena_redni_broja(self, servis):
+        """Тест да измена редног броја ажурира индекс"""
+        knjiga = Knjiga(redni_broj=10, naslov="На Дрини ћуприја", pisac="Иво Андрић")
+        assert servis.update_book(1, knjiga)
+        assert servis.get_book_by_id(1) is None
+        assert servis.get_book_by_id(10) is knjiga
+        assert servis.get_all_books()[0] is knjiga
+
+    def test_brisanje_se_belezi_u_knjizi_pozajmica(self, servis):
+        """Тест да књига која добије ослобођени број не наслеђује позајмице обрисане"""
+        knjiga_pozajmica = get_loan_ledger(str(servis.data_adapter.file_path))
+        knjiga_pozajmica.import_open_loans([])
+        assert servis.loan_book(2, "Марко", date(2024, 1, 5))
+        assert [p.book for p in knjiga_pozajmica.held_by("Марко")] == ["2"]
+        assert servis.delete_book(2)
+        assert servis.add_book(Knjiga(redni_broj=2, naslov="Госпођица", pisac="Иво Андрић"))
+
+        assert not knjiga_pozajmica.is_out(2)
+        assert knjiga_pozajmica.history(2) == []
+        assert knjiga_pozajmica.held_by("Марко") == []
+
+    def test_pozajmice_se_belezi_u_knjizi_pozajmica(self, servis):
+        """Тест да позајмице и измене поља позајмице прати књига позајмица"""
+        knjiga_pozajmica = get_loan_ledger(str(servis.data_adapter.file_path))
+        knjiga_pozajmica.import_open_loans([])
+        assert servis.loan_book(1, "Марко", date(2024, 1, 5))
+        assert servis.return_book(1, date(2024, 1, 9))
+        assert servis.update_book(1, Knjiga(redni_broj=1, naslov="На Дрини ћуприја", pisac="Иво Андрић",
+                                            pozajmljena=True, ko_je_pozajmio="Ана",
+                                            datum_pozajmice=date(2024, 1, 10)))
+
+        assert [(p.borrower, p.loaned, p.returned) for p in knjiga_pozajmica.history(1)] == [
+            ("Марко", date(2024, 1, 5), date(2024, 1, 9)),
+            ("Ана", date(2024, 1, 10), None),
+        ]
+
+    def test_uvoz_odbija_duplikate(self, servis):
+        """Тест да увоз препознаје постојеће редне бројеве"""
+        podaci = [{"redni_broj": i, "naslov": f"Књига {i}", "pisac": "Аутор"} for i in range(2, 2000)]
+        assert servis.import_from_dict(podaci) == (1996, 2)
+        assert len(servis.get_all_books()) == 1999
+
+    def test_duplikati_iz_izvora(self, servis, knjige):
+        """Тест да се после брисања прве види друга књига са истим бројем"""
+        servis.data_adapter.save_books(knjige + [Knjiga(redni_broj=1, naslov="Дупликат", pisac="Аутор")])
+        servis.load_books()
+
+        assert servis.get_book_by_id(1).naslov == "На Дрини ћуприја"
+        assert servis.delete_book(1)
+        assert servis.get_book_by_id(1).naslov == "Дупликат"
+
+    def test_sledeci_slobodan_broj(self, servis):
+        """Тест да се бројеви обрисаних књига поново нуде"""
+        assert servis.get_next_available_id() == 4
+        servis.delete_book(2)
+        assert servis.get_next_available_id() == 2
+        servis.add_book(Knjiga(redni_broj=2, naslov="Госпођица", pisac="Иво Андрић"))
+        assert servis.get_next_available_id() == 4
+
+    def test_uvoz_bez_rednih_brojeva(self, servis):
+        """Тест да увоз додељује бројеве књигама без редног броја"""
+        podaci = [{"naslov": "Прва", "pisac": "Аутор"}, {"redni_broj": 10, "naslov": "Друга", "pisac": "Аутор"},
+                  {"naslov": "Трећа", "pisac": "Аутор"}]
+        assert servis.import_from_dict(podaci) == (3, 0)
+        assert [k.redni_broj for k in servis.get_all_books()] == [1, 2, 3, 4, 10, 5]
+        assert servis.get_next_available_id() == 6
+
+    def test_fasete_prate_izmene(self, servis):
+        """Тест да индекси по пољима прате додавање, измену и брисање"""
+        assert servis.get_genres() == ["Роман"]
+        servis.add_book(Knjiga(redni_broj=4, naslov="Ex Ponto", pisac="Иво Андрић", zanr="Поезија",
+                               izdavaci="Просвета; Лагуна"))
+        servis.update_book(3, Knjiga(redni_broj=3, naslov="Дервиш и смрт", pisac="Меша Селимовић", zanr="Поезија"))
+        servis.delete_book(1)
+
+        assert servis.get_value_counts("zanr") == {"Роман": 1, "Поезија": 2}
+        assert servis.get_publishers() == ["Лагуна", "Просвета"]
+        assert [k.redni_broj for k in servis.find_books(pisac="иво андрић")] == [2, 4]
+        assert [k.redni_broj for k in servis.find_books(zanr="Поезија", izdavaci="лагуна")] == [4]
+        with pytest.raises(ValueError):
+            servis.find_books(naslov="Ex Ponto")
+
+    def test_statistike_prate_izmene(self, servis):
+        """Тест да одржаване статистике увек одговарају поновном рачунању"""
+        rng = random.Random(4)
+        pisci = ["Иво Андрић", "Меша Селимовић", "Данило Киш"]
+        assert servis.get_statistics(verify=True).broj_pisaca == 2
+        for korak in range(200):
+            brojevi = [k.redni_broj for k in servis.get_all_books()]
+            akcija = rng.choice(["dodaj", "izmeni", "obrisi", "pozajmi", "vrati"])
+            if akcija == "dodaj" or not brojevi:
+                servis.add_book(Knjiga(redni_broj=servis.get_next_available_id(), naslov=f"Књига {korak}",
+                                       pisac=rng.choice(pisci), zanr=rng.choice(["", "Роман", "Есеј"]),
+                                       izdavaci=rng.choice([None, "Просвета", "Нолит; Просвета"])))
+            elif akcija == "izmeni":
+                broj = rng.choice(brojevi)
+                servis.update_book(broj, Knjiga(redni_broj=broj, naslov="Измењена", pisac=rng.choice(pisci)))
+            elif akcija == "obrisi":
+                servis.delete_book(rng.choice(brojevi))
+            elif akcija == "pozajmi":
+                servis.loan_book(rng.choice(brojevi), "Марко", date(2024, 1, rng.randint(1, 28)))
+            else:
+                servis.return_book(rng.choice(brojevi), date(2024, 2, 1))
+            servis.get_statistics(verify=True)
+
+    def test_pretraga_podniske_preko_trigrama(self, servis):
+        """Тест да претрага подниске прати несачуване измене"""
+        servis.add_book(Knjiga(redni_broj=4, naslov="Госпођица", pisac="Иво Андрић", napomena="Прво издање"))
+        servis.delete_book(1)
+
+        assert [k.redni_broj for k in servis.search_books("ндри")] == [2, 4]
+        assert [k.redni_broj for k in servis.search_books("издањ")] == [4]
+        assert [k.redni_broj for k in servis.search_books("ндри", field="naslov")] == []
+        # Кратак упит се решава скенирањем
+        assert [k.redni_broj for k in servis.search_books("ђи")] == [4]
+        # Упит латиницом без дијакритика налази ћирилични текст
+        assert [k.redni_broj for k in servis.search_books("gospodjica")] == [4]
+        assert [k.redni_broj for k in servis.search_books("dj")] == [4]
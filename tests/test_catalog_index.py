@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_catalog_index.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за инверзне индексе каталога
+
+import csv
+
+import pytest
+
+import Biblioteka as bib
+from catalog_cache import get_catalog_cache
+from catalog_index import CatalogIndex, split_values
+from config import CSV_COLUMNS
+from query_engine import available
+
+
+def napravi_indeks():
+    """Прави индекс над речницима са писцем и жанром"""
+    indeks = CatalogIndex({
+        'pisac': lambda s: split_values(s.get('pisac')),
+        'zanr': lambda s: [s.get('zanr')],
+    })
+    indeks.build([
+        (1, {'pisac': 'Иво Андрић', 'zanr': 'Роман'}),
+        (2, {'pisac': 'Иво Андрић; Меша Селимовић', 'zanr': 'роман '}),
+        (3, {'pisac': 'Меша Селимовић', 'zanr': 'Поезија'}),
+    ])
+    return indeks
+
+
+class TestCatalogIndex:
+    """Тестови за CatalogIndex"""
+
+    def test_vrednosti_i_brojevi(self):
+        """Тест да се вредности броје по књигама у облику из каталога"""
+        indeks = napravi_indeks()
+        assert indeks.values('pisac') == ['Иво Андрић', 'Меша Селимовић']
+        assert indeks.values('zanr') == ['Поезија', 'Роман', 'роман']
+        assert indeks.counts('zanr') == {'Роман': 1, 'роман': 1, 'Поезија': 1}
+        assert indeks.count('zanr', 'роман') == 2
+
+    def test_pismo_se_ne_spaja_u_vrednostima(self):
+        """Тест да латиница и ћирилица остају различите вредности, а претрага их налази заједно"""
+        indeks = napravi_indeks()
+        indeks.add(4, {'pisac': 'Ivo Andrić', 'zanr': 'Roman'})
+        assert indeks.values('pisac') == ['Ivo Andrić', 'Иво Андрић', 'Меша Селимовић']
+        assert indeks.counts('pisac') == {'Иво Андрић': 2, 'Меша Селимовић': 2, 'Ivo Andrić': 1}
+        assert indeks.keys('pisac', 'ivo andric') == {1, 2, 4}
+
+        indeks.remove(4)
+        assert indeks.values('pisac') == ['Иво Андрић', 'Меша Селимовић']
+        assert indeks.keys('pisac', 'Иво Андрић') == {1, 2}
+
+    def test_fasetna_pretraga(self):
+        """Тест да се критеријуми пресецају и враћају редом каталога"""
+        indeks = napravi_indeks()
+        assert [s['zanr'] for s in indeks.find({'pisac': 'меша селимовић'})] == ['роман ', 'Поезија']
+        assert len(indeks.find({'pisac': 'Иво Андрић', 'zanr': 'РОМАН'})) == 2
+        assert indeks.find({'pisac': 'Непознат'}) == []
+
+    def test_izmena_i_brisanje(self):
+        """Тест да измена ставке уклања старе вредности и чува место у редоследу"""
+        indeks = napravi_indeks()
+        stavka = {'pisac': 'Иво Андрић', 'zanr': 'Роман'}
+        indeks.add(4, stavka)
+        # Ставка се мења у месту пре поновног индексирања
+        stavka['zanr'] = 'Есеј'
+        indeks.replace(4, 4, stavka)
+        indeks.replace(1, 1, {'pisac': 'Иво Андрић', 'zanr': 'Есеј'})
+
+        # Приказује се облик вредности који је остао у каталогу
+        assert indeks.counts('zanr') == {'роман': 1, 'Поезија': 1, 'Есеј': 2}
+        assert indeks.keys('zanr', 'есеј') == {1, 4}
+        assert indeks.find({'zanr': 'Есеј'})[0] == {'pisac': 'Иво Андрић', 'zanr': 'Есеј'}
+
+        assert indeks.remove(3)
+        assert not indeks.remove(3)
+        assert indeks.values('zanr') == ['Есеј', 'роман']
+
+
+@pytest.fixture
+def putanja(tmp_path):
+    """Прави CSV каталог са три књиге"""
+    putanja = tmp_path / "Biblioteka.csv"
+    with open(putanja, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for i, (naslov, pisac, zanr) in enumerate([
+            ("На Дрини ћуприја", "Иво Андрић", "Роман"),
+            ("Тврђава", "Меша Селимовић", "Роман"),
+            ("Писма", "Иво Андрић; Меша Селимовић", "Преписка"),
+        ], start=1):
+            red = {kolona: "" for kolona in CSV_COLUMNS}
+            red.update({"Редни број": str(i), "Наслов": naslov, "Писац": pisac, "Жанр": zanr})
+            writer.writerow(red)
+    get_catalog_cache().ponisti()
+    return str(putanja)
+
+
+class TestFaseteKataloga:
+    """Тестови за индексе у модулу Biblioteka"""
+
+    @pytest.fixture(autouse=True)
+    def ukljuci_zurnal(self, monkeypatch):
+        monkeypatch.setattr(bib, "CSV_JOURNAL_ENABLED", True)
+
+    def test_inicijalizacija_iz_indeksa(self, putanja):
+        """Тест да регистри писаца и жанрова долазе из индекса"""
+        podaci = bib.inicijalizuj_podatke(putanja)
+        assert podaci['pisci'] == ["Иво Андрић", "Меша Селимовић"]
+        assert podaci['zanr'] == ["Преписка", "Роман"]
+        assert bib.broj_po_vrednosti(putanja, "Писац") == {"Иво Андрић": 2, "Меша Селимовић": 2}
+
+    def test_registri_grade_samo_fasete(self, putanja, monkeypatch):
+        """Тест да регистри при покретању не граде триграме ни остале индексе за претрагу"""
+        monkeypatch.setattr(bib, "TrigramIndex", lambda *a: pytest.fail("грађени су триграми"))
+        monkeypatch.setattr(bib, "RankedIndex", lambda *a: pytest.fail("грађен је BM25 индекс"))
+        assert bib.inicijalizuj_podatke(putanja)['pisci'] == ["Иво Андрић", "Меша Селимовић"]
+        assert bib.broj_knjiga(putanja) == 3
+        assert [k["Наслов"] for k in bib.pretraga_po_piscu(putanja, "Иво Андрић")] == ["На Дрини ћуприја", "Писма"]
+
+        monkeypatch.undo()
+        monkeypatch.setattr(bib, "CSV_JOURNAL_ENABLED", True)
+        fasete = bib._fasete(putanja)
+        # Индекси за претрагу деле већ изграђене фасете
+        assert bib._indeksi(putanja).fasete is fasete
+        assert bib.dodaj_knjigu(putanja, {"Наслов": "Сеобе", "Писац": "Милош Црњански"})
+        assert bib._fasete(putanja) is fasete
+        assert bib.broj_knjiga(putanja) == 4
+        assert [k["Наслов"] for k in bib.upit(putanja, {"Писац": "Црњански"})] == ["Сеобе"]
+
+    def test_izmene_azuriraju_indeks(self, putanja, monkeypatch):
+        """Тест да дописивање и измене ажурирају индекс без поновне изградње"""
+        indeks = bib._fasete(putanja)
+        assert bib.dodaj_knjigu(putanja, {"Наслов": "Проклета авлија", "Писац": "Иво Андрић"})
+        assert bib.izmeni_knjigu(putanja, "Тврђава", {"Жанр": "Драма"})
+        assert bib.obrisi_knjigu(putanja, "Писма")
+
+        monkeypatch.setattr(bib, "ucitaj_podatke", lambda *a: pytest.fail("индекс је поново грађен"))
+        assert bib._fasete(putanja) is indeks
+        assert [k["Наслов"] for k in bib.pretraga_po_piscu(putanja, "иво андрић")] == \
+            ["На Дрини ћуприја", "Проклета авлија"]
+        assert bib.vrednosti_kolone(putanja, "Жанр") == ["Драма", "Роман"]
+        assert bib.broj_knjiga(putanja) == 3
+
+    def test_pretraga_ne_zavisi_od_pisma(self, putanja, monkeypatch):
+        """Тест да pretraga налази ћирилицу упитом латиницом и прати измене"""
+        assert [k["Наслов"] for k in bib.pretraga(putanja, {"Писац": "andric"})] == \
+            ["На Дрини ћуприја", "Писма"]
+        assert [k["Наслов"] for k in bib.pretraga(putanja, {"Наслов": "tvrdj", "Писац": "Selimović"})] == \
+            ["Тврђава"]
+        assert bib.pretraga(putanja, {"Наслов": "cuprija", "Писац": "меша"}) == []
+        assert bib.izmeni_knjigu(putanja, "Писма", {"Наслов": "Ћуприја", "Жанр": "Есеј"})
+
+        monkeypatch.setattr(bib, "ucitaj_podatke", lambda *a: pytest.fail("индекс је поново грађен"))
+        # Жанр није у индексу триграма, па се проверава међу пронађеним књигама
+        assert [k["Наслов"] for k in bib.pretraga(putanja, {"Наслов": "ćuprij", "Жанр": "esej"})] == \
+            ["Ћуприја"]
+        assert len(bib.pretraga(putanja, {})) == 3
+
+    def test_spoljna_izmena_gradi_indeks(self, putanja):
+        """Тест да се индекс поново гради када се фајл промени мимо модула"""
+        bib._fasete(putanja)
+        with open(putanja, "a", newline="", encoding="utf-8") as f:
+            red = {kolona: "" for kolona in CSV_COLUMNS}
+            red.update({"Редни број": "4", "Наслов": "Сеобе", "Писац": "Милош Црњански"})
+            csv.DictWriter(f, fieldnames=CSV_COLUMNS).writerow(red)
+
+        assert [k["Наслов"] for k in bib.pretraga_po_piscu(putanja, "Милош Црњански")] == ["Сеобе"]
+
+
+class TestIndeksiPosleCuvanja:
+    """Тестови за ажурирање индекса у месту када се каталог преписује (без журнала)"""
+
+    @pytest.fixture(autouse=True)
+    def iskljuci_zurnal(self, monkeypatch):
+        monkeypatch.setattr(bib, "CSV_JOURNAL_ENABLED", False)
+
+    @staticmethod
+    def rezultati(putanja):
+        return (bib.upit(putanja, {}), bib.upit(putanja, available()), bib.vrednosti_kolone(putanja, "Жанр"),
+                bib.broj_po_vrednosti(putanja, "Писац"), bib.pretraga_po_relevantnosti(putanja, "tvrdjava"),
+                bib.upit_stranica(putanja, {}, sortiranje="-Редни број").items)
+
+    def test_izmene_ne_grade_indekse_ponovo(self, putanja, monkeypatch):
+        """Тест да измена, позајмица, враћање и брисање ажурирају индексе као поновна изградња"""
+        # Колоне датума позајмице већ постоје; нова колона у заглављу гради индексе поново
+        assert bib.sacuvaj_podatke(putanja, [{**k, "Датум позајмице": "", "Датум враћања": ""}
+                                             for k in bib.ucitaj_podatke(putanja)])
+        unos = bib._indeksi(putanja)
+        rang = bib._rang_kataloga(putanja).rang
+        assert bib.izmeni_knjigu(putanja, "Тврђава", {"Жанр": "Драма", "Редни број": "10"})
+        assert bib.pozajmi_knjigu(putanja, "На Дрини ћуприја", "Петар")
+        assert bib.pozajmi_knjigu(putanja, "Писма", "Ана")
+        assert bib.vrati_knjigu(putanja, "Писма")
+        assert bib.obrisi_knjigu(putanja, "Писма")
+
+        with monkeypatch.context() as m:
+            m.setattr(bib, "ucitaj_podatke", lambda *a: pytest.fail("индекс је поново грађен"))
+            assert bib._indeksi(putanja).upiti is unos.upiti
+            assert bib._fasete(putanja) is unos.fasete
+            assert bib._rang_kataloga(putanja).rang is rang
+            posle_izmena = self.rezultati(putanja)
+
+        assert [k["Редни број"] for k in posle_izmena[0]] == ["1", "10"]
+        assert [k["Наслов"] for k in posle_izmena[1]] == ["Тврђава"]
+        bib._INDEKSI.clear()
+        bib._FASETE.clear()
+        bib._RANGOVI.clear()
+        get_catalog_cache().ponisti()
+        assert self.rezultati(putanja) == posle_izmena
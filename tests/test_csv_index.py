@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_csv_index.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за индекс бајт-позиција редова CSV каталога
+
+import csv
+import os
+
+import pytest
+
+import Biblioteka as bib
+from catalog_cache import get_catalog_cache
+from config import CSV_COLUMNS
+from csv_index import CSVIndex, putanja_indeksa
+from tests.test_biblioteka import napravi_red
+
+
+@pytest.fixture
+def putanja(tmp_path):
+    """Прави CSV каталог са редом који има вишередно поље под наводницима"""
+    putanja = tmp_path / "Biblioteka.csv"
+    with open(putanja, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerow(napravi_red(1, "На Дрини ћуприја", "Иво Андрић"))
+        writer.writerow(napravi_red(2, "Дервиш и смрт", Напомена='Први ред\n"други" ред'))
+        writer.writerow(napravi_red(3, "Проклета авлија", "Иво Андрић", Позајмљена="Да"))
+    get_catalog_cache().ponisti()
+    return str(putanja)
+
+
+class TestCSVIndex:
+    """Тестови за читање појединачних редова преко индекса"""
+
+    def test_citanje_reda_po_broju(self, putanja):
+        """Тест да се ред чита исто као при пуном учитавању"""
+        indeks = CSVIndex(putanja)
+        podaci = bib.ucitaj_podatke(putanja)
+
+        assert indeks.procitaj_red(2) == podaci[1]
+        assert indeks.procitaj_red("3") == podaci[2]
+        assert indeks.procitaj_red(9) is None
+        assert os.path.exists(putanja_indeksa(putanja))
+
+    def test_pretraga_po_naslovu(self, putanja):
+        """Тест да се наслов тражи без обзира на велика слова и размаке"""
+        indeks = CSVIndex(putanja)
+        assert [r["Редни број"] for r in indeks.pronadji_po_naslovu("  проклета АВЛИЈА ")] == ["3"]
+
+    def test_indeks_se_ucitava_sa_diska(self, putanja):
+        """Тест да нова инстанца користи сачуван индекс без поновне изградње"""
+        CSVIndex(putanja).izgradi()
+        indeks = CSVIndex(putanja)
+        indeks.izgradi = None  # изградња не сме бити позвана
+        assert indeks.spreman()
+        assert indeks.procitaj_red(1)["Наслов"] == "На Дрини ћуприја"
+
+    def test_zastareo_indeks_se_gradi_u_pozadini(self, putanja):
+        """Тест да измена фајла поништава индекс и покреће поновну изградњу"""
+        indeks = CSVIndex(putanja)
+        assert indeks.izgradi()
+        bib.sacuvaj_podatke(putanja, bib.ucitaj_podatke(putanja)[:2])
+
+        assert not indeks.spreman()
+        indeks.sacekaj()
+        assert indeks.spreman()
+        assert indeks.procitaj_red(3) is None
+
+    def test_zurnal_se_primenjuje(self, putanja, monkeypatch):
+        """Тест да индекс враћа редове са примењеним журналом измена"""
+        monkeypatch.setattr(bib, "CSV_JOURNAL_ENABLED", True)
+        indeks = CSVIndex(putanja)
+        assert indeks.izgradi()
+
+        assert bib.izmeni_knjigu(putanja, "Дервиш и смрт", {"Наслов": "Тврђава"})
+        assert bib.obrisi_knjigu(putanja, "На Дрини ћуприја")
+        assert bib.dodaj_knjigu(putanja, {"Наслов": "Тврђава", "Писац": "Меша Селимовић"})
+
+        assert indeks.spreman()
+        assert indeks.procitaj_red(1) is None
+        assert indeks.procitaj_red(2)["Наслов"] == "Тврђава"
+        assert indeks.pronadji_po_naslovu("Дервиш и смрт") == []
+        assert [r["Редни број"] for r in indeks.pronadji_po_naslovu("тврђава")] == ["2", "4"]
+
+
+class TestPretragaPozajmica:
+    """Тестови за читање једне књиге кроз Biblioteka"""
+
+    def test_isti_rezultat_sa_i_bez_indeksa(self, putanja):
+        """Тест да претрага даје исти резултат пре и после изградње индекса"""
+        pre = bib.pretraga_pozajmica(putanja, "проклета авлија")
+        bib.get_csv_index(putanja).sacekaj()
+
+        assert bib._indeks_spreman(putanja) is not None
+        assert bib.pretraga_pozajmica(putanja, "проклета авлија") == pre
+        assert pre["Позајмљена"] == "Да"
+        assert bib.pronadji_knjigu(putanja, 2)["Наслов"] == "Дервиш и смрт"
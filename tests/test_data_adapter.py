@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_data_adapter.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за адаптере података (CSV/SQLite)
+
+import sqlite3
+
+import pytest
+
+from data_adapter import CSVDataAdapter, SQLiteDataAdapter
+from models import Knjiga
+from transliteration import fold_text
+
+
+def napravi_knjige(broj):
+    """Прави листу тест књига"""
+    return [
+        Knjiga(redni_broj=i, naslov=f"Књига {i}", pisac=f"Аутор {i % 3}", zanr="Роман")
+        for i in range(1, broj + 1)
+    ]
+
+
+class TestCSVDataAdapter:
+    """Тестови за CSV адаптер"""
+
+    def test_cuvanje_i_ucitavanje(self, tmp_path):
+        """Тест да се сачуване књиге исто учитавају"""
+        adapter = CSVDataAdapter(str(tmp_path / "Biblioteka.csv"))
+        knjige = napravi_knjige(3)
+        knjige[0].izdavaci = "Лагуна; Вулкан"
+
+        assert adapter.save_books(knjige)
+        ucitane = adapter.load_books()
+
+        assert [k.naslov for k in ucitane] == ["Књига 1", "Књига 2", "Књига 3"]
+        assert ucitane[0].izdavaci == "Лагуна; Вулкан"
+
+    def test_zurnal_belezi_samo_izmene(self, tmp_path):
+        """Тест да се у режиму журнала бележе само измењене књиге"""
+        putanja = tmp_path / "Biblioteka.csv"
+        CSVDataAdapter(str(putanja)).save_books(napravi_knjige(5))
+        pre = putanja.read_bytes()
+
+        adapter = CSVDataAdapter(str(putanja), use_journal=True)
+        knjige = adapter.load_books()
+        knjige[1].napomena = "Измењена"
+        del knjige[4]
+        assert adapter.save_books(knjige)
+
+        assert putanja.read_bytes() == pre
+        assert adapter.journal.record_count() == 2
+
+        ucitane = CSVDataAdapter(str(putanja)).load_books()
+        assert len(ucitane) == 4
+        assert ucitane[1].napomena == "Измењена"
+
+
+class TestSQLiteDataAdapter:
+    """Тестови за SQLite адаптер"""
+
+    def test_cuvanje_menja_samo_izmenjene_redove(self, tmp_path):
+        """Тест да чување не преписује непромењене редове"""
+        import sqlite3
+
+        putanja = tmp_path / "biblioteka.db"
+        adapter = SQLiteDataAdapter(str(putanja))
+        assert adapter.save_books(napravi_knjige(4))
+
+        with sqlite3.connect(putanja) as conn:
+            pre = dict(conn.execute("SELECT redni_broj, id FROM knjige"))
+
+        knjige = adapter.load_books()
+        knjige[0].napomena = "Измењена"
+        del knjige[3]
+        assert adapter.save_books(knjige)
+
+        with sqlite3.connect(putanja) as conn:
+            posle = dict(conn.execute("SELECT redni_broj, id FROM knjige"))
+        assert posle == {1: pre[1], 2: pre[2], 3: pre[3]}
+
+        ucitane = SQLiteDataAdapter(str(putanja)).load_books()
+        assert [k.redni_broj for k in ucitane] == [1, 2, 3]
+        assert ucitane[0].napomena == "Измењена"
+
+    def test_cuvanje_bez_prethodnog_ucitavanja(self, tmp_path):
+        """Тест да нова инстанца адаптера правилно брише и додаје књиге"""
+        putanja = str(tmp_path / "biblioteka.db")
+        SQLiteDataAdapter(putanja).save_books(napravi_knjige(3))
+
+        assert SQLiteDataAdapter(putanja).save_books(napravi_knjige(2))
+        assert len(SQLiteDataAdapter(putanja).load_books()) == 2
+
+    def test_trajna_konekcija_i_zatvaranje(self, tmp_path):
+        """Тест да адаптер користи WAL и да се затвара као context manager"""
+        import threading
+
+        putanja = str(tmp_path / "biblioteka.db")
+        with SQLiteDataAdapter(putanja) as adapter:
+            conn = adapter._connection()
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert adapter._connection() is conn
+
+            # Иста конекција се безбедно користи из више нити
+            niti = [threading.Thread(target=adapter.load_books) for _ in range(4)]
+            for nit in niti:
+                nit.start()
+            adapter.save_books(napravi_knjige(3))
+            for nit in niti:
+                nit.join()
+
+        assert adapter._conn is None
+        with SQLiteDataAdapter(putanja) as adapter:
+            assert len(adapter.load_books()) == 3
+
+    def test_fts_pretraga_prati_izmene(self, tmp_path):
+        """Тест да FTS индекс прати измене и подржава префиксе и фразе"""
+        with SQLiteDataAdapter(str(tmp_path / "biblioteka.db")) as adapter:
+            knjige = napravi_knjige(3)
+            knjige[0].naslov = "На Дрини ћуприја"
+            knjige[1].naslov = "Проклета авлија"
+            knjige[2].napomena = "Дрина у поднаслову"
+            assert adapter.save_books(knjige)
+
+            assert adapter.search_ids("дрин") == [1, 3]
+            assert adapter.search_ids("дрин", field="naslov") == [1]
+            assert adapter.search_ids('"дрини ћуприја"') == [1]
+            assert adapter.search_ids('"ћуприја дрини"') == []
+            assert adapter.search_ids('"na drini cuprija"') == [1]
+            assert adapter.search_ids("Ćuprij") == [1]
+            # Поље ван индекса и упит без речи препуштају се скенирању
+            assert adapter.search_ids("дрин", field="isbn") is None
+            assert adapter.search_ids("--") is None
+
+            knjige[0].naslov = "Травничка хроника"
+            del knjige[2]
+            assert adapter.save_books(knjige)
+            assert adapter.search_ids("дрин") == []
+            assert adapter.search_ids("травн") == [1]
+
+    def test_fts_indeks_bez_svodjenja_se_obnavlja(self, tmp_path):
+        """Тест да се FTS индекс из старије верзије поново гради са сведеним текстом"""
+        putanja = str(tmp_path / "biblioteka.db")
+        with SQLiteDataAdapter(putanja) as adapter:
+            knjige = napravi_knjige(2)
+            knjige[0].naslov = "На Дрини ћуприја"
+            assert adapter.save_books(knjige)
+            # Окидачи какве је правила старија верзија
+            with adapter._connection() as conn:
+                conn.execute("DROP TRIGGER knjige_fts_ai")
+                conn.execute("CREATE TRIGGER knjige_fts_ai AFTER INSERT ON knjige BEGIN "
+                             "INSERT INTO knjige_fts(rowid, naslov) VALUES (new.id, new.naslov); END")
+
+        with SQLiteDataAdapter(putanja) as adapter:
+            assert adapter.search_ids("cuprija") == [1]
+            assert adapter.search_ids("ћуприја") == [1]
+
+    def test_upis_preko_obicne_konekcije(self, tmp_path):
+        """Тест да окидачи FTS индекса раде и на конекцији без Python функција"""
+        putanja = str(tmp_path / "biblioteka.db")
+        with SQLiteDataAdapter(putanja) as adapter:
+            assert adapter.save_books(napravi_knjige(2))
+
+        conn = sqlite3.connect(putanja)
+        try:
+            with conn:
+                conn.execute("INSERT INTO knjige (redni_broj, naslov, pisac) "
+                             "VALUES (3, 'Ђурђевдан', 'ЉУБИША Ђорђевић')")
+                conn.execute("UPDATE knjige SET naslov = 'Проклета авлија' WHERE redni_broj = 1")
+                conn.execute("DELETE FROM knjige WHERE redni_broj = 2")
+        finally:
+            conn.close()
+
+        with SQLiteDataAdapter(putanja) as adapter:
+            assert adapter.search_ids("djurdjevdan") == [3]
+            assert adapter.search_ids("Ljubisa", field="pisac") == [3]
+            assert adapter.search_ids("avlija") == [1]
+            assert adapter.search_ids("књига") == []
+
+    @pytest.mark.parametrize("tekst", ["ЂУРЂЕВДАН Џак", "Šišmiš ČAĆA Žđ", "Љубав и Њива Đorđe"])
+    def test_indeks_svodi_kao_fold_text(self, tmp_path, tekst):
+        """Тест да окидачи у индекс уписују исте речи које даје fold_text"""
+        with SQLiteDataAdapter(str(tmp_path / "biblioteka.db")) as adapter:
+            knjige = napravi_knjige(1)
+            knjige[0].naslov = tekst
+            knjige[0].pisac = tekst
+            assert adapter.save_books(knjige)
+            with adapter._connection() as conn:
+                conn.execute("CREATE VIRTUAL TABLE temp.recnik USING fts5vocab(main, knjige_fts, 'row')")
+                reci = {rec for rec, in conn.execute("SELECT term FROM temp.recnik")}
+        assert reci == set(fold_text(f"{tekst} Роман").split())
+
+    def test_indeks_sa_fold_text_okidacima_se_obnavlja(self, tmp_path):
+        """Тест да се окидачи који зову fold_text замењују при отварању базе"""
+        putanja = str(tmp_path / "biblioteka.db")
+        with SQLiteDataAdapter(putanja) as adapter:
+            assert adapter.save_books(napravi_knjige(1))
+            with adapter._connection() as conn:
+                conn.execute("DROP TRIGGER knjige_fts_ai")
+                conn.execute("CREATE TRIGGER knjige_fts_ai AFTER INSERT ON knjige BEGIN "
+                             "INSERT INTO knjige_fts(rowid, naslov) VALUES (new.id, fold_text(new.naslov)); END")
+
+        with SQLiteDataAdapter(putanja) as adapter:
+            with adapter._connection() as conn:
+                okidaci = conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'knjige_fts_%'"
+                ).fetchall()
+            assert len(okidaci) == 3
+            assert not any('fold_text' in sql for sql, in okidaci)
+            assert adapter.search_ids("књиг") == [1]
+            assert adapter.search_ids("knjiga") == [1]
+
+
+class TestIteracijaKnjiga:
+    """Тестови за учитавање књига у току и у групама"""
+
+    @pytest.fixture(params=["csv", "sqlite"])
+    def adapter(self, request, tmp_path):
+        if request.param == "csv":
+            adapter = CSVDataAdapter(str(tmp_path / "Biblioteka.csv"))
+        else:
+            adapter = SQLiteDataAdapter(str(tmp_path / "biblioteka.db"))
+        adapter.save_books(napravi_knjige(7))
+        yield adapter
+        if request.param == "sqlite":
+            adapter.close()
+
+    def test_iter_books_sa_filterom(self, adapter):
+        """Тест да iter_books враћа исте књиге као load_books"""
+        assert [k.redni_broj for k in adapter.iter_books()] == [k.redni_broj for k in adapter.load_books()]
+        assert [k.redni_broj for k in adapter.iter_books(lambda k: k.pisac == "Аутор 1")] == [1, 4, 7]
+
+    def test_iter_book_batches(self, adapter):
+        """Тест да се књиге враћају у групама задате величине"""
+        grupe = list(adapter.iter_book_batches(batch_size=3))
+        assert [len(g) for g in grupe] == [3, 3, 1]
+
+        with pytest.raises(ValueError):
+            next(adapter.iter_book_batches(batch_size=0))
+
+    def test_sqlite_cita_u_vise_upita(self, tmp_path):
+        """Тест да SQLite адаптер чита базу у више мањих упита"""
+        with SQLiteDataAdapter(str(tmp_path / "biblioteka.db")) as adapter:
+            adapter.save_books(napravi_knjige(5))
+            assert [k.redni_broj for k in adapter.iter_books(fetch_size=2)] == [1, 2, 3, 4, 5]
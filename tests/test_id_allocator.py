@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_id_allocator.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за доделу редних бројева
+
+import pytest
+
+from id_allocator import IdAllocator
+
+
+class TestIdAllocator:
+    """Тестови за алокатор редних бројева"""
+
+    def test_prvo_popunjava_praznine(self):
+        """Тест да се прво додељују најмањи слободни бројеви"""
+        alokator = IdAllocator.from_ids([1, 2, 5, 6, 9])
+        assert [alokator.allocate() for _ in range(5)] == [3, 4, 7, 8, 10]
+
+    def test_oslobadjanje_i_zauzimanje(self):
+        """Тест да ослобођени бројеви поново долазе на ред, а заузети се прескачу"""
+        alokator = IdAllocator.from_ids(range(1, 11))
+        alokator.release(7)
+        alokator.release(3)
+        assert alokator.peek() == 3
+
+        alokator.claim(3)
+        assert alokator.peek() == 7
+        alokator.release(3)
+        assert alokator.allocate() == 3
+
+        alokator.claim(15)
+        assert [alokator.allocate() for _ in range(6)] == [7, 11, 12, 13, 14, 16]
+
+    def test_bez_popunjavanja_praznina(self):
+        """Тест да је без празнина број увек већи од свих додељених"""
+        alokator = IdAllocator.from_ids([1, 4])
+        assert alokator.allocate(fill_gaps=False) == 5
+        assert alokator.peek() == 2
+
+    def test_rezervisanje_opsega(self):
+        """Тест да масовни увоз добија узастопне бројеве изнад свих постојећих"""
+        alokator = IdAllocator.from_ids([1, 3])
+        assert list(alokator.allocate_range(3)) == [4, 5, 6]
+        alokator.claim(5)
+        alokator.release(5)
+        assert [alokator.allocate() for _ in range(3)] == [2, 5, 7]
+
+        with pytest.raises(ValueError):
+            alokator.allocate_range(-1)
+
+    def test_cuvanje_stanja(self):
+        """Тест да сачувано стање враћа исте празнине"""
+        alokator = IdAllocator.from_ids([1, 6])
+        alokator.claim(3)
+        stanje = alokator.to_dict()
+        assert stanje == {'sledeci_redni_broj': 7, 'praznine': [[2, 3], [4, 6]]}
+
+        obnovljen = IdAllocator.from_dict(stanje)
+        assert [obnovljen.allocate() for _ in range(4)] == [2, 4, 5, 7]
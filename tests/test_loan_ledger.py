@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_loan_ledger.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за књигу позајмица
+
+import csv
+import os
+from datetime import date
+
+import pytest
+
+import Biblioteka as bib
+from catalog_cache import get_catalog_cache
+from config import CSV_COLUMNS
+from csv_journal import get_journal
+from loan_ledger import LoanLedger
+from tests.test_biblioteka import napravi_red
+
+
+class TestLoanLedger:
+    """Тестови за LoanLedger"""
+
+    def test_pozajmice_i_istorija(self, tmp_path):
+        """Тест индекса по читаоцу и књизи и чувања историје"""
+        knjiga = LoanLedger(str(tmp_path / "Biblioteka.csv"))
+        knjiga.lend("1", "Марко", date(2024, 1, 5), due=date(2024, 2, 5))
+        knjiga.lend("2", "marko ", date(2024, 1, 6))
+        knjiga.lend("3", "Ана", date(2024, 1, 7))
+        with pytest.raises(ValueError):
+            knjiga.lend("1", "Ана")
+
+        assert [p.book for p in knjiga.held_by("MARKO")] == ["1", "2"]
+        assert knjiga.is_out("1") and not knjiga.is_out("4")
+        assert [p.book for p in knjiga.overdue(date(2024, 3, 1))] == ["1"]
+
+        knjiga.return_book("1", date(2024, 1, 20))
+        knjiga.lend("1", "Ана", date(2024, 1, 21))
+        with pytest.raises(ValueError):
+            knjiga.return_book("4")
+
+        assert [p.book for p in knjiga.held_by("Ана")] == ["3", "1"]
+        assert [(p.borrower, p.returned) for p in knjiga.history("1")] == [("Марко", date(2024, 1, 20)),
+                                                                         ("Ана", None)]
+
+        # Други процес види исто стање из фајла
+        ponovo = LoanLedger(str(tmp_path / "Biblioteka.csv"))
+        assert ponovo.open_loans() == knjiga.open_loans()
+        assert ponovo.history("1") == knjiga.history("1")
+
+    def test_brisanje_pocinje_novu_istoriju(self, tmp_path):
+        """Тест да број обрисане књиге не наслеђује позајмицу ни историју"""
+        knjiga = LoanLedger(str(tmp_path / "Biblioteka.csv"))
+        knjiga.lend("2", "Марко", date(2024, 1, 5))
+        knjiga.lend("3", "Марко", date(2024, 1, 6))
+        assert knjiga.remove_books(["2", "2", "4"], date(2024, 1, 7)) == 1
+
+        assert not knjiga.is_out("2") and knjiga.history("2") == []
+        assert [p.book for p in knjiga.held_by("Марко")] == ["3"]
+        knjiga.lend("2", "Ана", date(2024, 1, 8))
+        assert [p.borrower for p in LoanLedger(knjiga.csv_path).history("2")] == ["Ана"]
+
+    def test_uskladjivanje_sa_katalogom(self, tmp_path):
+        """Тест да sync затвара позајмице које каталог не види и бележи оне које недостају"""
+        knjiga = LoanLedger(str(tmp_path / "Biblioteka.csv"))
+        assert knjiga.sync("1", "Марко", date(2024, 1, 5))
+        assert not knjiga.sync("1", "marko")
+        assert knjiga.sync("1", "Ана", date(2024, 1, 9))
+        assert knjiga.sync("1", None, returned=date(2024, 1, 20))
+        assert not knjiga.sync("1", None)
+
+        assert [(p.borrower, p.loaned, p.returned) for p in knjiga.history("1")] == [
+            ("Марко", date(2024, 1, 5), date.today()),
+            ("Ана", date(2024, 1, 9), date(2024, 1, 20)),
+        ]
+
+    def test_osteceni_zapis_se_preskace(self, tmp_path):
+        """Тест да прекинут упис не квари остатак књиге позајмица"""
+        knjiga = LoanLedger(str(tmp_path / "Biblioteka.csv"))
+        knjiga.lend("1", "Марко", date(2024, 1, 5))
+        with open(knjiga.path, "a", encoding="utf-8") as f:
+            f.write('{"op": "vracanje", "knj')
+        knjiga.lend("2", "Марко", date(2024, 1, 6))
+        assert [p.book for p in LoanLedger(knjiga.csv_path).held_by("Марко")] == ["1", "2"]
+
+
+@pytest.fixture
+def putanja(tmp_path):
+    """Прави привремени CSV каталог у коме је једна књига већ позајмљена"""
+    putanja = tmp_path / "Biblioteka.csv"
+    with open(putanja, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerow(napravi_red(1, "На Дрини ћуприја", "Иво Андрић"))
+        writer.writerow(napravi_red(2, "Дервиш и смрт", "Меша Селимовић",
+                                    Позајмљена="Да", **{"Ко је позајмио": "Ана"}))
+        writer.writerow(napravi_red(3, "Проклета авлија", "Иво Андрић"))
+    get_catalog_cache().ponisti()
+    return str(putanja)
+
+
+class TestPozajmiceKataloga:
+    """Тестови за позајмице у CSV каталогу"""
+
+    def test_pozajmica_bez_prepisivanja_kataloga(self, putanja, monkeypatch):
+        """Тест да у режиму журнала позајмица и враћање не преписују CSV, а читања виде нове колоне"""
+        monkeypatch.setattr(bib, "CSV_JOURNAL_ENABLED", True)
+        pre = os.stat(putanja)
+
+        assert bib.pozajmi_knjigu(putanja, "проклета авлија", "Марко", date(2024, 3, 1))
+        assert not bib.pozajmi_knjigu(putanja, "Проклета авлија", "Ана")
+        assert bib.vrati_knjigu(putanja, "Дервиш и смрт")
+        assert not bib.vrati_knjigu(putanja, "Дервиш и смрт")
+
+        posle = os.stat(putanja)
+        assert (posle.st_mtime_ns, posle.st_size) == (pre.st_mtime_ns, pre.st_size)
+
+        redovi = {red["Редни број"]: red for red in bib.ucitaj_podatke(putanja)}
+        assert bib.status_reda(redovi["3"]) == "pozajmljena"
+        assert redovi["3"]["Датум позајмице"] == "2024-03-01"
+        assert bib.status_reda(redovi["2"]) == "dostupna"
+        get_catalog_cache().ponisti()
+        assert {red["Редни број"]: red for red in bib.ucitaj_podatke(putanja)} == redovi
+
+    def test_bez_zurnala_se_prepisuje_katalog(self, putanja):
+        """Тест да без режима журнала позајмица не прави журнал, па је CSV увек потпун"""
+        assert bib.pozajmi_knjigu(putanja, "Проклета авлија", "Марко", date(2024, 3, 1))
+        assert bib.vrati_knjigu(putanja, "Дервиш и смрт")
+        assert not os.path.exists(get_journal(putanja).path)
+
+        with open(putanja, newline="", encoding="utf-8") as f:
+            redovi = {red["Редни број"]: red for red in csv.DictReader(f)}
+        assert bib.status_reda(redovi["3"]) == "pozajmljena"
+        assert redovi["3"]["Ко је позајмио"] == "Марко"
+        assert bib.status_reda(redovi["2"]) == "dostupna"
+
+    def test_citalac_i_istorija(self, putanja):
+        """Тест да се позајмице из колона каталога преносе и да се историја чува"""
+        assert [k["Наслов"] for k in bib.pozajmice_citaoca(putanja, "ana")] == ["Дервиш и смрт"]
+
+        assert bib.pozajmi_knjigu(putanja, "На Дрини ћуприја", "Марко")
+        assert bib.vrati_knjigu(putanja, "На Дрини ћуприја")
+        assert bib.pozajmi_knjigu(putanja, "На Дрини ћуприја", "Ана")
+
+        assert [k["Редни број"] for k in bib.pozajmice_citaoca(putanja, "Ана")] == ["2", "1"]
+        assert bib.pozajmice_citaoca(putanja, "Марко") == []
+        assert [p.borrower for p in bib.istorija_pozajmica(putanja, "на дрини ћуприја")] == ["Марко", "Ана"]
+
+    def test_brisanje_knjige_zatvara_pozajmicu(self, putanja):
+        """Тест да књига која добије број обрисане не наслеђује њену позајмицу"""
+        assert bib.pozajmi_knjigu(putanja, "Проклета авлија", "Марко")
+        assert bib.obrisi_knjigu(putanja, "Проклета авлија")
+        assert bib.pozajmice_citaoca(putanja, "Марко") == []
+        assert not bib.dnevnik_pozajmica(putanja).is_out("3")
+
+        # Исти број, какав би књига добила из поново направљеног .meta фајла
+        with open(putanja, "a", newline="", encoding="utf-8") as f:
+            csv.DictWriter(f, fieldnames=CSV_COLUMNS).writerow(napravi_red(3, "Убик", "Филип К. Дик"))
+        get_catalog_cache().ponisti()
+        assert bib.istorija_pozajmica(putanja, "Убик") == []
+        assert bib.pozajmi_knjigu(putanja, "Убик", "Ана")
+        assert [k["Наслов"] for k in bib.pozajmice_citaoca(putanja, "Ана")] == ["Дервиш и смрт", "Убик"]
+
+    def test_izmena_kolona_pozajmice(self, putanja):
+        """Тест да измена колона позајмице у формулару мења и књигу позајмица"""
+        assert bib.pozajmi_knjigu(putanja, "Проклета авлија", "Марко")
+        assert bib.izmeni_knjigu(putanja, "Проклета авлија", {"Враћена": "Да"})
+        assert bib.status_reda(bib.pronadji_po_naslovu(putanja, "Проклета авлија")) == "dostupna"
+        assert bib.pozajmice_citaoca(putanja, "Марко") == []
+
+        assert bib.pozajmi_knjigu(putanja, "Проклета авлија", "Ана")
+        assert [p.borrower for p in bib.istorija_pozajmica(putanja, "Проклета авлија")] == ["Марко", "Ана"]
+
+        # Позајмица уписана у формулару се бележи као позајмица
+        assert bib.izmeni_knjigu(putanja, "На Дрини ћуприја", {"Позајмљена": "Да", "Ко је позајмио": "Марко"})
+        assert [k["Наслов"] for k in bib.pozajmice_citaoca(putanja, "Марко")] == ["На Дрини ћуприја"]
+
+    def test_katalog_odlucuje_o_pozajmici(self, putanja, monkeypatch):
+        """Тест да грешка у књизи позајмица не спречава позајмицу и да се касније исправља"""
+        dnevnik = bib.dnevnik_pozajmica(putanja)
+
+        def greska(records):
+            raise OSError("disk je pun")
+
+        monkeypatch.setattr(dnevnik, "_append", greska)
+        assert bib.pozajmi_knjigu(putanja, "Проклета авлија", "Марко")
+        assert not dnevnik.is_out("3")
+        monkeypatch.undo()
+
+        assert not bib.pozajmi_knjigu(putanja, "Проклета авлија", "Ана")
+        assert bib.vrati_knjigu(putanja, "Проклета авлија")
+        assert [(p.borrower, p.is_open) for p in bib.istorija_pozajmica(putanja, "Проклета авлија")] == [
+            ("Марко", False)]
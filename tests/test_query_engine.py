@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_query_engine.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за упите са више критеријума и планирање по индексима
+
+import csv
+import random
+
+import pytest
+
+import Biblioteka as bib
+from book_service import BookService, QUERY_FIELDS
+from catalog_cache import get_catalog_cache
+from catalog_index import RangeIndex, SortedIndex
+from config import CSV_COLUMNS
+from data_adapter import CSVDataAdapter
+from models import Knjiga
+from query_engine import AccessPath, And, Between, Contains, Equals, Or, Predicate, available
+
+
+@pytest.fixture
+def servis(tmp_path):
+    """Сервис са четири књиге, од којих је једна позајмљена"""
+    servis = BookService(CSVDataAdapter(str(tmp_path / "biblioteka.csv")))
+    servis.load_books()
+    for i, (naslov, pisac, godina, zanr) in enumerate([
+        ("На Дрини ћуприја", "Иво Андрић", 1945, "Роман"),
+        ("Проклета авлија", "Иво Андрић", 1954, "Роман"),
+        ("Дервиш и смрт", "Меша Селимовић", 1966, "Роман"),
+        ("Ex Ponto", "Иво Андрић", 1918, "Поезија"),
+    ], start=1):
+        servis.add_book(Knjiga(redni_broj=i, naslov=naslov, pisac=pisac, godina_izdavanja=godina, zanr=zanr))
+    servis.loan_book(2, "Петар")
+    return servis
+
+
+def redni_brojevi(knjige):
+    return [k.redni_broj for k in knjige]
+
+
+class TestRangeIndex:
+    """Тестови за индекс по опсегу"""
+
+    def test_opseg_i_izmene(self):
+        """Тест да опсег прати додавање, измену и брисање"""
+        indeks = RangeIndex(lambda s: s)
+        indeks.build([(1, 1945), (2, "1954."), (3, None), (4, 1918)])
+        assert indeks.keys(1940, 1960) == {1, 2}
+        assert indeks.count(high=1950) == 2
+        indeks.replace(2, 5, 1900)
+        assert indeks.keys(low=1900, high=1920) == {4, 5}
+        assert indeks.remove(1) and not indeks.remove(3)
+        assert indeks.keys() == {4, 5}
+
+
+class TestSortedIndex:
+    """Тестови за сортирани индекс"""
+
+    def test_redosled_i_izmene(self):
+        """Тест да се пореди сведен текст, а празне вредности иду на крај"""
+        indeks = SortedIndex(lambda s: s)
+        indeks.build([(1, "Ђура"), (2, None), (3, "Dj"), (4, "ана")])
+        assert list(indeks.walk()) == [4, 3, 1, 2]
+        assert list(indeks.walk(indeks.position(3))) == [1, 2]
+        assert list(indeks.walk(indeks.position(1), descending=True)) == [3, 4]
+        indeks.replace(4, 5, "Ж")
+        assert indeks.remove(2) and not indeks.remove(2)
+        assert list(indeks.walk()) == [3, 1, 5]
+
+
+def sve_stranice(dohvati, **kwargs):
+    """Прати курсоре до краја и враћа све ставке и број страница"""
+    stavke, kursor, broj = [], None, 0
+    while True:
+        stranica = dohvati(cursor=kursor, **kwargs)
+        stavke.extend(stranica.items)
+        broj += 1
+        kursor = stranica.next_cursor
+        if kursor is None:
+            return stavke, broj
+
+
+class TestQueryEngine:
+    """Тестови за упите у BookService"""
+
+    def test_apstraktne_klase(self):
+        """Тест да се услов и индекс без имплементираних метода не могу направити"""
+        with pytest.raises(TypeError):
+            Predicate()
+        with pytest.raises(TypeError):
+            AccessPath()
+
+    def test_plan_pocinje_od_najselektivnijeg_indeksa(self, servis):
+        """Тест да план почиње од индекса са најмање кандидата"""
+        upit = Equals('pisac', 'ivo andric') & Between('godina_izdavanja', 1940, 1960) & available()
+        assert redni_brojevi(servis.query_books(upit)) == [1]
+        plan = servis.explain_query(upit)
+        assert plan.splitlines()[0] == "Filter [(pisac = 'ivo andric' AND status = 'dostupna')]"
+        assert "IndexScan range [1940 <= godina_izdavanja <= 1960] ~2" in plan
+
+        assert servis.explain_query(Equals('redni_broj', 3)).startswith("IndexScan id")
+        assert redni_brojevi(servis.query_books(Equals('redni_broj', "3"))) == [3]
+
+    def test_or_not_i_skeniranje(self, servis):
+        """Тест да OR користи унију индекса, а неиндексирани услови пун пролаз"""
+        upit = (Contains('naslov', 'drin') | Equals('zanr', 'Поезија')) & ~Equals('redni_broj', 1)
+        assert redni_brojevi(servis.query_books(upit)) == [4]
+        assert "Union ~2" in servis.explain_query(upit)
+
+        upit = Or(Contains('naslov', 'смрт'), Contains('isbn', '978'))
+        assert servis.explain_query(upit) == f"Filter [{upit}]\n  FullScan ~4"
+        assert redni_brojevi(servis.query_books(upit)) == [3]
+        assert redni_brojevi(servis.query_books(~available())) == [2]
+        assert redni_brojevi(servis.query_books({})) == [1, 2, 3, 4]
+        with pytest.raises(ValueError):
+            servis.query_books(Equals('nepoznato', 'x'))
+
+    def test_indeksi_prate_izmene(self, servis):
+        """Тест да упити виде враћене, измењене и обрисане књиге"""
+        servis.return_book(2)
+        knjiga = servis.get_book_by_id(3).model_copy(update={'godina_izdavanja': 1950})
+        servis.update_book(3, knjiga)
+        servis.delete_book(1)
+        assert redni_brojevi(servis.query_books(Between('godina_izdavanja', 1940, 1960) & available())) == [2, 3]
+
+    def test_isti_rezultat_kao_skeniranje(self, servis):
+        """Тест да план враћа исто што и провера сваке књиге"""
+        rng = random.Random(3)
+        uslovi = [Contains('naslov', 'ри'), Contains('pisac', 'андр'), Equals('zanr', 'роман'),
+                  Between('godina_izdavanja', 1940, None), Between('godina_izdavanja', None, 1950),
+                  available(), available(False), Equals('redni_broj', 2), Contains('isbn', '1')]
+        engine = servis._query_engine
+        for _ in range(200):
+            upit = rng.choice(uslovi)
+            for _ in range(rng.randint(0, 3)):
+                drugi = rng.choice(uslovi)
+                upit = rng.choice([And(upit, drugi), Or(upit, drugi), And(upit, ~drugi)])
+            ocekivano = [k for k in servis.get_all_books() if upit.matches(k, engine)]
+            assert servis.query_books(upit) == ocekivano
+        assert set(engine.fields) == set(QUERY_FIELDS)
+
+
+
+class TestStranicenje:
+    """Тестови за странице резултата са курсором"""
+
+    @pytest.fixture
+    def velik_servis(self, tmp_path):
+        servis = BookService(CSVDataAdapter(str(tmp_path / "biblioteka.csv")))
+        servis.load_books()
+        rng = random.Random(5)
+        for i in range(1, 121):
+            servis.add_book(Knjiga(redni_broj=i, naslov=f"Књига {rng.randint(1, 30)}", pisac="Писац",
+                                   godina_izdavanja=rng.choice([None, 1950, 1960, 1970])))
+        return servis
+
+    @pytest.mark.parametrize("sort", ["redni_broj", "-redni_broj", "naslov", "-godina_izdavanja"])
+    def test_stranice_daju_sortiran_rezultat(self, velik_servis, sort):
+        """Тест да странице редом дају исто што и сортирање целог резултата"""
+        sve = velik_servis.get_all_books()
+        polje = sort.lstrip('-')
+        kljuc = velik_servis._sorted[polje].sort_value
+        for upit, ocekivano in [
+            (And(), sve),
+            (Contains('naslov', '1'), [k for k in sve if '1' in k.naslov]),
+            (Equals('redni_broj', 7), [k for k in sve if k.redni_broj == 7]),
+            (Between('godina_izdavanja', 1955, None), [k for k in sve if (k.godina_izdavanja or 0) >= 1955]),
+        ]:
+            ocekivano = sorted(ocekivano, key=lambda k: (kljuc(k), k.redni_broj), reverse=sort.startswith('-'))
+            stavke, broj = sve_stranice(velik_servis.query_books_page, query=upit, sort=sort, limit=9)
+            assert redni_brojevi(stavke) == redni_brojevi(ocekivano)
+            assert broj == max(1, -(-len(ocekivano) // 9))
+
+    def test_kursor_posle_izmena_i_greske(self, velik_servis):
+        """Тест да курсор наставља после последње виђене ставке и кад се каталог мења"""
+        prva = velik_servis.get_books_page(limit=10)
+        assert redni_brojevi(prva.items) == list(range(1, 11))
+        velik_servis.delete_book(11)
+        velik_servis.add_book(Knjiga(redni_broj=200, naslov="Нова", pisac="Писац"))
+        druga = velik_servis.get_books_page(limit=10, cursor=prva.next_cursor)
+        assert redni_brojevi(druga.items) == list(range(12, 22))
+
+        assert redni_brojevi(velik_servis.search_books_page("нова").items) == [200]
+        with pytest.raises(ValueError):
+            velik_servis.get_books_page(sort='naslov', cursor=prva.next_cursor)
+        with pytest.raises(ValueError):
+            velik_servis.get_books_page(cursor="није курсор")
+        with pytest.raises(ValueError):
+            velik_servis.get_books_page(sort='isbn')
+
+
+@pytest.fixture
+def putanja(tmp_path):
+    """Прави CSV каталог са три књиге, од којих је једна позајмљена"""
+    putanja = tmp_path / "Biblioteka.csv"
+    with open(putanja, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for i, (naslov, pisac, godina, pozajmljena) in enumerate([
+            ("На Дрини ћуприја", "Иво Андрић", "1945", ""),
+            ("Тврђава", "Меша Селимовић", "1970", "Да"),
+            ("Писма", "Иво Андрић; Меша Селимовић", "", ""),
+        ], start=1):
+            red = {kolona: "" for kolona in CSV_COLUMNS}
+            red.update({"Редни број": str(i), "Наслов": naslov, "Писац": pisac,
+                        "Година издавања": godina, "Позајмљена": pozajmljena})
+            writer.writerow(red)
+    get_catalog_cache().ponisti()
+    return str(putanja)
+
+
+class TestUpitKataloga:
+    """Тестови за упите у модулу Biblioteka"""
+
+    def test_upit_i_plan(self, putanja):
+        """Тест упита над CSV каталогом и објашњења плана"""
+        upit = Equals("Писац", "Меша Селимовић") & available()
+        assert [k["Наслов"] for k in bib.upit(putanja, upit)] == ["Писма"]
+        assert "IndexScan facet" in bib.objasni_upit(putanja, upit)
+
+        upit = Between("Година издавања", 1900, 1960) | Contains("Наслов", "tvrdj")
+        assert [k["Наслов"] for k in bib.upit(putanja, upit)] == ["На Дрини ћуприја", "Тврђава"]
+        assert bib.objasni_upit(putanja, Equals("Редни број", 2)).startswith("IndexScan id")
+        assert [k["Наслов"] for k in bib.upit(putanja, Equals("Редни број", 2))] == ["Тврђава"]
+        assert bib.upit(putanja, Equals("Редни број", 99)) == []
+        assert [k["Наслов"] for k in bib.upit(putanja, Equals("Редни број", "3") & available())] == ["Писма"]
+        assert [k["Наслов"] for k in bib.pretraga_po_relevantnosti(putanja, "ćupriji andrića")] == \
+            ["На Дрини ћуприја", "Писма"]
+        # Колона из старијих фајлова ради као и пре
+        assert len(bib.pretraga(putanja, {"Наслов": "a", "Издавачи": ""})) == 3
+
+    def test_rangirani_indeks_se_gradi_tek_kad_zatreba(self, putanja, monkeypatch):
+        """Тест да упити не граде BM25 индекс, а рангирана претрага га гради једном и ажурира у месту"""
+        with monkeypatch.context() as m:
+            m.setattr(bib, "RankedIndex", lambda *a: pytest.fail("грађен је BM25 индекс"))
+            assert [k["Наслов"] for k in bib.upit(putanja, Equals("Писац", "Меша Селимовић"))] == \
+                ["Тврђава", "Писма"]
+            bib.inicijalizuj_podatke(putanja)
+
+        assert [k["Наслов"] for k in bib.pretraga_po_relevantnosti(putanja, "tvrđava")] == ["Тврђава"]
+        rang = bib._rang_kataloga(putanja).rang
+        monkeypatch.setattr(bib, "CSV_JOURNAL_ENABLED", True)
+        assert bib.izmeni_knjigu(putanja, "Писма", {"Наслов": "Тврђава и писма"})
+        assert bib._rang_kataloga(putanja).rang is rang
+        assert [k["Наслов"] for k in bib.pretraga_po_relevantnosti(putanja, "tvrđava")] == \
+            ["Тврђава", "Тврђава и писма"]
+
+    def test_stranice_kataloga(self, putanja):
+        """Тест страница упита над CSV каталогом"""
+        # Опадајући редослед је обрнут растући, па књиге без године долазе прве
+        prva = bib.upit_stranica(putanja, {}, sortiranje="-Година издавања", limit=2)
+        assert [k["Наслов"] for k in prva.items] == ["Писма", "Тврђава"]
+        druga = bib.pretraga_stranica(putanja, {}, sortiranje="-Година издавања", limit=2, kursor=prva.next_cursor)
+        assert [k["Наслов"] for k in druga.items] == ["На Дрини ћуприја"] and druga.next_cursor is None
+        assert [k["Наслов"] for k in bib.upit_stranica(putanja, available(), sortiranje="Наслов").items] == \
+            ["На Дрини ћуприја", "Писма"]
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_ranked_index.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за стемер и рангирану (BM25) претрагу
+
+import random
+
+from book_service import BookService
+from data_adapter import CSVDataAdapter
+from models import Knjiga
+from ranked_index import RankedIndex
+from stemmer import stem, tokens
+
+
+class TestStemmer:
+    """Тестови за лаки стемер"""
+
+    def test_padezi_daju_istu_osnovu(self):
+        """Тест да облици исте речи дају исту основу, у оба писма"""
+        assert {stem(rec) for rec in tokens("књига књиге књигу књигом књигама knjiga")} == {"knjig"}
+        assert tokens("На Дрини ћуприја") == ["na", "drin", "cuprij"]
+        # Кратке речи се не скраћују
+        assert stem("ivo") == "ivo"
+
+
+def napravi_indeks(stavke):
+    indeks = RankedIndex({'naslov': lambda s: s.get('naslov'), 'napomena': lambda s: s.get('napomena')},
+                         {'naslov': 3.0, 'napomena': 0.5})
+    indeks.build(enumerate(stavke))
+    return indeks
+
+
+class TestRankedIndex:
+    """Тестови за RankedIndex"""
+
+    def test_pogodak_u_naslovu_ispred_napomene(self):
+        """Тест да погодак у наслову има већу оцену од поготка у напомени"""
+        stavke = [{'naslov': 'Роман', 'napomena': f'Књига {i} из ормана'} for i in range(20)]
+        stavke.append({'naslov': 'Књиге о књигама', 'napomena': ''})
+        indeks = napravi_indeks(stavke)
+        assert indeks.search("књига", limit=3)[0] is stavke[-1]
+        assert len(indeks.search("књига", limit=3)) == 3
+        assert indeks.search("непостојећа реч") == []
+
+    def test_top_k_kao_potpuno_sortiranje(self):
+        """Тест да избор гомилом даје исто што и сортирање свих оцена"""
+        rng = random.Random(11)
+        reci = ["књига", "књиге", "дрина", "ћуприја", "роман", "писмо", "на"]
+        stavke = [{'naslov': " ".join(rng.choices(reci, k=rng.randint(1, 4))),
+                   'napomena': " ".join(rng.choices(reci, k=rng.randint(0, 6)))} for _ in range(200)]
+        indeks = napravi_indeks(stavke)
+        for upit in ["књигу", "дрини роман", "писма на"]:
+            sve = sorted(indeks.scores(upit).items(), key=lambda par: (-par[1], par[0]))
+            assert indeks.search_keys(upit, limit=15) == sve[:15]
+
+    def test_izmene(self):
+        """Тест да индекс прати измене и брисања"""
+        indeks = napravi_indeks([{'naslov': 'Проклета авлија'}, {'naslov': 'Травничка хроника'}])
+        indeks.replace(0, 0, {'naslov': 'Госпођица'})
+        assert indeks.search("авлији") == []
+        assert indeks.search("gospodjica") == [{'naslov': 'Госпођица'}]
+        assert indeks.remove(1) and not indeks.remove(1)
+        assert indeks.search("хронике") == []
+
+
+def test_rangirana_pretraga_servisa(tmp_path):
+    """Тест да сервис враћа књигу са речју у наслову испред оних са речју у напомени"""
+    servis = BookService(CSVDataAdapter(str(tmp_path / "biblioteka.csv")))
+    servis.load_books()
+    for i in range(1, 6):
+        servis.add_book(Knjiga(redni_broj=i, naslov=f"Збирка {i}", pisac="Писац", napomena="Поклон књига"))
+    servis.add_book(Knjiga(redni_broj=6, naslov="Књиге и читаоци", pisac="Писац"))
+    assert [k.redni_broj for k in servis.search_books_ranked("knjigu", limit=2)] == [6, 1]
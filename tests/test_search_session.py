@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_search_session.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за инкременталну претрагу док се куца
+
+import random
+
+from search_session import SearchSession
+from trigram_index import TrigramIndex
+
+
+def napravi_indeks(stavke):
+    indeks = TrigramIndex({'naslov': lambda s: s.get('naslov'), 'pisac': lambda s: s.get('pisac')})
+    indeks.build(enumerate(stavke))
+    return indeks
+
+
+class TestSearchSession:
+    """Тестови за SearchSession"""
+
+    def test_kucanje_i_brisanje(self):
+        """Тест да проширен упит филтрира претходни резултат, а краћи долази из кеша"""
+        stavke = [{'naslov': 'На Дрини ћуприја', 'pisac': 'Иво Андрић'},
+                  {'naslov': 'Дервиш и смрт', 'pisac': 'Меша Селимовић'},
+                  {'naslov': 'Андрићеве приче', 'pisac': 'Приредио Д. Иванић'}]
+        indeks = napravi_indeks(stavke)
+        sesija = SearchSession(lambda: indeks, 'naslov')
+
+        assert sesija.search_keys("а") == [0, 2]
+        assert sesija.search_keys("ан") == [2]
+        assert sesija.search("andr") == [stavke[2]]
+        assert sesija.stats == {'hits': 0, 'refined': 2, 'full': 1}
+        assert sesija.search_keys("ан") == [2]
+        assert sesija.stats['hits'] == 1
+
+    def test_isti_rezultat_kao_pretraga(self):
+        """Тест да сесија враћа исто што и претрага индекса за насумично куцање"""
+        rng = random.Random(2)
+        slova = "андрићшђ "
+        stavke = [{'naslov': "".join(rng.choices(slova, k=rng.randint(0, 15))),
+                   'pisac': "".join(rng.choices(slova, k=rng.randint(0, 8)))} for _ in range(400)]
+        indeks = napravi_indeks(stavke)
+        sesija = SearchSession(lambda: indeks, max_entries=4)
+        upit = ""
+        for _ in range(300):
+            if upit and rng.random() < 0.4:
+                upit = upit[:-1]
+            else:
+                upit += rng.choice(slova)
+            assert sesija.search_keys(upit) == indeks.search_keys(upit)
+        assert len(sesija._cache) <= 4
+        assert sesija.stats['refined'] > 0
+
+    def test_izmena_indeksa_prazni_kes(self):
+        """Тест да измена индекса поништава запамћене резултате"""
+        indeks = napravi_indeks([{'naslov': 'Проклета авлија'}])
+        sesija = SearchSession(lambda: indeks)
+        assert sesija.search_keys("авлија") == [0]
+        indeks.add(1, {'naslov': 'Авлија'})
+        assert sesija.search_keys("авлија") == [0, 1]
+        assert sesija.stats['hits'] == 0
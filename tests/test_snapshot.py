@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_snapshot.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за бинарни снимак CSV каталога
+
+import csv
+import os
+
+import Biblioteka as bib
+from catalog_cache import get_catalog_cache, potpis_fajla
+from config import CSV_COLUMNS
+from data_adapter import CSVDataAdapter
+from models import Knjiga
+from snapshot import putanja_snimka, sacuvaj_snimak, ucitaj_snimak
+
+
+def napravi_csv(putanja, redovi):
+    """Уписује CSV фајл са задатим редовима"""
+    with open(putanja, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for red in redovi:
+            writer.writerow({kolona: red.get(kolona, "") for kolona in CSV_COLUMNS})
+
+
+class TestSnimak:
+    """Тестови за запис и читање снимка"""
+
+    def test_cuvanje_i_ucitavanje(self, tmp_path):
+        """Тест да снимак враћа исте редове, укључујући None и NUL вредности"""
+        putanja = str(tmp_path / "Biblioteka.csv")
+        napravi_csv(putanja, [])
+        redovi = [
+            {"a": "Ћирилица", "b": None},
+            {"a": "са\x00нулом", "b": ""},
+            {"a": "", "b": "крај"},
+        ]
+        assert sacuvaj_snimak(putanja, ["a", "b"], redovi, potpis_fajla(putanja))
+
+        snimak = ucitaj_snimak(putanja)
+        assert snimak.redovi == redovi
+        assert snimak.kolona("b") == [None, "", "крај"]
+        assert snimak.kolona("c") is None
+        assert not snimak.validirano
+
+    def test_zastareo_snimak_se_zanemaruje(self, tmp_path):
+        """Тест да снимак не важи када се CSV фајл промени"""
+        putanja = str(tmp_path / "Biblioteka.csv")
+        napravi_csv(putanja, [])
+        assert sacuvaj_snimak(putanja, ["a"], [{"a": "1"}], potpis_fajla(putanja))
+
+        with open(putanja, "a", encoding="utf-8") as f:
+            f.write("1,Нови ред\n")
+        assert ucitaj_snimak(putanja) is None
+
+    def test_ostecen_snimak_se_zanemaruje(self, tmp_path):
+        """Тест да се снимак са погрешним контролним збиром не користи"""
+        putanja = str(tmp_path / "Biblioteka.csv")
+        napravi_csv(putanja, [])
+        assert sacuvaj_snimak(putanja, ["a"], [{"a": "вредност"}], potpis_fajla(putanja))
+
+        with open(putanja_snimka(putanja), "r+b") as f:
+            f.seek(-6, os.SEEK_END)
+            f.write(b"X")
+        assert ucitaj_snimak(putanja) is None
+
+    def test_redovi_sa_razlicitim_kolonama(self, tmp_path):
+        """Тест да се снимак не прави када ред нема тачно задате колоне"""
+        putanja = str(tmp_path / "Biblioteka.csv")
+        napravi_csv(putanja, [])
+        assert not sacuvaj_snimak(putanja, ["a"], [{"a": "1", "b": "2"}], potpis_fajla(putanja))
+        assert not os.path.exists(putanja_snimka(putanja))
+
+
+class TestUcitavanjeIzSnimka:
+    """Тестови да снимак даје исти каталог као парсирање CSV фајла"""
+
+    def test_biblioteka_ucitava_iz_snimka(self, tmp_path):
+        """Тест да се при другом покретању редови читају из снимка"""
+        putanja = str(tmp_path / "Biblioteka.csv")
+        napravi_csv(putanja, [
+            {"Редни број": "1", "Наслов": "На Дрини ћуприја", "Писац": "Иво Андрић"},
+            {"Редни број": "2", "Наслов": "Сеобе, књига друга", "Напомена": "ред\nу два реда"},
+        ])
+        get_catalog_cache().ponisti()
+        iz_csv = bib.ucitaj_podatke(putanja)
+        assert os.path.exists(putanja_snimka(putanja))
+
+        get_catalog_cache().ponisti()
+        assert bib.ucitaj_podatke(putanja) == iz_csv
+
+    def test_adapter_ucitava_iste_knjige(self, tmp_path):
+        """Тест да књиге из снимка одговарају валидираним књигама из CSV-а"""
+        putanja = str(tmp_path / "Biblioteka.csv")
+        knjige = [
+            Knjiga(redni_broj=1, naslov="На Дрини ћуприја", pisac="Иво Андрић", godina_izdavanja=1945),
+            Knjiga(redni_broj=2, naslov="Дервиш и смрт", pisac="Меша Селимовић", pozajmljena=True,
+                   ko_je_pozajmio="Марко", izdavaci="Лагуна; Вулкан"),
+        ]
+        assert CSVDataAdapter(putanja).save_books(knjige)
+        assert ucitaj_snimak(putanja).validirano
+
+        iz_snimka = CSVDataAdapter(putanja).load_books()
+        os.remove(putanja_snimka(putanja))
+        iz_csv = CSVDataAdapter(putanja).load_books()
+
+        bez_vremena = {"datum_dodavanja", "poslednja_izmena"}
+        assert [k.model_dump(exclude=bez_vremena) for k in iz_snimka] == \
+            [k.model_dump(exclude=bez_vremena) for k in iz_csv]
+        assert [k.model_fields_set for k in iz_snimka] == [k.model_fields_set for k in iz_csv]
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_statistika.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за статистику библиотеке
+
+import random
+
+import Biblioteka as bib
+import statistika
+
+
+def napravi_redove(broj, seme=3):
+    rng = random.Random(seme)
+    pisci = ["Иво Андрић", "Меша Селимовић", "Данило Киш", "Исидора Секулић", "Бранко Ћопић"]
+    redovi = []
+    for i in range(broj):
+        redovi.append({
+            "Редни број": str(i + 1),
+            "Писац": ", ".join(rng.sample(pisci, rng.randint(0, 2))),
+            "Жанр": rng.choice(["Роман", " Роман ", "Поезија", "", "Есеј"]),
+            "Издавач": rng.choice(["Просвета", "Нолит", "", " Лагуна"]),
+            "Серијал": rng.choice(["", "", "Дела", "Сабрана дела "]),
+            "Позајмљена": rng.choice(["", "", "01.02.2024"]),
+            "Враћена": rng.choice(["", "05.02.2024"]),
+        })
+    return redovi
+
+
+class TestIzracunajStatistiku:
+    """Тестови за izracunaj_statistiku"""
+
+    def test_isto_kao_pojedinacni_prolazi(self):
+        """Тест да један пролаз даје исто што и засебни пролази по свакој метрици"""
+        redovi = napravi_redove(300)
+        st = statistika.izracunaj_statistiku(redovi, bib.podeli_pisce, top_n=3)
+
+        autori = {}
+        for red in redovi:
+            for autor in bib.podeli_pisce(red["Писац"]):
+                autori[autor] = autori.get(autor, 0) + 1
+        zanrovi = {}
+        for red in redovi:
+            if red["Жанр"].strip():
+                zanrovi[red["Жанр"].strip()] = zanrovi.get(red["Жанр"].strip(), 0) + 1
+
+        assert st["ukupno_knjiga"] == 300
+        assert st["ukupno_autora"] == len(autori)
+        assert st["knjige_po_zanru"] == zanrovi
+        assert st["broj_zanrova"] == len(zanrovi)
+        assert st["broj_serijala"] == 2
+        assert st["broj_pozajmica"] == sum(1 for r in redovi if r["Позајмљена"] and not r["Враћена"])
+        assert st["top_autori"] == sorted(autori.items(), key=lambda x: x[1], reverse=True)[:3]
+
+    def test_funkcije_preko_agregatora(self):
+        """Тест да појединачне функције враћају вредности агрегатора"""
+        redovi = napravi_redove(50, seme=8)
+        st = statistika.izracunaj_statistiku(redovi, bib.podeli_pisce)
+        assert statistika.ukupno_knjiga(redovi) == st["ukupno_knjiga"]
+        assert statistika.ukupno_autora(redovi, bib.podeli_pisce) == st["ukupno_autora"]
+        assert statistika.broj_pozajmica(redovi) == st["broj_pozajmica"]
+        assert statistika.knjige_po_izdavacu(redovi) == st["knjige_po_izdavacu"]
+        assert statistika.top_autori(redovi, bib.podeli_pisce) == st["top_autori"]
+
+    def test_jednaki_brojevi_zadrzavaju_redosled(self):
+        """Тест да аутори са истим бројем књига остају у редоследу појављивања"""
+        redovi = [{"Писац": p} for p in ["Б", "А", "В", "А", "Б", "Г"]]
+        assert statistika.top_autori(redovi, bib.podeli_pisce, 3) == [("Б", 2), ("А", 2), ("В", 1)]
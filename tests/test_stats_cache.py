@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_stats_cache.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за кеш статистика и графикона
+
+import csv
+
+import pytest
+
+import Biblioteka as bib
+from catalog_cache import get_catalog_cache
+from config import CSV_COLUMNS
+from stats_cache import StatsCache, get_stats_cache
+from tests.test_biblioteka import napravi_red
+
+
+@pytest.fixture
+def putanja(tmp_path):
+    """Прави привремени CSV каталог са две књиге"""
+    putanja = tmp_path / "Biblioteka.csv"
+    with open(putanja, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerow(napravi_red(1, "На Дрини ћуприја", "Иво Андрић"))
+        writer.writerow(napravi_red(2, "Дервиш и смрт", "Меша Селимовић"))
+    get_catalog_cache().ponisti()
+    get_stats_cache().ponisti()
+    return str(putanja)
+
+
+class TestStatsCache:
+    """Тестови за StatsCache"""
+
+    def test_nepromenjen_katalog_pogadja_kes(self, putanja):
+        """Тест да поновно отварање статистике не рачуна ни не црта поново"""
+        kes = StatsCache()
+        pozivi = []
+
+        def izracunaj(p):
+            pozivi.append(p)
+            return {"ukupno_knjiga": len(bib.ucitaj_podatke(p))}
+
+        assert kes.agregati(putanja, izracunaj) == {"ukupno_knjiga": 2}
+        assert kes.agregati(putanja, izracunaj) == {"ukupno_knjiga": 2}
+        assert kes.grafikon(putanja, ("pita", 2), lambda: pozivi.append("crtanje") or b"png") == b"png"
+        assert kes.grafikon(putanja, ("pita", 2), lambda: b"drugi") == b"png"
+        assert pozivi == [putanja, "crtanje"]
+        assert kes.statistika() == {"pogoci": 2, "promasaji": 2, "unosi": 1}
+
+    def test_cuvanje_ponistava_kes(self, putanja):
+        """Тест да чување, дописивање и измена каталога поништавају статистике и графиконе"""
+        assert bib.statistika_kataloga(putanja)["ukupno_knjiga"] == 2
+        kes = get_stats_cache()
+        kes.grafikon(putanja, "autori", lambda: b"stari")
+
+        assert bib.dodaj_knjigu(putanja, napravi_red(3, "Травничка хроника", "Иво Андрић"))
+        st = bib.statistika_kataloga(putanja)
+        assert st["ukupno_knjiga"] == 3
+        assert st["top_autori"][0] == ("Иво Андрић", 2)
+        assert kes.grafikon(putanja, "autori", lambda: b"novi") == b"novi"
+
+        podaci = bib.ucitaj_podatke(putanja)
+        assert bib.sacuvaj_podatke(putanja, podaci[:1])
+        assert bib.statistika_kataloga(putanja)["ukupno_knjiga"] == 1
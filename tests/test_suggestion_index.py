@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_suggestion_index.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за индекс предлога за допуњавање
+
+import random
+
+from suggestion_index import SuggestionIndex
+from transliteration import fold_text
+
+
+class TestSuggestionIndex:
+    """Тестови за SuggestionIndex"""
+
+    def test_rangiranje(self):
+        """Тест да префикс вредности иде пре префикса речи и подниске, а унутар групе чешћа вредност"""
+        indeks = SuggestionIndex(["Иво Андрић", "Иво Андрић", "Андреј Платонов",
+                                  "Андрићград", "Јован Андријевић", "Сандра Ристић"])
+        assert indeks.suggest("андр") == ["Андреј Платонов", "Андрићград", "Иво Андрић",
+                                          "Јован Андријевић", "Сандра Ристић"]
+        assert indeks.suggest("andric", limit=2) == ["Андрићград", "Иво Андрић"]
+        assert indeks.suggest("ђ") == []
+        assert indeks.suggest("  ") == []
+
+    def test_isti_skup_kao_pretraga_liste(self):
+        """Тест да предлози покривају исто што и претрага подниске кроз целу листу"""
+        rng = random.Random(5)
+        slova = "абвгдђ ан"
+        vrednosti = ["".join(rng.choices(slova, k=rng.randint(1, 12))) for _ in range(2000)]
+        indeks = SuggestionIndex(vrednosti)
+        for upit in ["а", "ан", "анђ", "д а", "ббб", "гд"]:
+            kljuc = fold_text(upit)
+            ocekivano = {v for v in vrednosti if kljuc in fold_text(v)}
+            assert set(indeks.suggest(upit, limit=len(vrednosti))) == ocekivano
+            assert len(indeks.suggest(upit)) == min(7, len(ocekivano))
+
+    def test_ucestalost_iz_recnika(self):
+        """Тест да се учесталости могу задати речником"""
+        indeks = SuggestionIndex({"Бранко Ћопић": 1, "Бранко Миљковић": 5})
+        assert indeks.suggest("бранко") == ["Бранко Миљковић", "Бранко Ћопић"]
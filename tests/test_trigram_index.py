@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# @Аутор   : minciv
+# @Фајл     : tests/test_trigram_index.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Тестови за индекс триграма
+
+import random
+
+from transliteration import fold_text
+from trigram_index import TrigramIndex
+
+
+def napravi_indeks(stavke):
+    """Прави индекс над насловом и писцем"""
+    indeks = TrigramIndex({
+        'naslov': lambda s: s.get('naslov'),
+        'pisac': lambda s: s.get('pisac'),
+    })
+    indeks.build(enumerate(stavke))
+    return indeks
+
+
+class TestFoldText:
+    """Тестови за свођење текста независно од писма"""
+
+    def test_cirilica_i_latinica_daju_isto(self):
+        """Тест да ћирилица, латиница са дијакритицима и без њих дају исти облик"""
+        assert fold_text("Живојиновић") == fold_text("Živojinović") == "zivojinovic"
+        assert fold_text("Ђорђе Љубић Његош") == fold_text("Đorđe Ljubić Njegoš") == "djordje ljubic njegos"
+        assert fold_text("ЏЕП Ћуприја Чаша") == "dzep cuprija casa"
+        assert fold_text("Émile Zürich") == "emile zurich"
+        assert fold_text(None) == fold_text("") == ""
+
+
+class TestTrigramIndex:
+    """Тестови за TrigramIndex"""
+
+    def test_isti_rezultat_kao_skeniranje(self):
+        """Тест да индекс враћа исто што и претрага подниске над сведеним текстом"""
+        rng = random.Random(7)
+        slova = "абвгдђежз "
+        stavke = [{'naslov': "".join(rng.choice(slova) for _ in range(rng.randint(0, 12))),
+                   'pisac': "".join(rng.choice(slova) for _ in range(rng.randint(0, 8))) or None}
+                  for _ in range(300)]
+        indeks = napravi_indeks(stavke)
+
+        for _ in range(200):
+            upit = "".join(rng.choice(slova) for _ in range(rng.randint(1, 5)))
+            ocekivano = [s for s in stavke
+                         if any(fold_text(upit).strip() in fold_text(s[p]) for p in ('naslov', 'pisac'))]
+            assert indeks.search(upit) == ocekivano
+
+    def test_kratak_upit_i_nepoznato_polje(self):
+        """Тест да се кратки упити скенирају, а поља ван индекса препуштају позиваоцу"""
+        indeks = napravi_indeks([{'naslov': 'На Дрини ћуприја', 'pisac': 'Иво Андрић'}])
+        assert len(indeks.search("др")) == 1
+        assert indeks.search("дрин", field="napomena") is None
+        assert indeks.search("андрић", field="naslov") == []
+        assert len(indeks.search("АНДРИЋ", field="pisac")) == 1
+        assert len(indeks.search("cuprij")) == 1
+
+    def test_izmene(self):
+        """Тест да се индекс ажурира при измени и брисању ставки"""
+        indeks = napravi_indeks([{'naslov': 'Проклета авлија'}, {'naslov': 'Травничка хроника'}])
+        indeks.replace(0, 0, {'naslov': 'Госпођица'})
+        indeks.add(2, {'naslov': 'Авлија'})
+
+        assert indeks.search("авлија") == [{'naslov': 'Авлија'}]
+        assert indeks.search("ђица") == [{'naslov': 'Госпођица'}]
+        assert indeks.remove(1)
+        assert indeks.search("хроника") == []
+        # Триграми обрисаних ставки се уклањају из индекса
+        assert "хро" not in indeks._postings
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : transliteration.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Свођење ћириличног и латиничног текста на исти облик за претрагу
+
+import unicodedata
+
+# Ћирилица и латиница са дијакритицима се своде на основну латиницу:
+# ћ/ć/ч/č → c, ђ/đ → dj, љ → lj, њ → nj, џ → dz, ж/ž → z, ш/š → s
+_CIRILICA = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'ђ': 'dj', 'е': 'e', 'ж': 'z',
+    'з': 'z', 'и': 'i', 'ј': 'j', 'к': 'k', 'л': 'l', 'љ': 'lj', 'м': 'm', 'н': 'n',
+    'њ': 'nj', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'ћ': 'c', 'у': 'u',
+    'ф': 'f', 'х': 'h', 'ц': 'c', 'ч': 'c', 'џ': 'dz', 'ш': 's',
+}
+_LATINICA = {'ć': 'c', 'č': 'c', 'đ': 'dj', 'š': 's', 'ž': 'z'}
+
+_TABELA = str.maketrans({**_CIRILICA, **_LATINICA})
+
+
+def fold_text(text) -> str:
+    """
+    Враћа облик текста по ком се пореди при претрази, независно од писма.
+
+    Текст се пребацује у мала слова, ћирилица у латиницу, а дијакритици се
+    уклањају, па "Живојиновић", "Živojinović" и "zivojinovic" дају исти
+    резултат. Упит и индексиране вредности морају да прођу кроз исту функцију.
+    """
+    if not text:
+        return ''
+    folded = str(text).lower().translate(_TABELA)
+    if not folded.isascii():
+        # Остали дијакритици (é, ü, ...) се уклањају разлагањем слова
+        folded = ''.join(ch for ch in unicodedata.normalize('NFKD', folded)
+                         if not unicodedata.combining(ch))
+    return folded
+
+
+# Замене које FTS5 токенизатор unicode61 са remove_diacritics 2 не ради сам:
+# ћирилица, у оба облика слова, и đ, које се не разлаже на d и дијакритик
+_SQL_ZAMENE = [(varijanta, zamena)
+               for slovo, zamena in {**_CIRILICA, 'đ': 'dj'}.items()
+               for varijanta in (slovo, slovo.upper())]
+
+# Највише угњеждених replace() у једном изразу; парсер SQLite-а има плитак стек
+_SQL_KORAK = 20
+
+FOLD_SQL_STEPS = -(-len(_SQL_ZAMENE) // _SQL_KORAK)
+
+
+def fold_sql(expression: str, step: int) -> str:
+    """
+    Враћа један од FOLD_SQL_STEPS SQL израза који своде текст као fold_text.
+
+    Кораци се примењују редом, сваки на резултат претходног, јер сва замена
+    у једном изразу прелази дубину коју SQLite парсер дозвољава. Мала слова
+    и остали дијакритици се препуштају FTS5 токенизатору unicode61 са
+    remove_diacritics 2, па изрази дају исте речи као fold_text само у
+    FTS индексу. Изрази не зову Python функције, па раде на свакој конекцији.
+    """
+    for letter, replacement in _SQL_ZAMENE[step * _SQL_KORAK:(step + 1) * _SQL_KORAK]:
+        expression = f"replace({expression}, '{letter}', '{replacement}')"
+    return expression
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# @Аутор    : minciv
+# @Фајл     : trigram_index.py
+# @Верзија  : 0.2.0
+# @Програм  : Windsurf
+# @Опис     : Индекс триграма за претрагу подниски у текстуалним пољима каталога
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from transliteration import fold_text
+
+# Најкраћи упит који се тражи преко индекса; краћи упити се скенирају
+MIN_DUZINA_UPITA = 3
+
+
+def trigrams(text: str) -> Set[str]:
+    """Враћа скуп триграма текста (текст треба да је већ сведен са fold_text)."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Индекс триграма над текстуалним пољима ставки каталога.
+
+    За сваки триграм чува скуп кључева ставки у чијим пољима се појављује.
+    Кандидати за упит су пресек скупова триграма упита, а затим се сваки
+    кандидат проверава правом претрагом подниске, па је резултат исти као
+    код скенирања, али цена зависи од броја кандидата уместо од каталога.
+    Текст и упит се своде са fold_text, па претрага не зависи од писма.
+    """
+
+    def __init__(self, fields: Dict[str, Callable[[Any], Optional[str]]]):
+        self.fields = dict(fields)
+        self._lock = threading.RLock()
+        # Расте при свакој измени, да кешеви резултата знају када су застарели
+        self.version = 0
+        self.clear()
+
+    def clear(self) -> None:
+        """Празни индекс."""
+        with self._lock:
+            self._items: Dict[Hashable, Any] = {}
+            # Текст поља сведен са fold_text, за проверу кандидата и уклањање
+            self._texts: Dict[Hashable, Tuple[str, ...]] = {}
+            self._order: Dict[Hashable, int] = {}
+            self._next_order = 0
+            self._postings: Dict[str, Set[Hashable]] = {}
+            self.version += 1
+
+    def build(self, items: Iterable[tuple]) -> None:
+        """Поново гради индекс од парова (кључ, ставка) у редоследу каталога."""
+        with self._lock:
+            self.clear()
+            for key, item in items:
+                self.add(key, item)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable) -> Any:
+        """Враћа ставку са датим кључем."""
+        return self._items[key]
+
+    def order(self, key: Hashable) -> int:
+        """Враћа место ставке у редоследу каталога (за сортирање резултата)."""
+        return self._order[key]
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Враћа парове (кључ, ставка) у редоследу каталога."""
+        with self._lock:
+            return sorted(self._items.items(), key=lambda par: self._order[par[0]])
+
+    def estimate(self, query: str, field: Union[str, Sequence[str], None] = None) -> int:
+        """
+        Горња граница броја погодака за упит, без провере кандидата.
+
+        Користи се за планирање упита: то је величина најмањег скупа
+        триграма упита, а за кратке упите број свих ставки.
+        """
+        query = fold_text(query).strip()
+        with self._lock:
+            if len(query) < MIN_DUZINA_UPITA:
+                return len(self._items)
+            return min(len(self._postings.get(trigram, ())) for trigram in trigrams(query))
+
+    def _key_trigrams(self, texts: Tuple[str, ...]) -> Set[str]:
+        # Триграми се рачунају по пољу, да не пређу границу између два поља
+        result = set()
+        for text in texts:
+            result |= trigrams(text)
+        return result
+
+    def add(self, key: Hashable, item: Any) -> None:
+        """Додаје ставку на крај каталога, или замењује постојећу на истом месту."""
+        self.replace(key, key, item)
+
+    def replace(self, old_key: Hashable, key: Hashable, item: Any) -> None:
+        """Замењује ставку `old_key` новом ставком под кључем `key`, на истом месту у редоследу."""
+        with self._lock:
+            order = self._order.get(old_key)
+            self.remove(old_key)
+            if key != old_key:
+                self.remove(key)
+            if order is None:
+                order = self._next_order
+                self._next_order += 1
+            texts = tuple(fold_text(extract(item)) for extract in self.fields.values())
+            self.version += 1
+            self._items[key] = item
+            self._texts[key] = texts
+            self._order[key] = order
+            for trigram in self._key_trigrams(texts):
+                self._postings.setdefault(trigram, set()).add(key)
+
+    def remove(self, key: Hashable) -> bool:
+        """Уклања ставку; враћа False ако није била у индексу."""
+        with self._lock:
+            if key not in self._items:
+                return False
+            self.version += 1
+            for trigram in self._key_trigrams(self._texts.pop(key)):
+                keys = self._postings[trigram]
+                keys.discard(key)
+                if not keys:
+                    del self._postings[trigram]
+            del self._items[key]
+            del self._order[key]
+            return True
+
+    def _positions(self, field: Union[str, Sequence[str], None]) -> Optional[List[int]]:
+        """Редни бројеви поља у којима се тражи; None када неко поље није у индексу."""
+        names = list(self.fields)
+        if field is None:
+            return list(range(len(names)))
+        if isinstance(field, str):
+            field = (field,)
+        if any(name not in self.fields for name in field):
+            return None
+        return [names.index(name) for name in field]
+
+    def matches(self, key: Hashable, query: str, field: Union[str, Sequence[str], None] = None) -> bool:
+        """Проверава да ли поље ставке садржи упит који је већ сведен са fold_text."""
+        texts = self._texts[key]
+        return any(query in texts[i] for i in self._positions(field))
+
+    def search(self, query: str, field: Union[str, Sequence[str], None] = None) -> Optional[List[Any]]:
+        """
+        Враћа ставке чије поље садржи `query` (без обзира на писмо и велика слова).
+
+        Са `field` (име или низ имена) се проверавају само та поља. Враћа
+        None када поље није у индексу, па позивалац скенира.
+        """
+        with self._lock:
+            keys = self.search_keys(query, field)
+            if keys is None:
+                return None
+            return [self._items[key] for key in keys]
+
+    def search_keys(self, query: str, field: Union[str, Sequence[str], None] = None) -> Optional[List[Hashable]]:
+        """
+        Као search, али враћа кључеве ставки у редоследу каталога.
+
+        Упити краћи од MIN_DUZINA_UPITA знакова немају триграме, па се
+        проверавају сви унапред сведени текстови.
+        """
+        query = fold_text(query).strip()
+        positions = self._positions(field)
+        if positions is None:
+            return None
+
+        with self._lock:
+            texts = self._texts
+            if len(query) < MIN_DUZINA_UPITA:
+                return [key for key in sorted(self._items, key=self._order.__getitem__)
+                        if any(query in texts[key][i] for i in positions)]
+
+            sets = []
+            for trigram in trigrams(query):
+                keys = self._postings.get(trigram)
+                if not keys:
+                    return []
+                sets.append(keys)
+            sets.sort(key=len)
+            candidates = set(sets[0])
+            for keys in sets[1:]:
+                candidates &= keys
+                if not candidates:
+                    return []
+
+            matches = [key for key in candidates
+                       if any(query in texts[key][i] for i in positions)]
+            matches.sort(key=self._order.__getitem__)
+            return matches
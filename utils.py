@@ -6,20 +6,25 @@
 # @Опис     : Помоћне функције за Кућну Библиотеку
 
 import csv
-from typing import Dict
+from typing import Callable, Dict, Iterator, Optional
+
+from csv_journal import get_journal
 
 # Функција за учитавање података из CSV фајла
 def ucitaj_podatke(put_do_bibcsv):
     # Учитава податке о књигама из CSV фајла
-    biblioteka_podaci = []
+    return list(iter_podataka(put_do_bibcsv))
+
+def iter_podataka(put_do_bibcsv, filtar: Optional[Callable[[Dict[str, str]], bool]] = None) -> Iterator[Dict[str, str]]:
+    # Враћа књиге из CSV фајла једну по једну, док се фајл чита,
+    # са примењеним изменама из журнала (<csv>.journal) као Biblioteka.ucitaj_podatke
     try:
         with open(put_do_bibcsv, 'r', encoding='utf-8') as fajl:
-            reader = csv.DictReader(fajl)
-            for red in reader:
-                biblioteka_podaci.append(red)
+            for red in get_journal(put_do_bibcsv).iter_replay(csv.DictReader(fajl)):
+                if filtar is None or filtar(red):
+                    yield red
     except FileNotFoundError:
         print(f"Грешка: Фајл '{put_do_bibcsv}' није пронађен.")
-    return biblioteka_podaci
 
 def pronadji_i_stampaj(biblioteka_podaci, kljuc, vrednost, sadrzi=False):
     pronadjene_knjige = False